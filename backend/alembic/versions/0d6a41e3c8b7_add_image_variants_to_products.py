@@ -0,0 +1,28 @@
+"""add image variants to products
+
+Revision ID: 0d6a41e3c8b7
+Revises: f98f1b7c5020
+Create Date: 2026-10-18 18:14:09.772015
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6a41e3c8b7'
+down_revision: Union[str, Sequence[str], None] = 'f98f1b7c5020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'image_variants')
@@ -0,0 +1,30 @@
+"""add keyset pagination indexes to products
+
+Revision ID: 4217779fbb8d
+Revises: e55457b1266b
+Create Date: 2026-10-18 09:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4217779fbb8d'
+down_revision: Union[str, Sequence[str], None] = 'e55457b1266b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'])
+    op.create_index('ix_products_category_created_at_id', 'products', ['category', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_created_at_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
@@ -0,0 +1,62 @@
+"""add daily sales rollup tables
+
+Revision ID: 8fdbf43dec5d
+Revises: 4217779fbb8d
+Create Date: 2026-10-18 10:02:17.558120
+
+Run `python -m app.scripts.backfill_sales_rollups` after upgrading to
+populate the tables from existing orders.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8fdbf43dec5d'
+down_revision: Union[str, Sequence[str], None] = '4217779fbb8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _metric_columns():
+    return [
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('cost', sa.Float(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    op.create_table(
+        'sales_daily_product',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint('day', 'product_id'),
+    )
+    op.create_index('ix_sales_daily_product_product_id', 'sales_daily_product', ['product_id'])
+    op.create_table(
+        'sales_daily_category',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        *_metric_columns(),
+        sa.PrimaryKeyConstraint('day', 'category'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_daily_category')
+    op.drop_index('ix_sales_daily_product_product_id', table_name='sales_daily_product')
+    op.drop_table('sales_daily_product')
+    op.drop_table('sales_daily')
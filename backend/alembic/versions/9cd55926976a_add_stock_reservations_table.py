@@ -0,0 +1,48 @@
+"""add stock reservations table
+
+Revision ID: 9cd55926976a
+Revises: ecbbce03da1a
+Create Date: 2026-10-18 13:27:44.905117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9cd55926976a'
+down_revision: Union[str, Sequence[str], None] = 'ecbbce03da1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('order_id', 'product_id', name='uq_stock_reservations_order_product'),
+    )
+    op.create_index(
+        'ix_stock_reservations_product_id_expires_at', 'stock_reservations', ['product_id', 'expires_at']
+    )
+    op.create_index('ix_stock_reservations_expires_at', 'stock_reservations', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_reservations_expires_at', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_product_id_expires_at', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
@@ -0,0 +1,28 @@
+"""add keyset pagination index for the product price sorts
+
+Revision ID: b3e1f0d27a64
+Revises: 5a0b7c2e91d4
+Create Date: 2026-10-18 21:04:17.392816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e1f0d27a64'
+down_revision: Union[str, Sequence[str], None] = '5a0b7c2e91d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_selling_price_id', 'products', ['selling_price', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_selling_price_id', table_name='products')
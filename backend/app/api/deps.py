@@ -3,10 +3,9 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session, Query
 
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal, get_async_db
 from app.core.roles import Role
-from app.models.user import User
-from app.core.security import decode_access_token
+from app.core.auth_cache import UserSnapshot, cached_user_snapshot, get_token_subject, get_user_snapshot
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
@@ -17,26 +16,29 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserSnapshot:
+    """
+    Resolve the bearer token to a detached user snapshot.
+    Token verification and the user lookup are cached, so the hot path makes no DB round trip
+    and takes no connection. A miss borrows an async connection for the lookup only, so sync
+    routes never hold it alongside their own session.
+    """
     try:
-        payload = decode_access_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        user_id = get_token_subject(token)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = cached_user_snapshot(user_id)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = await db.run_sync(get_user_snapshot, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
 def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """Ensure the current user is a full Admin with write access."""
     if current_user.role != Role.ADMIN:
         raise HTTPException(
@@ -47,8 +49,8 @@ def get_current_admin_user(
 
 # ✅ NEW: Dependency for read-only admin access
 def get_current_read_admin_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """Ensure the current user has at least read access to admin pages."""
     if current_user.role not in [Role.ADMIN, Role.READ_ADMIN]:
         raise HTTPException(
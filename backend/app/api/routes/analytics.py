@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_read_admin_user
+from app.schemas.analytics import (
+    FinancialSummary,
+    InventorySummary,
+    RevenueSeries,
+    StatusCount,
+    TopProduct,
+)
+from app.services.analytics_service import (
+    get_financial_summary,
+    get_inventory_summary,
+    get_revenue_series,
+    get_status_counts,
+    get_top_products,
+)
+
+router = APIRouter(tags=["Analytics"])
+
+
+@router.get("/summary", response_model=FinancialSummary)
+def financial_summary(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: total revenue, COGS, gross profit and order counts."""
+    return get_financial_summary(db, date_from=date_from, date_to=date_to)
+
+
+@router.get("/revenue", response_model=RevenueSeries)
+def revenue_series(
+    granularity: str = "day",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: revenue and COGS grouped by day, week or month."""
+    return get_revenue_series(db, granularity=granularity, date_from=date_from, date_to=date_to)
+
+
+@router.get("/status-counts", response_model=List[StatusCount])
+def status_counts(
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: order counts per status."""
+    return get_status_counts(db)
+
+
+@router.get("/top-products", response_model=List[TopProduct])
+def top_products(
+    by: str = "units",
+    limit: int = Query(10, ge=1, le=100),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: best sellers ranked by units sold or revenue."""
+    return get_top_products(db, by=by, limit=limit, date_from=date_from, date_to=date_to)
+
+
+@router.get("/inventory", response_model=InventorySummary)
+def inventory_summary(
+    low_stock_threshold: int = Query(10, ge=0),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: stock valuation and low-stock counts."""
+    return get_inventory_summary(db, low_stock_threshold=low_stock_threshold)
@@ -1,13 +1,19 @@
 # app/api/routes/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.schemas.auth import Token
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_and_update_password_async,
+)
 from app.core.roles import Role
 from app.services.auth_service import (
     send_verification_email,
@@ -20,12 +26,17 @@ router = APIRouter(tags=["auth"])
 
 # ✅ Login
 @router.post("/token")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    # ✅ bcrypt runs in the password worker pool, not on the event loop
+    verified, new_hash = (
+        await verify_and_update_password_async(form_data.password, user.password_hash)
+        if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -38,6 +49,12 @@ def login(
             detail="Please verify your email before logging in",
         )
 
+    # ✅ Transparently upgrade hashes made with outdated bcrypt rounds
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+        await db.refresh(user)
+
     # ✅ Embed clean values in JWT
     token = create_access_token({
         "sub": str(user.id),
@@ -57,8 +74,8 @@ def login(
 
 # ✅ Register (sends verification email)
 @router.post("/register")
-async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_in.email).first()
+async def register_user(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user_in.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,7 +85,7 @@ async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
     user = User(
         name=user_in.name,
         email=user_in.email,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=await get_password_hash_async(user_in.password),
         role=Role.USER,
         is_verified=False,
         
@@ -79,8 +96,8 @@ async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
         sex=user_in.sex,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # ✅ Must await async email function
     await send_verification_email(user, db)
@@ -98,8 +115,8 @@ def verify_email(token: str = Body(..., embed=True), db: Session = Depends(get_d
 
 # ✅ Forgot Password
 @router.post("/forgot-password")
-async def forgot_password(email: str = Body(..., embed=True), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def forgot_password(email: str = Body(..., embed=True), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
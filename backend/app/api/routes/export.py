@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.api.deps import get_current_read_admin_user
+from app.core.compression import compression
+from app.core.roles import Role
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    check_format,
+    orders_query,
+    products_query,
+    stream_export,
+    users_query,
+)
+
+# Exports stream large bodies: favour throughput over ratio (gzip=true downloads are left alone)
+router = APIRouter(tags=["Export"], dependencies=[Depends(compression(gzip=1, br=1, zstd=1))])
+
+
+def export_response(query: Select, name: str, fmt: str, gzip: bool) -> StreamingResponse:
+    """Stream `query` as a file download; headers go out before the first row is read."""
+    check_format(fmt)
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        stream_export(query, fmt, gzip=gzip),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+# ------------------- ADMIN: EXPORT ORDERS -------------------
+@router.get("/orders")
+def export_orders(
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Download gzip-compressed"),
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: every order matching the filters, streamed oldest first."""
+    query = orders_query(status=status, user_id=user_id, date_from=date_from, date_to=date_to)
+    return export_response(query, "orders", format, gzip)
+
+
+# ------------------- ADMIN: EXPORT PRODUCTS -------------------
+@router.get("/products")
+def export_products(
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Download gzip-compressed"),
+    category: Optional[str] = None,
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: the full catalog, streamed by product id."""
+    return export_response(products_query(category=category), "products", format, gzip)
+
+
+# ------------------- ADMIN: EXPORT USERS -------------------
+@router.get("/users")
+def export_users(
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = Query(False, description="Download gzip-compressed"),
+    role: Optional[Role] = None,
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: user profiles (no credentials), streamed by user id."""
+    return export_response(users_query(role=role), "users", format, gzip)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_read_admin_user
+from app.core.compression import compression_metrics
+from app.db.pool import async_pool_metrics, pool_metrics
+from app.db.session import async_engine, engine
+from app.services.product_service import product_cache, listing_cache
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/cache")
+def cache_metrics(current_user=Depends(get_current_read_admin_user)):
+    """Admin-only: hit / miss / eviction counters for the in-process caches."""
+    return {cache.name: cache.stats() for cache in (product_cache, listing_cache)}
+
+
+@router.get("/db-pool")
+def db_pool_metrics(current_user=Depends(get_current_read_admin_user)):
+    """Admin-only: connection pool occupancy, checkout counts and time spent waiting for a connection."""
+    return {
+        "sync": pool_metrics.stats(engine.pool),
+        "async": async_pool_metrics.stats(async_engine.pool),
+    }
+
+
+@router.get("/compression")
+def response_compression_metrics(current_user=Depends(get_current_read_admin_user)):
+    """Admin-only: bytes in / out and saved per coding, and why responses were left uncompressed."""
+    return compression_metrics.stats()
@@ -1,118 +1,130 @@
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Form, UploadFile, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 
-from app.api.deps import get_db, get_current_user, get_current_admin_user, get_current_read_admin_user # ✅ Import new dependency
+from app.core.http_cache import conditional_get, make_etag
+from app.api.deps import get_async_db, get_current_user, get_current_admin_user, get_current_read_admin_user # ✅ Import new dependency
 from app.models.order import Order
 from app.models.user import User
 from app.models.order_item import OrderItem
-from app.schemas.order import OrderOut, OrderShip
-from app.services.order_service import ship_order, acknowledge_delivery
+from app.schemas.order import OrderOut, OrderPage, OrderShip
+from app.services.order_service import (
+    DEFAULT_ORDERS_PAGE_SIZE,
+    MAX_ORDERS_PAGE_SIZE,
+    get_orders_page_async,
+    ship_order_async,
+    acknowledge_delivery_async,
+    update_order_status_async,
+    delete_order_async,
+)
 
 router = APIRouter(tags=["Orders"])
 
 # ------------------- USER: GET MY ORDERS -------------------
 @router.get("/me", response_model=List[OrderOut])
-def get_my_orders(
-    db: Session = Depends(get_db),
+async def get_my_orders(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Fetches all orders (pending and history) for the logged-in user."""
-    orders = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product))
-        .filter(Order.user_id == current_user.id)
-        .order_by(Order.created_at.desc())
-        .all()
-    )
-    return [OrderOut.model_validate(order) for order in orders]
+    """
+    Fetches all orders (pending and history) for the logged-in user.
+    Supports If-None-Match so unchanged order history costs no serialization or transfer.
+    """
+    def load(db: Session):
+        orders = (
+            db.query(Order)
+            .options(joinedload(Order.items).joinedload(OrderItem.product))
+            .filter(Order.user_id == current_user.id)
+            .order_by(Order.created_at.desc())
+            .all()
+        )
+        etag = make_etag("orders", current_user.id, [
+            (
+                order.id, order.status, order.total_amount, order.tracking_id,
+                [(item.id, item.quantity, item.price, item.product.updated_at) for item in order.items],
+            )
+            for order in orders
+        ])
+        not_modified = conditional_get(request, response, etag, cache_control="private, no-cache")
+        return not_modified or [OrderOut.model_validate(order) for order in orders]
+
+    return await db.run_sync(load)
 
 
 # ------------------- ADMIN: MANAGE ORDERS -------------------
-@router.get("/", response_model=List[OrderOut])
-def get_all_orders(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=OrderPage)
+async def get_all_orders(
+    status: Optional[str] = Query(None, description="Only orders in this status"),
+    user_id: Optional[int] = Query(None, description="Only orders placed by this user"),
+    date_from: Optional[datetime] = Query(None, description="Placed at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Placed before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_ORDERS_PAGE_SIZE, ge=1, le=MAX_ORDERS_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_read_admin_user), # ✅ Use new read-only dependency
 ):
-    """Admin-only: Fetches all orders from all users."""
-    orders = (
-        db.query(Order)
-        .options(joinedload(Order.items).joinedload(OrderItem.product))
-        .order_by(Order.created_at.desc())
-        .all()
+    """Admin-only: one page of orders from all users, newest first. Follow next_cursor for more."""
+    return await get_orders_page_async(
+        db,
+        status=status,
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit,
     )
-    return [OrderOut.model_validate(order) for order in orders]
 
 
 # ------------------- ADMIN: UPDATE ORDER STATUS -------------------
 @router.put("/{order_id}", response_model=OrderOut)
-def update_order_route(
+async def update_order_route(
     order_id: int,
     status: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
-    order = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.product)
-    ).get(order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    order.status = status
-    db.commit()
-    db.refresh(order)
-    return OrderOut.model_validate(order)
+    return await update_order_status_async(db, order_id, status)
 
 
 # ------------------- ADMIN: DELETE ORDER -------------------
 @router.delete("/{order_id}")
-def delete_order_route(
+async def delete_order_route(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
-    order = db.query(Order).get(order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    db.delete(order)
-    db.commit()
+    await delete_order_async(db, order_id)
     return {"detail": "Order deleted successfully"}
 
 
 # ------------------- ADMIN: SHIP ORDER -------------------
 @router.post("/{order_id}/ship", response_model=OrderOut)
-def ship_order_route(
+async def ship_order_route(
     order_id: int,
     ship_data: OrderShip,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
-    order = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.product)
-    ).get(order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    if order.status != "paid":
-        raise HTTPException(status_code=400, detail="Order cannot be shipped")
-    order.status = "shipped"
-    order.tracking_id = ship_data.tracking_id
-    db.commit()
-    db.refresh(order)
-    return OrderOut.model_validate(order)
+    return await ship_order_async(db, order_id, ship_data.tracking_id)
 
 
 # ✅ New endpoint for delivery acknowledgment
 @router.post("/{order_id}/delivered", response_model=OrderOut)
-def acknowledge_delivery_route(
+async def acknowledge_delivery_route(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     User or Admin acknowledges an order as 'delivered'.
     Only the order owner or an admin can perform this action.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id)
     
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
@@ -125,4 +137,4 @@ def acknowledge_delivery_route(
         )
 
     # Call the service function to update the status
-    return acknowledge_delivery(db, order_id)
\ No newline at end of file
+    return await acknowledge_delivery_async(db, order_id)
\ No newline at end of file
@@ -1,51 +1,129 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Form, UploadFile, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.core.http_cache import conditional_get, make_etag
 from app.services.product_service import (
-    create_product,
-    get_products,
-    get_product_by_id,
-    update_product,
-    delete_product,
+    create_product_async,
+    get_products_page_async,
+    get_products_page_payload_async,
+    get_product_payload_async,
+    update_product_async,
+    delete_product_async,
+    ensure_product_exists_async,
+    bulk_adjust_products_async,
+    process_product_image,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
+from app.services.search_service import search_products_async
+from app.services.import_service import (
+    create_import_job_async,
+    get_import_job_async,
+    import_format,
+    run_import_job,
+    save_import_upload,
+)
+from app.services.upload_service import discard_on_error, ingest_upload
+from app.schemas.import_job import ImportJobOut
+from app.services.reservation_service import get_product_availability_async
+from app.schemas.product import (
+    ProductAvailability,
+    ProductBulkAdjustPayload,
+    ProductBulkAdjustResult,
+    ProductOut,
+    ProductPage,
 )
-from app.schemas.product import ProductOut
 from app.api.deps import get_current_admin_user, get_current_read_admin_user # ✅ Import new dependency
 
 router = APIRouter(tags=["Products"])
 
 # ---------------- Public Routes ----------------
 
-@router.get("/", response_model=List[ProductOut])
-def list_products(
+@router.get("/", response_model=ProductPage)
+async def list_products(
+    request: Request,
+    response: Response,
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Public: list all products. Optionally filter by category."""
-    return get_products(db, category=category)
+    """
+    Public: list products one page at a time. Pass `next_cursor` back as `cursor` for the next page.
+    Supports conditional GET with If-None-Match. There is no Last-Modified: deletes and products
+    moving onto or off the page do not show in the items' updated_at, only in the ETag.
+    """
+    page = await get_products_page_payload_async(
+        db, category=category, min_price=min_price, max_price=max_price,
+        in_stock=in_stock, sort=sort, cursor=cursor, limit=limit,
+    )
+    items = page["items"]
+    etag = make_etag("products", [(p["id"], p["updated_at"]) for p in items], page["next_cursor"])
+    not_modified = conditional_get(request, response, etag, cache_control="public, no-cache")
+    return not_modified or page
 
-@router.get("/{product_id}", response_model=ProductOut)
-def retrieve_product(
-    product_id: int,
-    db: Session = Depends(get_db)
+@router.get("/search", response_model=List[ProductOut])
+async def search_products_route(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Public: get one product by id."""
-    return get_product_by_id(db, product_id)
+    """Public: ranked full-text search over name, category and description (prefix and typo tolerant)."""
+    return await search_products_async(db, q, limit=limit)
 
 # ---------------- Admin-only Routes ----------------
 # ✅ NEW: Admin GET route for products, requiring read-only access
-@router.get("/admin", response_model=List[ProductOut])
-def list_products_admin(
+@router.get("/admin", response_model=ProductPage)
+async def list_products_admin(
     category: Optional[str] = None,
-    db: Session = Depends(get_db),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_read_admin_user),
 ):
-    """Admin-only: list all products with admin permissions."""
-    return get_products(db, category=category)
+    """Admin-only: list products with admin permissions, paginated like the public listing."""
+    return await get_products_page_async(
+        db, category=category, min_price=min_price, max_price=max_price,
+        in_stock=in_stock, sort=sort, cursor=cursor, limit=limit,
+    )
+
+# Declared after the literal "/admin" path so it is not captured as a product id
+@router.get("/{product_id}", response_model=ProductOut)
+async def retrieve_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Public: get one product by id. Supports conditional GET (If-None-Match / If-Modified-Since)."""
+    product = await get_product_payload_async(db, product_id)
+    etag = make_etag("product", product["id"], product["updated_at"])
+    not_modified = conditional_get(request, response, etag, product["updated_at"], "public, no-cache")
+    return not_modified or product
+
+@router.get("/{product_id}/availability", response_model=ProductAvailability)
+async def product_availability(
+    product_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Public: live stock minus active cart holds. Not cached."""
+    response.headers["Cache-Control"] = "no-store"
+    return await get_product_availability_async(db, product_id)
 
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
-def create_product_route(
+async def create_product_route(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     description: Optional[str] = Form(None),
     price: float = Form(...),
@@ -54,15 +132,61 @@ def create_product_route(
     stock: int = Form(...),
     category: Optional[str] = Form(None),
     image: Optional[UploadFile] = None,
-    db: Session = Depends(get_db),
+    image_key: Optional[str] = Form(None, description="Key of an image uploaded directly to storage (POST /uploads/presign)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_admin_user), # ❌ Keep the full admin dependency
+):
+    """Admin only: create a new product. Image variants are rendered in the background."""
+    upload = await ingest_upload(image) if image else image_key
+    async with discard_on_error(db, upload):
+        product = await create_product_async(db, name, description, price, selling_price, profit_margin_percentage, stock, category, upload)
+    if product.image_url:
+        background_tasks.add_task(process_product_image, product.id, product.image_url)
+    return product
+
+@router.post("/import", response_model=ImportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def import_products_route(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the file extension"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_admin_user), # ❌ Keep the full admin dependency
+):
+    """
+    Admin only: bulk create / update products from a CSV or NDJSON file, matched on `sku`.
+    Returns a job at once; poll GET /products/import/{job_id} for progress and row errors.
+    """
+    fmt = import_format(file.filename, format)
+    path = await save_import_upload(file)
+    job = await create_import_job_async(db, current_user.id, file.filename, fmt)
+    background_tasks.add_task(run_import_job, job.id, path)
+    return job
+
+@router.get("/import/{job_id}", response_model=ImportJobOut)
+async def import_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_read_admin_user),
+):
+    """Admin-only: progress, counts and the first row errors of a product import."""
+    return await get_import_job_async(db, job_id)
+
+@router.patch("/bulk", response_model=ProductBulkAdjustResult)
+async def bulk_adjust_products_route(
+    payload: ProductBulkAdjustPayload,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
-    """Admin only: create a new product."""
-    return create_product(db, name, description, price, selling_price, profit_margin_percentage, stock, category, image)
+    """
+    Admin only: set stock (absolute or delta) and prices for many products in one transaction.
+    Returns a result per row; unknown ids and deltas that would take stock below zero are skipped.
+    """
+    return await bulk_adjust_products_async(db, payload.items)
 
 @router.put("/{product_id}", response_model=ProductOut)
-def update_product_route(
+async def update_product_route(
     product_id: int,
+    background_tasks: BackgroundTasks,
     name: Optional[str] = Form(None),
     description: Optional[str] = Form(None),
     price: Optional[float] = Form(None),
@@ -71,17 +195,24 @@ def update_product_route(
     stock: Optional[int] = Form(None),
     category: Optional[str] = Form(None),
     image: Optional[UploadFile] = None,
-    db: Session = Depends(get_db),
+    image_key: Optional[str] = Form(None, description="Key of an image uploaded directly to storage (POST /uploads/presign)"),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
-    """Admin only: update product fields."""
-    return update_product(db, product_id, name, description, price, selling_price, profit_margin_percentage, stock, category, image)
+    """Admin only: update product fields. A new image's variants are rendered in the background."""
+    await ensure_product_exists_async(db, product_id)  # 404 before the image goes into storage
+    upload = await ingest_upload(image) if image else image_key
+    async with discard_on_error(db, upload):
+        product = await update_product_async(db, product_id, name, description, price, selling_price, profit_margin_percentage, stock, category, upload)
+    if upload and product.image_url:
+        background_tasks.add_task(process_product_image, product.id, product.image_url)
+    return product
 
 @router.delete("/{product_id}", status_code=status.HTTP_200_OK)
-def delete_product_route(
+async def delete_product_route(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_admin_user), # ❌ Keep the full admin dependency
 ):
     """Admin only: delete a product."""
-    return delete_product(db, product_id)
\ No newline at end of file
+    return await delete_product_async(db, product_id)
\ No newline at end of file
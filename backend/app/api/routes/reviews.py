@@ -1,25 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.api.deps import get_db, get_current_user, get_current_admin_user, get_current_read_admin_user # ✅ Import new dependency
+from app.api.deps import get_async_db, get_current_user, get_current_admin_user, get_current_read_admin_user # ✅ Import new dependency
 from app.schemas.review import ReviewIn, ReviewOut
 from app.services.review_service import (
-    create_review_for_delivered_item,
-    get_all_reviews
+    create_review_for_delivered_item_async,
+    get_all_reviews_async,
 )
 
 router = APIRouter(tags=["Reviews"])
 
 @router.post("/", response_model=ReviewOut, status_code=status.HTTP_201_CREATED)
-def create_review_route(
+async def create_review_route(
     review_in: ReviewIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user),
 ):
     """Allows a user to create a review for a delivered product."""
-    return create_review_for_delivered_item(
-        db=db,
+    return await create_review_for_delivered_item_async(
+        db,
         user_id=current_user.id,
         product_id=review_in.product_id,
         rating=review_in.rating,
@@ -27,9 +27,9 @@ def create_review_route(
     )
 
 @router.get("/admin", response_model=List[ReviewOut])
-def get_all_reviews_route(
-    db: Session = Depends(get_db),
+async def get_all_reviews_route(
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_read_admin_user), # ✅ Use new read-only dependency
 ):
     """Admin-only: Retrieves a list of all reviews."""
-    return get_all_reviews(db=db)
\ No newline at end of file
+    return await get_all_reviews_async(db)
\ No newline at end of file
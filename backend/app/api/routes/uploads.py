@@ -1,37 +1,82 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import os
-import shutil
-from datetime import datetime
+import asyncio
+
+from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi.responses import RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin_user
+from app.core.config import settings
+from app.core.storage import get_storage
+from app.db.session import get_async_db
+from app.schemas.upload import UploadCompleteRequest, UploadOut, UploadPresignOut, UploadPresignRequest
+from app.services.upload_service import (
+    content_hash,
+    discard_on_error,
+    ingest_upload,
+    presign_upload,
+    register_upload_async,
+    verify_direct_upload,
+)
 
 router = APIRouter()
 
-# Directory where images will be stored
-UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@router.post("/upload-image")
-async def upload_image(file: UploadFile = File(...)):
+@router.post("/upload-image", response_model=UploadOut)
+async def upload_image(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_admin_user),
+):
+    """
+    Admin only: upload an image file through the API and return its key and URL.
+    The file is streamed into storage off the event loop, checked by its magic bytes (415) and
+    size (413), and stored under its content hash.
+    """
+    upload = await ingest_upload(file)
+    async with discard_on_error(db, upload):
+        key = await register_upload_async(db, upload)
+    return {"key": key, "url": get_storage().url(key)}
+
+
+@router.post("/presign", response_model=UploadPresignOut)
+async def presign_image_upload(
+    payload: UploadPresignRequest,
+    current_user=Depends(get_current_admin_user),
+):
+    """
+    Admin only: start a direct upload to object storage (S3 backend only). PUT the file to
+    `upload.url` with `upload.headers`, then call POST /uploads/complete. `upload` is null when
+    the same image is already stored: go straight to complete.
+    """
+    return await asyncio.to_thread(presign_upload, payload.content_type, payload.size, payload.sha256)
+
+
+@router.post("/complete", response_model=UploadOut)
+async def complete_image_upload(
+    payload: UploadCompleteRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_admin_user),
+):
     """
-    Upload an image file and return its URL.
+    Admin only: verify a direct upload and record it; pass the key as `image_key` afterwards.
+    Recorded uploads nothing uses after UPLOAD_UNCLAIMED_TTL seconds are deleted.
     """
-    # Validate file type
-    allowed_extensions = ["jpg", "jpeg", "png", "gif"]
-    ext = file.filename.split(".")[-1].lower()
-    if ext not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type. Allowed: jpg, jpeg, png, gif")
-
-    # Create a unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-
-    # Save the file
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Error saving file")
-
-    file_url = f"/uploads/{filename}"
-    return JSONResponse(content={"filename": filename, "url": file_url})
+    upload = await asyncio.to_thread(verify_direct_upload, payload.key)
+    key = await register_upload_async(db, upload)
+    return {"key": key, "url": get_storage().url(key)}
+
+
+# Remote storage only: /uploads/<key> redirects to the object, so existing image URLs keep working
+# while the bytes come from the bucket (or its CDN), never through the app.
+download_router = APIRouter()
+
+
+@download_router.get("/{key:path}", include_in_schema=False)
+def download_upload(key: str):
+    response = RedirectResponse(get_storage().url(key), status_code=307)
+    if settings.S3_PUBLIC_BASE_URL and content_hash(key):
+        response.headers["Cache-Control"] = "public, max-age=86400"
+    else:
+        # A presigned URL expires: browsers may reuse the redirect for part of its lifetime only
+        response.headers["Cache-Control"] = f"private, max-age={settings.S3_URL_EXPIRES // 2}"
+    return response
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_db, get_current_user, get_current_read_admin_user # ✅ Import new dependency
+from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.user import UserOut
+from app.services.upload_service import discard_on_error, ingest_upload
+from app.services.user_service import set_user_photo_async
 
 router = APIRouter()
 
@@ -14,6 +18,19 @@ def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 
+@router.put("/me/photo", response_model=UserOut)
+async def update_my_photo(
+    photo: Optional[UploadFile] = None,
+    photo_key: Optional[str] = Form(None, description="Key of an image already recorded in storage (admins: POST /uploads/complete)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Set the current user's profile photo from a file or a stored image's key; send neither to remove it."""
+    upload = await ingest_upload(photo) if photo else photo_key
+    async with discard_on_error(db, upload):
+        return await set_user_photo_async(db, current_user.id, upload)
+
+
 @router.get("/", response_model=List[UserOut])
 def get_all_users(
     db: Session = Depends(get_db),
@@ -0,0 +1,112 @@
+# app/core/auth_cache.py
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache, VersionedCache
+from app.core.config import settings
+from app.core.roles import Role
+from app.core.security import decode_access_token
+from app.models.user import User
+
+
+class UserSnapshot:
+    """
+    Detached, read-only view of a user for the authenticated request path.
+    Carries the fields routes and UserOut read, without an ORM session.
+    """
+
+    __slots__ = (
+        "id", "name", "email", "role", "is_verified",
+        "address", "birthday", "phone", "sex", "photo_url",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+        if self.role is not None:
+            self.role = Role(self.role)
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(**{name: getattr(user, name) for name in cls.__slots__})
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["role"] = self.role.value if self.role is not None else None
+        return data
+
+    def __repr__(self) -> str:
+        return f"UserSnapshot(id={self.id!r}, email={self.email!r}, role={self.role!r})"
+
+
+# token -> {"sub": user id, "exp": expiry}; signature checked once per token per worker
+token_cache = LRUCache("auth_token", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+# user id -> UserSnapshot fields; versioned in the shared backend so invalidation reaches all workers
+user_cache = VersionedCache("auth_user", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+
+def get_token_subject(token: str) -> int:
+    """Verify a JWT (cached) and return its user id. Raises on invalid or expired tokens."""
+    claims = token_cache.get(token)
+    now = time.time()
+    if claims is None or claims["exp"] <= now:
+        payload = decode_access_token(token)
+        sub = payload.get("sub")
+        if sub is None:
+            raise ValueError("Token has no subject")
+        claims = {"sub": int(sub), "exp": float(payload.get("exp", now + settings.AUTH_CACHE_TTL))}
+        # Never cache a token past its own expiry
+        token_cache.set(token, claims, ttl=min(settings.AUTH_CACHE_TTL, claims["exp"] - now))
+    return claims["sub"]
+
+
+def cached_user_snapshot(user_id: int) -> Optional[UserSnapshot]:
+    """The cached snapshot, or None on a miss; never touches the database."""
+    data = user_cache.get(user_id)
+    return UserSnapshot(**data) if data else None
+
+
+def get_user_snapshot(db: Session, user_id: int) -> Optional[UserSnapshot]:
+    """Cached user lookup; only queries the database on a miss. Unknown users are not cached."""
+    def load() -> Optional[dict]:
+        user = db.query(User).filter(User.id == user_id).first()
+        return UserSnapshot.from_user(user).to_dict() if user else None
+
+    data = user_cache.get_or_set(user_id, load)
+    return UserSnapshot(**data) if data else None
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Drop a user's snapshot in every worker (with a shared CACHE_BACKEND; the memory backend
+    only reaches this process, other workers catch up within AUTH_CACHE_TTL). Call it after
+    committing a role, password or verification change, and after any Core UPDATE of users,
+    which the ORM hooks below do not see.
+    """
+    user_cache.invalidate(user_id)
+
+
+# -------------------- Invalidation on commit --------------------
+# Any committed ORM change to a users row (profile edits, deletes...) drops that user's
+# snapshot in every worker; security-relevant changes also call invalidate_user explicitly.
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = session.info.setdefault("auth_cache_user_ids", set())
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop("auth_cache_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changed_users(session: Session, previous_transaction) -> None:
+    session.info.pop("auth_cache_user_ids", None)
@@ -0,0 +1,371 @@
+# app/core/cache.py
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+    Tracks hit / miss / eviction / expiration counters for the metrics endpoint.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    _MISSING = object()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Read-through: return the cached value or load, store and return it."""
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# -------------------- Shared cache backends --------------------
+# A backend stores JSON-serializable values so that every uvicorn worker (and node)
+# sees the same entries. Selected with settings.CACHE_BACKEND.
+
+class CacheBackend(ABC):
+    """Key/value store interface shared by all workers."""
+
+    # False when entries only live in this process (values then stay in the local LRU)
+    shared = True
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key])[0]
+
+    @abstractmethod
+    def get_many(self, keys: list) -> list:
+        """Values for `keys`, None where missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a JSON-serializable value, for `ttl` seconds or without expiry."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key (no error if it is missing)."""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter (missing keys start at 0) and return it."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every key of this backend (its prefix only, for shared stores)."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local backend: the default for a single worker."""
+
+    shared = False
+
+    def __init__(self):
+        self._data: dict = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list) -> list:
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                expires_at, value = self._data.get(key, (None, None))
+                if expires_at is not None and expires_at < now:
+                    del self._data[key]
+                    value = None
+                values.append(value)
+            return values
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            _, value = self._data.get(key, (None, 0))
+            self._data[key] = (None, value + 1)
+            return value + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Backend in a local SQLite file (WAL mode), shared by the workers of one node."""
+
+    def __init__(self, path: str, prefix: str = ""):
+        self.path = path
+        self.prefix = prefix
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def _conn(self) -> "sqlite3.Connection":
+        # sqlite3 connections are per-thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: list) -> list:
+        full_keys = [self.prefix + k for k in keys]
+        placeholders = ",".join("?" * len(full_keys))
+        rows = self._conn().execute(
+            f"SELECT key, value, expires_at FROM cache_entries WHERE key IN ({placeholders})",
+            full_keys,
+        ).fetchall()
+        now = time.time()
+        found = {k: json.loads(v) for k, v, expires_at in rows if expires_at is None or expires_at >= now}
+        return [found.get(k) for k in full_keys]
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (self.prefix + key, json.dumps(value), time.time() + ttl if ttl else None),
+        )
+        # Opportunistically purge expired rows so the file does not grow without bound
+        if random.random() < 0.01:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (self.prefix + key,))
+
+    def incr(self, key: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, '1', NULL) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT)",
+                (self.prefix + key,),
+            )
+            (value,) = conn.execute(
+                "SELECT value FROM cache_entries WHERE key = ?", (self.prefix + key,)
+            ).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return int(value)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE key LIKE ?", (self.prefix + "%",))
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend speaking the Redis protocol (Redis, Valkey, KeyDB, fakeredis...), shared across nodes."""
+
+    def __init__(self, url: str, prefix: str = "", client: Any = None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: list) -> list:
+        values = self.client.mget([self.prefix + k for k in keys])
+        return [json.loads(v) if v is not None else None for v in values]
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self) -> None:
+        batch = []
+        for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+
+_backend: CacheBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def create_cache_backend(kind: str, url: str = "", prefix: str = "") -> CacheBackend:
+    if kind == "memory":
+        return MemoryCacheBackend()
+    if kind == "sqlite":
+        return SQLiteCacheBackend(url or "cache.sqlite3", prefix=prefix)
+    if kind == "redis":
+        return RedisCacheBackend(url or "redis://localhost:6379/0", prefix=prefix)
+    raise ValueError(f"Unknown CACHE_BACKEND {kind!r}. Allowed: memory, sqlite, redis")
+
+
+def get_cache_backend() -> CacheBackend:
+    """Process-wide backend configured by settings.CACHE_BACKEND / CACHE_URL."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from app.core.config import settings
+                _backend = create_cache_backend(
+                    settings.CACHE_BACKEND, settings.CACHE_URL, settings.CACHE_KEY_PREFIX
+                )
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Swap the process-wide backend (e.g. a fakeredis-backed RedisCacheBackend)."""
+    global _backend
+    _backend = backend
+
+
+# -------------------- Version-stamped caches --------------------
+
+class VersionedCache:
+    """
+    Read-through cache namespace stored in the shared backend, fronted by a local LRU.
+
+    Entries are keyed by a namespace version and a per-key version held in the backend.
+    Invalidating bumps a version, so every worker stops seeing the old entries on its next
+    read (one backend round trip) without any pub/sub fan-out; stale entries age out by TTL.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.ttl = ttl
+        self.local = LRUCache(name, maxsize=maxsize, ttl=ttl)
+
+    @property
+    def backend(self) -> CacheBackend:
+        return get_cache_backend()
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        raw = key if isinstance(key, str) else repr(key)
+        return hashlib.sha1(raw.encode()).hexdigest() if len(raw) > 64 else raw
+
+    def _versioned_key(self, key: str) -> str:
+        namespace_version, key_version = self.backend.get_many(
+            [f"{self.name}:version", f"{self.name}:version:{key}"]
+        )
+        return f"{self.name}:{namespace_version or 0}.{key_version or 0}:{key}"
+
+    def get(self, key: Hashable) -> Any:
+        """The cached value, or None on a miss (nothing is loaded)."""
+        backend = self.backend
+        full_key = self._versioned_key(self._key(key))
+        value = self.local.get(full_key)
+        if value is None and backend.shared:
+            value = backend.get(full_key)
+            if value is not None:
+                self.local.set(full_key, value)
+        return value
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        backend = self.backend
+        full_key = self._versioned_key(self._key(key))
+        value = self.local.get(full_key, LRUCache._MISSING)
+        if value is not LRUCache._MISSING:
+            return value
+        value = backend.get(full_key) if backend.shared else None
+        if value is None:
+            value = loader()
+            if value is None:
+                return None  # negative results are not cached: the row may appear any moment
+            if backend.shared:
+                backend.set(full_key, value, ttl=self.ttl)
+        self.local.set(full_key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Invalidate one key in every worker."""
+        self.backend.incr(f"{self.name}:version:{self._key(key)}")
+
+    def invalidate_all(self) -> int:
+        """Invalidate the whole namespace in every worker; returns the new version."""
+        return self.backend.incr(f"{self.name}:version")
+
+    def version(self) -> int:
+        return self.backend.get(f"{self.name}:version") or 0
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "backend": type(self.backend).__name__}
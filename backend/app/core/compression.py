@@ -0,0 +1,293 @@
+# app/core/compression.py
+import asyncio
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_cache import negotiate_encoding
+
+
+# Bodies at least this large are compressed in a worker thread instead of on the event loop
+THREAD_MIN_BYTES = 512 * 1024
+
+# Already compressed (or not worth it): passed through untouched
+SKIP_TYPES = ("image/", "video/", "audio/", "font/woff", "font/woff2")
+SKIP_MEDIA_TYPES = {
+    "application/gzip", "application/x-gzip", "application/zip", "application/zstd",
+    "application/x-brotli", "application/pdf", "application/octet-stream",
+    "text/event-stream",  # per-event flushing is the client's business
+}
+
+
+# -------------------- Codecs --------------------
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        import brotli
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+CODECS: Dict[str, Callable] = {"zstd": _ZstdCompressor, "br": _BrotliCompressor, "gzip": _GzipCompressor}
+CODEC_MODULES = {"zstd": "zstandard", "br": "brotli", "gzip": "zlib"}
+
+
+def available_encodings(preferred: List[str]) -> List[str]:
+    """The configured codings, in preference order, whose (optional) package is installed."""
+    encodings = []
+    for encoding in preferred:
+        encoding = encoding.strip().lower()
+        if encoding not in CODECS:
+            continue
+        try:
+            __import__(CODEC_MODULES[encoding])
+        except ImportError:
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+def default_levels() -> Dict[str, int]:
+    return {
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_LEVEL,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+    }
+
+
+def compression(enabled: bool = True, gzip: Optional[int] = None, br: Optional[int] = None, zstd: Optional[int] = None):
+    """
+    Route dependency overriding the compression middleware for the route's responses, e.g.
+    `dependencies=[Depends(compression(gzip=1, br=1, zstd=1))]` for cheap, fast streaming, or
+    `compression(enabled=False)`. Unset levels keep the configured defaults.
+    """
+    levels = {name: level for name, level in (("gzip", gzip), ("br", br), ("zstd", zstd)) if level is not None}
+
+    def dependency(request: Request) -> None:
+        request.state.compression = {"enabled": enabled, "levels": levels}
+
+    return dependency
+
+
+# -------------------- Metrics --------------------
+
+class CompressionMetrics:
+    """Per-coding byte counters and skip reasons, served on /admin/metrics/compression."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encodings: Dict[str, Dict[str, int]] = {}
+        self.skipped: Dict[str, int] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, streamed: bool) -> None:
+        with self._lock:
+            counters = self.encodings.setdefault(
+                encoding, {"responses": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0},
+            )
+            counters["responses"] += 1
+            counters["streamed"] += int(streamed)
+            counters["bytes_in"] += bytes_in
+            counters["bytes_out"] += bytes_out
+
+    def skip(self, reason: str) -> None:
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            encodings = {
+                name: {
+                    **counters,
+                    "bytes_saved": counters["bytes_in"] - counters["bytes_out"],
+                    "ratio": counters["bytes_out"] / counters["bytes_in"] if counters["bytes_in"] else 1.0,
+                }
+                for name, counters in self.encodings.items()
+            }
+            return {
+                "bytes_saved": sum(c["bytes_saved"] for c in encodings.values()),
+                "encodings": encodings,
+                "skipped": dict(self.skipped),
+            }
+
+
+compression_metrics = CompressionMetrics()
+
+
+# -------------------- Middleware --------------------
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding the client accepts (zstd, br, gzip by default).
+
+    - Bodies under `minimum_size`, already-encoded responses, partial content, `no-transform`
+      and already-compressed media types (images, archives...) pass through untouched.
+    - Streaming responses are compressed chunk by chunk, each chunk flushed so bytes leave at
+      once; a single-body response is compressed in one go (in a thread when large) and kept
+      uncompressed if that does not make it smaller.
+    - Routes pick their own levels, or opt out, with the `compression(...)` dependency.
+    - ETags become weak: the bytes differ from the identity representation.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None, encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+        self.encodings = available_encodings(encodings or settings.COMPRESSION_ENCODINGS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        await _CompressionResponder(self.app, scope, encoding, self.minimum_size)(receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, scope: Scope, encoding: str, minimum_size: int):
+        self.app = app
+        self.scope = scope
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def __call__(self, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(self.scope, receive, self.send_compressed)
+
+    def _skip_reason(self, headers: Headers) -> Optional[str]:
+        options = self.scope.get("state", {}).get("compression") or {}
+        if not options.get("enabled", True):
+            return "disabled"
+        if self.start["status"] < 200 or self.start["status"] in (204, 206, 304):
+            return "status"
+        if "content-encoding" in headers or "content-range" in headers:
+            return "encoded"
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return "no_transform"
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type.startswith(SKIP_TYPES) or media_type in SKIP_MEDIA_TYPES:
+            return "content_type"
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return "too_small"
+        return None
+
+    def _compressor(self):
+        options = self.scope.get("state", {}).get("compression") or {}
+        level = options.get("levels", {}).get(self.encoding, default_levels()[self.encoding])
+        return CODECS[self.encoding](level)
+
+    def _compressed_headers(self, content_length: Optional[int]) -> List:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        return headers.raw
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message  # held until the first body chunk shows what we are dealing with
+            reason = self._skip_reason(Headers(raw=message["headers"]))
+            if reason:
+                compression_metrics.skip(reason)
+                self.passthrough = True
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and not more_body:
+            # The whole body in one message
+            if len(body) < self.minimum_size:
+                compression_metrics.skip("too_small")
+                await self.send(self.start)
+                await self.send(message)
+                return
+            compressor = self._compressor()
+            if len(body) >= THREAD_MIN_BYTES:
+                compressed = await asyncio.to_thread(lambda: compressor.compress(body) + compressor.finish())
+            else:
+                compressed = compressor.compress(body) + compressor.finish()
+            if len(compressed) >= len(body):
+                compression_metrics.skip("incompressible")
+                await self.send(self.start)
+                await self.send(message)
+                return
+            compression_metrics.record(self.encoding, len(body), len(compressed), streamed=False)
+            self.start["headers"] = self._compressed_headers(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if self.compressor is None:
+            # First chunk of a streamed body: the length is unknown, so commit to compressing
+            self.compressor = self._compressor()
+            self.start["headers"] = self._compressed_headers(None)
+            await self.send(self.start)
+
+        self.bytes_in += len(body)
+        chunk = self.compressor.compress(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        self.bytes_out += len(chunk)
+        if not more_body:
+            compression_metrics.record(self.encoding, self.bytes_in, self.bytes_out, streamed=True)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -26,8 +26,29 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
     ACCESS_CODE_EXPIRE_MINUTES = 30
 
+    # Password hashing (bcrypt runs in a dedicated process pool; 0 workers = inline)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 64))
+
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
+    # Async routes; derived from DATABASE_URL (aiosqlite / asyncpg driver) when unset
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Connection pool (per worker process)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds; -1 disables
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Postgres session settings
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))  # 0 disables
+    DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "shop-api")
+    # SQLite pragmas
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # negative = KiB (64 MB)
 
     # Frontend (for email links)
     FRONTEND_URL = os.getenv("FRONTEND_URL", f"http://{get_local_ip()}:3000")
@@ -46,6 +67,19 @@ class Settings:
     SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
     SMTP_SSL = os.getenv("SMTP_SSL", "false").lower() == "true"
 
+    # Email outbox worker (runs inside each API process unless disabled)
+    EMAIL_WORKER_ENABLED = os.getenv("EMAIL_WORKER_ENABLED", "true").lower() == "true"
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+    EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 5))  # seconds
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 8))
+    EMAIL_RETRY_BASE_DELAY = float(os.getenv("EMAIL_RETRY_BASE_DELAY", 30))  # seconds, doubled per attempt
+    EMAIL_RETRY_MAX_DELAY = float(os.getenv("EMAIL_RETRY_MAX_DELAY", 3600))
+    EMAIL_CLAIM_TIMEOUT = float(os.getenv("EMAIL_CLAIM_TIMEOUT", 300))  # reclaim rows of a crashed worker
+    EMAIL_SMTP_CONNECTIONS = int(os.getenv("EMAIL_SMTP_CONNECTIONS", 2))
+    EMAIL_SMTP_TIMEOUT = float(os.getenv("EMAIL_SMTP_TIMEOUT", 30))
+    EMAIL_SMTP_IDLE_TIMEOUT = float(os.getenv("EMAIL_SMTP_IDLE_TIMEOUT", 60))  # close unused connections
+    EMAIL_DEDUPE_WINDOW = int(os.getenv("EMAIL_DEDUPE_WINDOW", 120))  # seconds; one verify / reset email per user
+
     # AI Models
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-base-en-v1.5")
@@ -63,10 +97,70 @@ class Settings:
     # Storage
     CHROMA_DB_DIR = os.getenv("CHROMA_DB_DIR", "backend/app/chroma_db")
 
+    # -------------------- Caching --------------------
+    CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 2048))  # entries per cache
+    CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 300))  # seconds
+    # Shared backend so invalidations reach every worker: memory | sqlite | redis
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_URL = os.getenv("CACHE_URL", "")  # SQLite file path or redis:// URL
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "shop:")
+    # Verified-token and user-snapshot cache for get_current_user
+    AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 60))  # seconds
+
+    # -------------------- Checkout --------------------
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))  # Idempotency-Key replay window
+    STOCK_HOLD_TTL = int(os.getenv("STOCK_HOLD_TTL", 900))  # seconds a cart line holds its stock
+    STOCK_HOLD_SWEEP_INTERVAL = float(os.getenv("STOCK_HOLD_SWEEP_INTERVAL", 60))  # seconds
+
+    # -------------------- Export --------------------
+    EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))  # rows fetched and encoded per chunk
+    EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", 6))
+
+    # -------------------- Import --------------------
+    IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 1000))  # rows validated and upserted per transaction
+    IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", 100 * 1024 * 1024))
+    IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 500))  # row errors kept on the job
+
     # -------------------- Uploads --------------------
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")  # folder for uploaded images
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    UPLOAD_CACHE_MAX_AGE = int(os.getenv("UPLOAD_CACHE_MAX_AGE", 31536000))  # content-addressed files never change
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))  # per image, enforced while streaming
+    UPLOAD_UNCLAIMED_TTL = int(os.getenv("UPLOAD_UNCLAIMED_TTL", 86400))  # seconds an upload nothing uses is kept
+    UPLOAD_SWEEP_INTERVAL = float(os.getenv("UPLOAD_SWEEP_INTERVAL", 3600))  # seconds
+    # Where uploads live: local (UPLOAD_DIR, served at /uploads) | s3 (any S3-compatible bucket)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.getenv("S3_BUCKET", "")
+    S3_PREFIX = os.getenv("S3_PREFIX", "")  # key prefix inside the bucket
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")  # MinIO / R2 / moto server; empty for AWS
+    S3_REGION = os.getenv("S3_REGION", "")
+    S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL", "")  # public bucket or CDN; presigned GETs otherwise
+    S3_URL_EXPIRES = int(os.getenv("S3_URL_EXPIRES", 3600))  # seconds presigned URLs stay valid
+
+    # -------------------- Response compression --------------------
+    COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")  # server preference order
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))  # smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_LEVEL = int(os.getenv("COMPRESSION_BROTLI_LEVEL", 4))  # 0-11; high levels are for static assets
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+    # -------------------- Frontend --------------------
+    # Write .br / .gz siblings of the built frontend's text assets at startup (when missing or stale)
+    FRONTEND_PRECOMPRESS = os.getenv("FRONTEND_PRECOMPRESS", "true").lower() == "true"
+    FRONTEND_BROTLI_QUALITY = int(os.getenv("FRONTEND_BROTLI_QUALITY", 11))
+    FRONTEND_CACHE_MAX_AGE = int(os.getenv("FRONTEND_CACHE_MAX_AGE", 31536000))  # hashed assets under assets/
+
+    # -------------------- Image variants --------------------
+    # Resized copies of product images, written under UPLOAD_DIR/IMAGE_VARIANT_DIR
+    IMAGE_VARIANT_DIR = os.getenv("IMAGE_VARIANT_DIR", "variants")
+    IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,320,640,1280").split(",")]
+    IMAGE_VARIANT_FORMATS = os.getenv("IMAGE_VARIANT_FORMATS", "webp,jpeg").split(",")  # "avif" needs Pillow AVIF support
+    IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+    IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 82))
+    IMAGE_AVIF_QUALITY = int(os.getenv("IMAGE_AVIF_QUALITY", 55))
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))  # processes; 0 = resize in the calling thread
 
 
 settings = Settings()
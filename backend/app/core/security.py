@@ -1,24 +1,110 @@
 # app/core/security.py
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
 
 ALGORITHM = "HS256"
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Hashes made with other rounds are flagged by needs_update
+# and transparently re-hashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+# ---------------- Password Worker Pool ----------------
+# bcrypt is CPU-bound (~100-300ms per call). It runs in a dedicated, size-limited process
+# pool so login storms use every core and never starve the request threadpool. At most
+# PASSWORD_HASH_QUEUE_LIMIT calls may be queued or running; beyond that callers get
+# PasswordHasherBusy, which the app turns into a 503.
+
+class PasswordHasherBusy(Exception):
+    """The password worker pool queue is full."""
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _executor
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            # Pool disabled: run inline
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+# Executed in the worker processes
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
 
 
 # ---------------- Password Helpers ----------------
 def get_password_hash(password: str) -> str:
     """Hash a password for storing in the database."""
-    return pwd_context.hash(password)
+    return _submit(_hash, password).result()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hashed version."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit(_verify_and_update, plain_password, hashed_password).result()[0]
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash when the stored one needs an upgrade."""
+    return _submit(_verify_and_update, plain_password, hashed_password).result()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Like get_password_hash, without blocking the event loop or a threadpool thread."""
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Like verify_and_update_password, without blocking the event loop or a threadpool thread."""
+    return await asyncio.wrap_future(_submit(_verify_and_update, plain_password, hashed_password))
 
 
 # ---------------- Token Helpers ----------------
@@ -0,0 +1,229 @@
+# app/core/static_files.py
+import gzip
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.http_cache import is_not_modified, negotiate_encoding
+from app.core.storage import immutable_cache_control
+from app.services.upload_service import content_hash
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serves UPLOAD_DIR. Content-addressed files (a SHA-256 in the path) can never change, so
+    they are cacheable for a year without revalidation and get a strong ETag derived from
+    the hash. Legacy files stored by name keep revalidating.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        # In-progress uploads are never served
+        if path.replace("\\", "/").split("/")[0] == ".tmp":
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        if content_hash(relative_path):
+            # The file name holds the hash (plus variant width / format), so it identifies the bytes
+            response.headers["etag"] = f'"{os.path.basename(relative_path)}"'
+            response.headers["cache-control"] = immutable_cache_control()
+        else:
+            response.headers["cache-control"] = "public, no-cache"
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+# -------------------- Frontend bundle --------------------
+
+# Precompressed siblings, in server preference order: (Content-Encoding, file suffix)
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+PRECOMPRESS_MIN_BYTES = 1024
+# Files up to this size are kept in memory (the index.html shell among them)
+MEMORY_MAX_BYTES = 64 * 1024
+COMPRESSIBLE_TYPES = {
+    "application/javascript", "application/json", "application/manifest+json",
+    "application/xml", "application/wasm", "image/svg+xml", "image/x-icon",
+}
+# Vite output under assets/ carries a content hash: "index-B6xR2_kQ.js"
+HASHED_ASSET = re.compile(r"^assets/.+-[\w-]{8,}\.\w+$")
+MEDIA_TYPES = {".webmanifest": "application/manifest+json", ".js": "application/javascript", ".mjs": "application/javascript"}
+
+
+def _media_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return MEDIA_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def _compress(encoding: str, data: bytes) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None  # no brotli package: gzip only
+    return brotli.compress(data, quality=settings.FRONTEND_BROTLI_QUALITY)
+
+
+def precompress_directory(directory: str) -> int:
+    """
+    Write .br / .gz siblings for the compressible files of a build directory, skipping the ones
+    already present and newer than their source (e.g. produced at build time). A compressed
+    copy that would not be smaller is not written. Returns the number of files written.
+    """
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(tuple(suffix for _, suffix in PRECOMPRESSED)) or not _compressible(_media_type(name)):
+                continue
+            try:
+                stat_result = os.stat(path)
+                if stat_result.st_size < PRECOMPRESS_MIN_BYTES:
+                    continue
+                data = None
+                for encoding, suffix in PRECOMPRESSED:
+                    target = path + suffix
+                    if os.path.exists(target) and os.stat(target).st_mtime >= stat_result.st_mtime:
+                        continue
+                    if data is None:
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    compressed = _compress(encoding, data)
+                    if compressed is None or len(compressed) >= len(data):
+                        continue
+                    with open(target + ".tmp", "wb") as f:
+                        f.write(compressed)
+                    os.replace(target + ".tmp", target)
+                    written += 1
+            except OSError as e:
+                print(f"❌ Could not precompress {path}: {e}")
+    return written
+
+
+class _StaticVariant:
+    """One stored representation of a file (identity, br or gzip)."""
+
+    __slots__ = ("path", "stat_result", "etag", "body")
+
+    def __init__(self, path: str, stat_result: os.stat_result, suffix: str = ""):
+        self.path = path
+        self.stat_result = stat_result
+        self.etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}{suffix}"'
+        self.body = None
+        if stat_result.st_size <= MEMORY_MAX_BYTES:
+            with open(path, "rb") as f:
+                self.body = f.read()
+
+
+class _StaticAsset:
+    __slots__ = ("media_type", "cache_control", "variants")
+
+    def __init__(self, media_type: str, cache_control: str, variants: dict):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants  # Content-Encoding (None for identity) -> _StaticVariant
+
+
+class FrontendStaticFiles:
+    """
+    Serves the built Vite frontend. The directory is scanned once at startup into an in-memory
+    table (stat results, ETags, precompressed siblings, small file bodies), so a request costs
+    no filesystem stat, and the index.html shell none at all.
+
+    - `.br` / `.gz` siblings are served by Accept-Encoding (with Vary), written at startup if missing.
+    - Hashed files under assets/ are cached for a year as immutable; everything else revalidates.
+    - Paths without a file extension that match no file get index.html (client-side routes).
+    - Range and If-Range requests are honoured for files served from disk.
+
+    The table is not refreshed: restart after rebuilding the frontend.
+    """
+
+    def __init__(self, directory: str, precompress: bool = True, index: str = "index.html"):
+        self.directory = os.path.realpath(directory)
+        self.index = index
+        if precompress:
+            written = precompress_directory(self.directory)
+            if written:
+                print(f"✅ Precompressed {written} frontend files")
+        self.assets = self._scan()
+
+    def _scan(self) -> dict:
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            names = set(files)
+            for name in files:
+                if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in PRECOMPRESSED):
+                    continue  # a sibling, served through its source file
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                variants = {None: _StaticVariant(path, os.stat(path))}
+                for encoding, suffix in PRECOMPRESSED:
+                    if name + suffix in names:
+                        variants[encoding] = _StaticVariant(path + suffix, os.stat(path + suffix), f"-{encoding}")
+                if HASHED_ASSET.match(key):
+                    cache_control = f"public, max-age={settings.FRONTEND_CACHE_MAX_AGE}, immutable"
+                else:
+                    cache_control = "no-cache"
+                assets[key] = _StaticAsset(_media_type(name), cache_control, variants)
+        return assets
+
+    def lookup(self, path: str) -> Optional[_StaticAsset]:
+        key = path.lstrip("/")
+        if key == "" or key.endswith("/"):
+            key += self.index
+        asset = self.assets.get(key)
+        if asset is None and "." not in key.rsplit("/", 1)[-1]:
+            asset = self.assets.get(self.index)
+        return asset
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+            return await response(scope, receive, send)
+
+        root_path = scope.get("root_path", "")
+        path = scope["path"][len(root_path):] if scope["path"].startswith(root_path) else scope["path"]
+        asset = self.lookup(path)
+        if asset is None:
+            return await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+
+        request = Request(scope)
+        encodings = [encoding for encoding in asset.variants if encoding is not None]
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), encodings) if encodings else None
+        variant = asset.variants[encoding]
+        headers = {"ETag": variant.etag, "Cache-Control": asset.cache_control}
+        if encodings:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if is_not_modified(request, variant.etag):
+            response = Response(status_code=304, headers=headers)
+        elif variant.body is not None:
+            response = Response(variant.body, media_type=asset.media_type, headers=headers)
+        else:
+            response = FileResponse(variant.path, stat_result=variant.stat_result, media_type=asset.media_type, headers=headers)
+        await response(scope, receive, send)
@@ -0,0 +1,271 @@
+# app/core/storage.py
+import base64
+import glob
+from abc import ABC, abstractmethod
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from app.core.config import settings
+
+
+def immutable_cache_control() -> str:
+    """Cache-Control for content-addressed objects: the key identifies the bytes, so they never change."""
+    return f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE}, immutable"
+
+
+class StorageBackend(ABC):
+    """
+    Where uploads live. Keys are relative paths such as "ab/cd/<sha256>.jpg" or
+    "variants/ab/cd/<sha256>.jpg.320w.webp"; they are what the database stores.
+    """
+
+    # Local directory for files on their way into storage (same filesystem as a local backend)
+    staging_dir: str
+
+    @abstractmethod
+    def put_file(self, key: str, path: str, content_type: Optional[str] = None, cache_control: Optional[str] = None) -> None:
+        """Move the local file at `path` into storage under `key` (the local file is consumed)."""
+
+    @abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """Size of a stored object in bytes, or None if it does not exist."""
+
+    def exists(self, key: str) -> bool:
+        return self.size(key) is not None
+
+    def checksum_sha256(self, key: str) -> Optional[str]:
+        """Hex SHA-256 the backend verified when the object was uploaded directly, if any."""
+        return None
+
+    @abstractmethod
+    def read_head(self, key: str, length: int) -> bytes:
+        """The first `length` bytes of an object (for type sniffing)."""
+
+    @abstractmethod
+    def local_copy(self, key: str):
+        """Context manager yielding a local file path that holds the object inside the `with` block."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete an object (no error if it does not exist)."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every object whose key starts with `prefix`."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """URL a browser downloads the object from."""
+
+    def presigned_upload(self, key: str, content_type: str, size: int, sha256: str) -> Optional[dict]:
+        """
+        {"method", "url", "headers"} for a browser to upload the object directly, or None when
+        the backend has no direct uploads (clients then post the file to the API).
+        """
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Files under a local directory (UPLOAD_DIR), served by the app at `base_url`."""
+
+    def __init__(self, root: str, base_url: str = "/uploads"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.staging_dir = os.path.join(root, ".tmp")  # same filesystem, so put_file is an atomic rename
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != os.path.normpath(self.root):
+            raise ValueError(f"Storage key outside the upload directory: {key!r}")
+        return path
+
+    def put_file(self, key: str, path: str, content_type: Optional[str] = None, cache_control: Optional[str] = None) -> None:
+        final_path = self._path(key)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(path, final_path)
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self._path(key))
+        except OSError:
+            return None
+
+    def read_head(self, key: str, length: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read(length)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        yield self._path(key)
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for path in glob.glob(glob.escape(self._path(prefix)) + "*"):
+            os.remove(path)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible bucket (AWS S3, MinIO, R2, moto...). Browsers upload and download directly
+    with presigned URLs, or read through S3_PUBLIC_BASE_URL (a public bucket or CDN), so app
+    nodes never proxy image bytes.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        public_base_url: str = "",
+        url_expires: int = 3600,
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError as e:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package") from e
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url or None,
+                region_name=region or None,
+                config=Config(signature_version="s3v4"),  # presigned URLs then sign the checksum header
+            )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.public_base_url = public_base_url.rstrip("/")
+        self.url_expires = url_expires
+        self.staging_dir = os.path.join(tempfile.gettempdir(), "shop-uploads")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _missing(self, error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put_file(self, key: str, path: str, content_type: Optional[str] = None, cache_control: Optional[str] = None) -> None:
+        extra = {}
+        if content_type:
+            extra["ContentType"] = content_type
+        if cache_control:
+            extra["CacheControl"] = cache_control
+        self.client.upload_file(path, self.bucket, self._key(key), ExtraArgs=extra)
+        os.remove(path)
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+        except Exception as e:
+            if self._missing(e):
+                return None
+            raise
+
+    def checksum_sha256(self, key: str) -> Optional[str]:
+        head = self.client.head_object(Bucket=self.bucket, Key=self._key(key), ChecksumMode="ENABLED")
+        checksum = head.get("ChecksumSHA256")
+        if not checksum or "-" in checksum:  # multipart checksums are checksums of parts
+            return None
+        return base64.b64decode(checksum).hex()
+
+    def read_head(self, key: str, length: int) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes=0-{length - 1}")
+        return response["Body"].read()
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        fd, path = tempfile.mkstemp(dir=self.staging_dir, suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._key(key), path)
+            yield path
+        finally:
+            os.remove(path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def delete_prefix(self, prefix: str) -> None:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:  # a listing page holds at most 1000 keys, the DeleteObjects limit
+                self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{self._key(key)}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._key(key)}, ExpiresIn=self.url_expires,
+        )
+
+    def presigned_upload(self, key: str, content_type: str, size: int, sha256: str) -> Optional[dict]:
+        # The checksum is signed, so S3 rejects any body whose SHA-256 differs from the key's hash
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        params = {
+            "Bucket": self.bucket,
+            "Key": self._key(key),
+            "ContentType": content_type,
+            "ContentLength": size,
+            "ChecksumSHA256": checksum,
+            "CacheControl": immutable_cache_control(),
+        }
+        url = self.client.generate_presigned_url("put_object", Params=params, ExpiresIn=self.url_expires)
+        headers = {
+            "Content-Type": content_type,
+            "Cache-Control": params["CacheControl"],
+            "x-amz-checksum-sha256": checksum,
+        }
+        return {"method": "PUT", "url": url, "headers": headers}
+
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(kind: str) -> StorageBackend:
+    if kind == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+    if kind == "s3":
+        if not settings.S3_BUCKET:
+            raise ValueError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return S3Storage(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            public_base_url=settings.S3_PUBLIC_BASE_URL,
+            url_expires=settings.S3_URL_EXPIRES,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND {kind!r}. Allowed: local, s3")
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide upload storage configured by settings.STORAGE_BACKEND."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage(settings.STORAGE_BACKEND)
+    return _storage
+
+
+def set_storage(storage: StorageBackend) -> None:
+    """Swap the process-wide storage (e.g. an S3Storage on a moto or MinIO client)."""
+    global _storage
+    _storage = storage
@@ -9,3 +9,9 @@ from app.models import product
 from app.models import order
 from app.models import review
 from app.models import order_item
+from app.models import sales_rollup
+from app.models import email_outbox
+from app.models import idempotency_key
+from app.models import stock_reservation
+from app.models import import_job
+from app.models import upload_blob
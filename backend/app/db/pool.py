@@ -0,0 +1,163 @@
+# app/db/pool.py
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+
+# -------------------- Pool metrics --------------------
+
+class PoolMetrics:
+    """Checkout / wait / timeout counters for a connection pool, served on /admin/metrics/db-pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0  # checkouts that had to wait for a free connection
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            # A checkout served straight from the queue takes microseconds
+            if seconds >= 0.001:
+                self.waits += 1
+                self.wait_seconds_total += seconds
+                self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self, pool=None) -> dict:
+        with self._lock:
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": self.wait_seconds_total / self.waits if self.waits else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+        if pool is not None:
+            data["pool"] = type(pool).__name__
+            if isinstance(pool, QueuePool):
+                data.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=pool.overflow(),
+                    max_overflow=pool._max_overflow,
+                )
+        return data
+
+
+pool_metrics = PoolMetrics()  # sync engine (threadpool routes, scripts)
+async_pool_metrics = PoolMetrics()  # async engine (async routes)
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+
+class MeteredAsyncAdaptedQueuePool(MeteredQueuePool, AsyncAdaptedQueuePool):
+    """MeteredQueuePool for asyncio drivers (aiosqlite, asyncpg)."""
+
+    metrics = async_pool_metrics
+
+
+def instrument_pool(engine: Engine, metrics: PoolMetrics = pool_metrics) -> None:
+    """Count connects / checkouts / checkins / invalidations on the engine's pool."""
+    event.listen(engine, "connect", lambda *_: metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *_: metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *_: metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *_: metrics.incr("invalidations"))
+
+
+# -------------------- Per-dialect engine tuning --------------------
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine() / create_async_engine() keyword arguments for the configured pool and dialect."""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:")):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        return options
+    options.update(
+        poolclass=MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if url.startswith("sqlite"):
+        # Pooled connections are shared across threadpool workers
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    elif url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"server_settings": {"application_name": settings.DB_APPLICATION_NAME}}
+    elif url.startswith("postgresql"):
+        options["connect_args"] = {"application_name": settings.DB_APPLICATION_NAME}
+    return options
+
+
+def _sqlite_on_connect(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed while a writer commits; NORMAL is durable under WAL
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    finally:
+        cursor.close()
+
+
+def _postgres_on_connect(dbapi_connection, connection_record) -> None:
+    if not settings.DB_STATEMENT_TIMEOUT_MS:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"SET statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+    # Keep the SET outside the first transaction's rollback
+    dbapi_connection.commit()
+
+
+def install_connect_hooks(engine: Engine) -> None:
+    """Apply per-connection pragmas / session settings for the engine's dialect."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        event.listen(engine, "connect", _sqlite_on_connect)
+    elif dialect == "postgresql":
+        event.listen(engine, "connect", _postgres_on_connect)
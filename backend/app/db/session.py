@@ -1,10 +1,23 @@
 # app/db/session.py
+import functools
+from typing import AsyncGenerator, Callable, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base import Base  # ✅ import the shared Base
+from app.db.pool import async_pool_metrics, engine_options, install_connect_hooks, instrument_pool
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, future=True, echo=False)
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    future=True,
+    echo=False,
+    **engine_options(settings.SQLALCHEMY_DATABASE_URI),
+)
+install_connect_hooks(engine)
+instrument_pool(engine)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
@@ -15,3 +28,54 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# -------------------- Async engine --------------------
+# Async routes use this engine so a request waiting on the database holds no thread.
+# The sync engine above stays for sync routes, scripts and background workers.
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """Same database as `url`, through its asyncio driver."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URI = settings.ASYNC_DATABASE_URI or async_database_url(settings.SQLALCHEMY_DATABASE_URI)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URI, echo=False, **engine_options(ASYNC_DATABASE_URI, is_async=True))
+install_connect_hooks(async_engine.sync_engine)
+instrument_pool(async_engine.sync_engine, async_pool_metrics)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def async_service(fn: Callable, out: Optional[type] = None) -> Callable:
+    """
+    Async version of a sync service function `fn(db, ...)`, called with an AsyncSession.
+    `fn` runs on the session's greenlet bridge, so each query awaits the async driver instead
+    of blocking a thread. Results are validated into `out` (a Pydantic schema) on the bridge too,
+    because lazy-loaded relationships cannot be read outside it.
+    """
+
+    def call(session, *args, **kwargs):
+        result = fn(session, *args, **kwargs)
+        if out is None:
+            return result
+        if isinstance(result, list):
+            return [out.model_validate(item) for item in result]
+        return out.model_validate(result)
+
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(call, *args, **kwargs)
+
+    return wrapper
@@ -1,9 +1,16 @@
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.static_files import FrontendStaticFiles, UploadStaticFiles
+from app.core.security import PasswordHasherBusy, shutdown_password_pool
+from app.services.email_service import email_worker
+from app.services.reservation_service import reservation_sweeper
+from app.services.upload_service import upload_sweeper
+from app.services.image_service import shutdown_image_pool
 from app.db.session import engine
 from app.db.base import Base
 
@@ -12,9 +19,15 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.order import Order
 from app.models.review import Review
+from app.models.sales_rollup import SalesDaily, SalesDailyProduct, SalesDailyCategory
+from app.models.email_outbox import EmailOutbox
+from app.models.idempotency_key import IdempotencyKey
+from app.models.stock_reservation import StockReservation
+from app.models.import_job import ImportJob
+from app.models.upload_blob import UploadBlob
 
 # Import routers
-from app.api.routes import auth, users, products, orders, reviews, uploads, cart
+from app.api.routes import auth, users, products, orders, reviews, uploads, cart, analytics, metrics, export
 
 # -------------------- FastAPI App --------------------
 app = FastAPI(title=settings.PROJECT_NAME)
@@ -28,6 +41,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -------------------- Compression --------------------
+app.add_middleware(CompressionMiddleware)
+
+# -------------------- Password Worker Pool --------------------
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Backpressure: shed login/register load instead of queueing without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    shutdown_password_pool()
+
+# -------------------- Email Outbox Worker --------------------
+@app.on_event("startup")
+async def start_email_worker():
+    if settings.EMAIL_WORKER_ENABLED:
+        email_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_email_worker():
+    await email_worker.stop()
+
+# -------------------- Stock Hold Sweeper --------------------
+@app.on_event("startup")
+async def start_reservation_sweeper():
+    reservation_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def stop_reservation_sweeper():
+    await reservation_sweeper.stop()
+
+# -------------------- Unclaimed Upload Sweeper --------------------
+@app.on_event("startup")
+async def start_upload_sweeper():
+    upload_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def stop_upload_sweeper():
+    await upload_sweeper.stop()
+
+# -------------------- Image Worker Pool --------------------
+@app.on_event("shutdown")
+def stop_image_pool():
+    shutdown_image_pool()
+
 # -------------------- Auto-create Tables --------------------
 Base.metadata.create_all(bind=engine)
 
@@ -38,15 +105,22 @@ app.include_router(products.router, prefix="/products", tags=["Products"])
 app.include_router(cart.router, prefix="/cart", tags=["Cart"])
 app.include_router(orders.router, prefix="/orders", tags=["Orders"])
 app.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
-# app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
+app.include_router(analytics.router, prefix="/admin/analytics", tags=["Analytics"])
+app.include_router(metrics.router, prefix="/admin/metrics", tags=["Metrics"])
+app.include_router(export.router, prefix="/admin/export", tags=["Export"])
+app.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
 
-# -------------------- Static Uploads --------------------
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# -------------------- Uploaded Files --------------------
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    app.mount("/uploads", UploadStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+else:
+    # Object storage: redirect to the bucket instead of proxying bytes
+    app.include_router(uploads.download_router, prefix="/uploads")
 
 # -------------------- Serve Vite Frontend --------------------
 FRONTEND_DIST = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "dist")
 if os.path.exists(FRONTEND_DIST):
-    app.mount("/", StaticFiles(directory=FRONTEND_DIST, html=True), name="shop")
+    app.mount("/", FrontendStaticFiles(FRONTEND_DIST, precompress=settings.FRONTEND_PRECOMPRESS), name="shop")
 else:
     print(f"Warning: Frontend dist folder not found at {FRONTEND_DIST}")
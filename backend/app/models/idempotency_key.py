@@ -0,0 +1,25 @@
+# app/models/idempotency_key.py
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, DateTime, ForeignKey, UniqueConstraint
+from app.db.base import Base
+
+
+# Client-supplied Idempotency-Key values for unsafe requests (checkout). The row is written
+# in the same transaction as the result it points to, so a retried request replays the
+# original outcome instead of running twice.
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "scope", "key", name="uq_idempotency_keys_user_scope_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    scope: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g. "checkout"
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Hash of the request body: reusing a key for a different request is rejected
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    order_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
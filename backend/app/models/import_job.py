@@ -0,0 +1,29 @@
+# app/models/import_job.py
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, JSON
+from app.db.base import Base
+
+
+# One bulk product import. The upload is processed in the background in chunks;
+# counters are committed with each chunk so the job can be polled for progress.
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    format: Mapped[str] = mapped_column(String(20), nullable=False)  # csv | ndjson
+    # pending -> running -> completed | failed
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False, index=True)
+    processed_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # First IMPORT_MAX_ERRORS row errors: [{"line": n, "sku": ..., "error": ...}]
+    errors: Mapped[list] = mapped_column(JSON, default=list, nullable=False)
+    message: Mapped[str | None] = mapped_column(Text, nullable=True)  # fatal error, if failed
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Float, Text, DateTime
+from sqlalchemy import String, Integer, Float, Text, DateTime, Index, JSON
 from datetime import datetime
 from app.db.base import Base
 from typing import List
@@ -7,15 +7,25 @@ from typing import List
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination indexes for the public catalog listing
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_products_selling_price_id", "selling_price", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(120), index=True)
+    # Supplier / catalog natural key; bulk imports upsert on it
+    sku: Mapped[str | None] = mapped_column(String(64), nullable=True, unique=True, index=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     price: Mapped[float] = mapped_column(Float)
     selling_price: Mapped[float] = mapped_column(Float)
     profit_margin_percentage: Mapped[float] = mapped_column(Float, default=0.0)
     stock: Mapped[int] = mapped_column(Integer, default=0)
     image_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Resized copies of image_url, filled in by the image pipeline: [{"width", "height", "webp", "jpeg"}]
+    image_variants: Mapped[list | None] = mapped_column(JSON, nullable=True)
     category: Mapped[str] = mapped_column(String(50), nullable=False, default="General")
     
     # 🟢 NEW: Add timestamp columns
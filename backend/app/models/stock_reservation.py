@@ -0,0 +1,27 @@
+# app/models/stock_reservation.py
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from app.db.base import Base
+
+
+# Timed holds on product stock taken when items are added to a cart. Stock itself is only
+# decremented at checkout; until then, available stock = stock - active (unexpired) holds.
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # One hold per cart line
+        UniqueConstraint("order_id", "product_id", name="uq_stock_reservations_order_product"),
+        # Covers the "active holds per product" aggregate and the expiry sweep
+        Index("ix_stock_reservations_product_id_expires_at", "product_id", "expires_at"),
+        Index("ix_stock_reservations_expires_at", "expires_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    product_id: Mapped[int] = mapped_column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    order_id: Mapped[int] = mapped_column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
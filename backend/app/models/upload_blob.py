@@ -0,0 +1,21 @@
+# app/models/upload_blob.py
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, BigInteger, String, DateTime
+from app.db.base import Base
+
+
+# One stored upload, addressed by the SHA-256 of its bytes. Identical uploads share a row
+# and a file; ref_count tracks how many references (product images...) point at it, and
+# the file is deleted when the last one goes away.
+
+class UploadBlob(Base):
+    __tablename__ = "upload_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Relative to UPLOAD_DIR, sharded by hash: "ab/cd/abcd....jpg"
+    path: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class RevenuePoint(BaseModel):
+    period: str  # start date of the bucket, e.g. "2025-09-01"
+    revenue: float
+    cogs: float
+    gross_profit: float
+    orders: int
+
+
+class RevenueSeries(BaseModel):
+    granularity: str
+    points: List[RevenuePoint]
+
+
+class StatusCount(BaseModel):
+    status: str
+    count: int
+    total_amount: float
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    name: str
+    category: Optional[str] = None
+    units: int
+    revenue: float
+
+
+class InventorySummary(BaseModel):
+    product_count: int
+    total_units: int
+    stock_value: float  # at cost price
+    retail_value: float  # at selling price
+    low_stock_threshold: int
+    low_stock_count: int
+    out_of_stock_count: int
+
+
+class FinancialSummary(BaseModel):
+    total_revenue: float
+    total_cogs: float
+    gross_profit: float
+    paid_orders: int
+    pending_orders: int
+    units_sold: int
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import List, Optional
+
+
+class ImportRowError(BaseModel):
+    line: int  # line number in the uploaded file
+    sku: Optional[str] = None
+    error: str
+
+
+class ImportJobOut(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    format: str
+    status: str  # pending | running | completed | failed
+    processed_rows: int
+    created_count: int
+    updated_count: int
+    error_count: int
+    errors: List[ImportRowError] = []  # first IMPORT_MAX_ERRORS only
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
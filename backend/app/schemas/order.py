@@ -1,7 +1,7 @@
 # app/schemas/order.py
-from pydantic import BaseModel, ConfigDict, Field # ✅ Add Field here
+from pydantic import BaseModel, ConfigDict, Field, model_validator # ✅ Add Field here
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.schemas.user import UserOut 
 from app.schemas.product import ProductOut 
@@ -25,6 +25,11 @@ class OrderOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class OrderPage(BaseModel):
+    items: List[OrderOut]
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
 class CheckoutPayload(BaseModel):
     selected_item_ids: List[int]
     cart_id: int
@@ -36,4 +41,20 @@ class OrderShip(BaseModel):
 # Your AddItemPayload model
 class AddItemPayload(BaseModel):
     product_id: int
-    quantity: int = Field(..., gt=0)
\ No newline at end of file
+    quantity: int = Field(..., gt=0)
+
+# One line change in a batch cart update
+class CartOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    product_id: int
+    # add: quantity to add (> 0); set: new quantity (0 removes the line); remove: ignored
+    quantity: int = Field(0, ge=0)
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.op == "add" and self.quantity <= 0:
+            raise ValueError("quantity must be greater than 0 for 'add'")
+        return self
+
+class CartBatchPayload(BaseModel):
+    operations: List[CartOperation] = Field(..., min_length=1, max_length=100)
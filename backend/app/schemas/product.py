@@ -1,9 +1,10 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional, Union, List
 from datetime import datetime
 
 class ProductBase(BaseModel):
     name: str
+    sku: Optional[str] = None
     description: Optional[str] = None
     price: float  # This is the cost price
     selling_price: float # New field
@@ -12,6 +13,14 @@ class ProductBase(BaseModel):
     category: str
     image_url: Optional[str] = None
 
+# One resized copy of a product image; paths are relative to the uploads root
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    webp: Optional[str] = None
+    jpeg: Optional[str] = None
+    avif: Optional[str] = None
+
 class ProductCreate(ProductBase):
     pass
 
@@ -27,7 +36,85 @@ class ProductUpdate(BaseModel):
 
 class ProductOut(ProductBase):
     id: int
+    # Smallest first; empty until the image has been processed
+    image_variants: Optional[List[ImageVariant]] = None
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductPage(BaseModel):
+    items: List[ProductOut]
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class ProductAvailability(BaseModel):
+    product_id: int
+    stock: int
+    held: int  # units held by carts (unexpired)
+    available: int
+
+
+# One row of a bulk import file (CSV / NDJSON), upserted by sku
+class ProductImportRow(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=64)
+    name: str = Field(..., min_length=1, max_length=120)
+    description: Optional[str] = None
+    price: float = Field(..., ge=0)  # cost price
+    # Give selling_price, profit_margin_percentage or both; the missing one is derived
+    selling_price: Optional[float] = Field(None, ge=0)
+    profit_margin_percentage: Optional[float] = None
+    stock: int = Field(0, ge=0)
+    category: str = Field("Uncategorized", min_length=1, max_length=50)
+    image_url: Optional[str] = Field(None, max_length=255)
+
+    @model_validator(mode="after")
+    def derive_pricing(self):
+        if self.selling_price is None and self.profit_margin_percentage is None:
+            raise ValueError("selling_price or profit_margin_percentage is required")
+        if self.selling_price is None:
+            self.selling_price = round(self.price * (1 + self.profit_margin_percentage / 100), 2)
+        elif self.profit_margin_percentage is None:
+            self.profit_margin_percentage = (
+                round((self.selling_price / self.price - 1) * 100, 2) if self.price else 0.0
+            )
+        return self
+
+
+# One row of a bulk inventory / price adjustment
+class ProductAdjustment(BaseModel):
+    id: int
+    stock: Optional[int] = Field(None, ge=0)  # absolute stock level
+    stock_delta: Optional[int] = None  # or a relative change, e.g. +24 on restock
+    selling_price: Optional[float] = Field(None, ge=0)
+    price: Optional[float] = Field(None, ge=0)  # cost price
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.stock is not None and self.stock_delta is not None:
+            raise ValueError("give stock or stock_delta, not both")
+        if all(v is None for v in (self.stock, self.stock_delta, self.selling_price, self.price)):
+            raise ValueError("nothing to change")
+        return self
+
+class ProductBulkAdjustPayload(BaseModel):
+    items: List[ProductAdjustment] = Field(..., min_length=1, max_length=10000)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [item.id for item in self.items]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each product id may appear only once")
+        return self
+
+class ProductAdjustmentResult(BaseModel):
+    id: int
+    status: str  # updated | not_found | insufficient_stock
+    stock: Optional[int] = None  # values after the update (current values if not updated)
+    selling_price: Optional[float] = None
+    price: Optional[float] = None
+
+class ProductBulkAdjustResult(BaseModel):
+    updated: int
+    results: List[ProductAdjustmentResult]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+
+class UploadOut(BaseModel):
+    key: str  # storage key: what image_url / photo_url store
+    url: str  # where browsers fetch it
+
+
+class UploadPresignRequest(BaseModel):
+    content_type: str  # image/jpeg, image/png, image/gif, image/webp or image/avif
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")  # hex digest computed by the browser
+
+
+class PresignedRequest(BaseModel):
+    method: str
+    url: str
+    headers: Dict[str, str]  # must be sent as-is with the upload
+
+
+class UploadPresignOut(BaseModel):
+    key: str
+    upload: Optional[PresignedRequest] = None  # None: identical content is already stored
+
+
+class UploadCompleteRequest(BaseModel):
+    key: str
@@ -27,6 +27,7 @@ class UserOut(BaseModel):
     name: Optional[str] = None
     role: str   # will be set automatically to "user"
     is_verified: Optional[bool] = False
+    photo_url: Optional[str] = None  # upload key, served under /uploads
 
     # ✅ This line must be present
     model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,57 @@
+"""
+Render resized WebP / JPEG variants for product images that do not have them yet
+(images uploaded before the image pipeline, or imported by file name).
+
+Usage (from the backend directory):
+    python -m app.scripts.backfill_image_variants [--force]
+
+--force regenerates variants for every product image.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.core.storage import get_storage
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.services.image_service import generate_variants_sync
+from app.services.product_service import set_product_image_variants
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--force", action="store_true", help="regenerate existing variants too")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    storage = get_storage()
+    try:
+        query = db.query(Product.id, Product.image_url).filter(Product.image_url.isnot(None))
+        if not args.force:
+            query = query.filter(Product.image_variants.is_(None))
+        todo = [
+            (product_id, image_url)
+            for product_id, image_url in query.all()
+            if storage.exists(image_url)
+        ]
+        print(f"✅ {len(todo)} product images to process")
+
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            futures = {pool.submit(generate_variants_sync, image_url): (product_id, image_url) for product_id, image_url in todo}
+            for future in as_completed(futures):
+                product_id, image_url = futures[future]
+                try:
+                    set_product_image_variants(db, product_id, image_url, future.result())
+                    done += 1
+                except Exception as e:
+                    db.rollback()
+                    failed += 1
+                    print(f"❌ Product {product_id} ({image_url}): {e}")
+    finally:
+        db.close()
+    print(f"✅ {done} products updated, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
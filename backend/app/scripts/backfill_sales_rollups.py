@@ -0,0 +1,26 @@
+"""
+Rebuild the daily sales rollup tables from order history.
+
+Usage (from the backend directory):
+    python -m app.scripts.backfill_sales_rollups
+"""
+from app.db.session import SessionLocal
+from app.services.rollup_service import rebuild_sales_rollups
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        counts = rebuild_sales_rollups(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    for table, rows in counts.items():
+        print(f"✅ {table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
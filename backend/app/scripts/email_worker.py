@@ -0,0 +1,27 @@
+"""
+Run the email outbox worker as its own process (set EMAIL_WORKER_ENABLED=false on the API
+processes to deliver mail only from here).
+
+Usage (from the backend directory):
+    python -m app.scripts.email_worker
+"""
+import asyncio
+
+from app.services.email_service import email_worker
+
+
+async def run() -> None:
+    print(f"✅ Email worker {email_worker.worker_id} started")
+    try:
+        await email_worker.run()
+    finally:
+        for connection in email_worker.connections:
+            await connection.close()
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.product import Product
+from app.models.sales_rollup import SalesDaily, SalesDailyProduct
+
+# Order statuses that count as a sale (matches the admin dashboards)
+REVENUE_STATUSES = ("paid", "shipped", "delivered")
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def _period_expr(db: Session, column, granularity: str):
+    """SQL expression truncating `column` to the start date ("YYYY-MM-DD") of its bucket."""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid granularity. Allowed: {', '.join(GRANULARITIES)}",
+        )
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(func.date_trunc(granularity, column), "YYYY-MM-DD")
+    # SQLite
+    if granularity == "day":
+        return func.strftime("%Y-%m-%d", column)
+    if granularity == "week":
+        # Monday of the ISO week
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", column)
+
+
+def _day_range(query, day_column, date_from: Optional[datetime], date_to: Optional[datetime]):
+    """Restrict a rollup query to [date_from, date_to) at day granularity."""
+    if date_from:
+        query = query.filter(day_column >= date_from.date())
+    if date_to:
+        query = query.filter(day_column < date_to.date())
+    return query
+
+
+def get_financial_summary(
+    db: Session, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None
+) -> dict:
+    """Totals for revenue, cost of goods sold and order counts, read from the daily rollups."""
+    revenue, cogs, units, paid_orders = _day_range(
+        db.query(
+            func.coalesce(func.sum(SalesDaily.revenue), 0.0),
+            func.coalesce(func.sum(SalesDaily.cost), 0.0),
+            func.coalesce(func.sum(SalesDaily.units), 0),
+            func.coalesce(func.sum(SalesDaily.order_count), 0),
+        ),
+        SalesDaily.day, date_from, date_to,
+    ).one()
+
+    pending_query = db.query(func.count(Order.id)).filter(Order.status == "pending")
+    if date_from:
+        pending_query = pending_query.filter(Order.created_at >= date_from)
+    if date_to:
+        pending_query = pending_query.filter(Order.created_at < date_to)
+
+    return {
+        "total_revenue": float(revenue),
+        "total_cogs": float(cogs),
+        "gross_profit": float(revenue) - float(cogs),
+        "paid_orders": int(paid_orders),
+        "pending_orders": pending_query.scalar() or 0,
+        "units_sold": int(units),
+    }
+
+
+def get_revenue_series(
+    db: Session,
+    granularity: str = "day",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> dict:
+    """Revenue, COGS and order counts bucketed by day, week or month, read from the daily rollups."""
+    period = _period_expr(db, SalesDaily.day, granularity)
+    rows = (
+        _day_range(
+            db.query(
+                period.label("period"),
+                func.sum(SalesDaily.revenue),
+                func.sum(SalesDaily.cost),
+                func.sum(SalesDaily.order_count),
+            ),
+            SalesDaily.day, date_from, date_to,
+        )
+        .group_by(period)
+        .order_by(period)
+        .all()
+    )
+    return {
+        "granularity": granularity,
+        "points": [
+            {
+                "period": str(row[0]),
+                "revenue": float(row[1] or 0),
+                "cogs": float(row[2] or 0),
+                "gross_profit": float(row[1] or 0) - float(row[2] or 0),
+                "orders": int(row[3] or 0),
+            }
+            for row in rows
+            # Days whose orders were all cancelled or deleted net out to zero
+            if row[3]
+        ],
+    }
+
+
+def get_status_counts(db: Session) -> List[dict]:
+    """Number of orders and their summed totals per status."""
+    rows = (
+        db.query(Order.status, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0.0))
+        .group_by(Order.status)
+        .order_by(Order.status)
+        .all()
+    )
+    return [{"status": s, "count": c, "total_amount": float(t)} for s, c, t in rows]
+
+
+def get_top_products(
+    db: Session,
+    by: str = "units",
+    limit: int = 10,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> List[dict]:
+    """Best-selling products ranked by units sold or by revenue, read from the daily rollups."""
+    if by not in ("units", "revenue"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid ranking. Allowed: units, revenue",
+        )
+    units = func.sum(SalesDailyProduct.units)
+    revenue = func.sum(SalesDailyProduct.revenue)
+    rows = (
+        _day_range(
+            db.query(Product.id, Product.name, Product.category, units, revenue)
+            .select_from(SalesDailyProduct)
+            .join(Product, Product.id == SalesDailyProduct.product_id),
+            SalesDailyProduct.day, date_from, date_to,
+        )
+        .group_by(Product.id, Product.name, Product.category)
+        .having(units > 0)
+        .order_by((units if by == "units" else revenue).desc(), Product.id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"product_id": pid, "name": name, "category": category, "units": int(u), "revenue": float(r)}
+        for pid, name, category, u, r in rows
+    ]
+
+
+def get_inventory_summary(db: Session, low_stock_threshold: int = 10) -> dict:
+    """Stock valuation and low / out-of-stock counts."""
+    count, units, stock_value, retail_value, low, out = db.query(
+        func.count(Product.id),
+        func.coalesce(func.sum(Product.stock), 0),
+        func.coalesce(func.sum(Product.price * Product.stock), 0.0),
+        func.coalesce(func.sum(Product.selling_price * Product.stock), 0.0),
+        func.coalesce(func.sum(case((Product.stock < low_stock_threshold, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Product.stock <= 0, 1), else_=0)), 0),
+    ).one()
+    return {
+        "product_count": count,
+        "total_units": int(units),
+        "stock_value": float(stock_value),
+        "retail_value": float(retail_value),
+        "low_stock_threshold": low_stock_threshold,
+        "low_stock_count": int(low),
+        "out_of_stock_count": int(out),
+    }
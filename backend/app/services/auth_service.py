@@ -1,56 +1,43 @@
 import os
 from uuid import uuid4
 from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 
 from app.models.user import User
 from app.core.security import verify_password, get_password_hash
 from app.core.roles import Role
 from app.core.config import settings
-
-
-# --- Configure FastAPI-Mail dynamically ---
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.SMTP_USER,
-    MAIL_PASSWORD=settings.SMTP_PASSWORD,
-    MAIL_FROM=settings.EMAILS_FROM_EMAIL,
-    MAIL_PORT=settings.SMTP_PORT,
-    MAIL_SERVER=settings.SMTP_HOST,
-    MAIL_STARTTLS=settings.SMTP_STARTTLS,
-    MAIL_SSL_TLS=settings.SMTP_SSL,
-    USE_CREDENTIALS=True,
-)
+from app.core.auth_cache import invalidate_user
+from app.services.email_service import dedupe_window_key, email_worker, enqueue_email
 
 
 # --- Verification Email ---
-async def send_verification_email(user: User, db: Session):
+# Emails go through the outbox: the request only writes a row, the email worker delivers it.
+async def send_verification_email(user: User, db: AsyncSession):
     verification_token = str(uuid4())
-    user.verification_token = verification_token
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
     verification_link = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
 
-    message = MessageSchema(
+    # ✅ Queued in the same transaction as the token, so a link is never mailed for an unsaved token.
+    # Repeated requests within EMAIL_DEDUPE_WINDOW queue nothing and keep the token already mailed.
+    queued = await db.run_sync(
+        enqueue_email,
+        recipient=user.email,
         subject="Verify your account",
-        recipients=[user.email],
         body=(
             f"Hi {user.name},\n\n"
             f"Please click the link to verify your email:\n{verification_link}\n\n"
             f"Thanks!"
         ),
-        subtype="plain",
+        dedupe_key=dedupe_window_key("verify", user.id),
     )
-
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
-        return {"message": f"Verification email sent to {user.email}"}
-    except Exception as e:
-        print(f"❌ Email sending failed: {e}")
-        return {"message": f"User created but email not sent. Reason: {e}"}
+    if queued:
+        user.verification_token = verification_token
+        db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    email_worker.notify()
+    return {"message": f"Verification email queued for {user.email}"}
 
 
 def verify_user_email(token: str, db: Session) -> bool:
@@ -61,42 +48,38 @@ def verify_user_email(token: str, db: Session) -> bool:
     user.verification_token = None
     db.add(user)
     db.commit()
+    invalidate_user(user.id)
     return True
 
 
 # --- Password Reset Email ---
-async def send_password_reset_email(user: User, db: Session):
+async def send_password_reset_email(user: User, db: AsyncSession):
     reset_token = str(uuid4())
     reset_token_expiry = datetime.utcnow() + timedelta(
         minutes=settings.ACCESS_CODE_EXPIRE_MINUTES
     )
-
-    user.reset_token = reset_token
-    user.reset_token_expiry = reset_token_expiry
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
 
-    message = MessageSchema(
+    # Repeated requests within EMAIL_DEDUPE_WINDOW queue nothing and keep the token already mailed
+    queued = await db.run_sync(
+        enqueue_email,
+        recipient=user.email,
         subject="Password Reset Request",
-        recipients=[user.email],
         body=(
             f"Hi {user.name},\n\n"
             f"Click the link below to reset your password:\n{reset_link}\n\n"
             f"If you did not request this, you can safely ignore this email."
         ),
-        subtype="plain",
+        dedupe_key=dedupe_window_key("reset", user.id),
     )
-
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
-        return {"message": f"Password reset email sent to {user.email}"}
-    except Exception as e:
-        print(f"❌ Password reset email failed: {e}")
-        return {"message": f"Password reset email not sent. Reason: {e}"}
+    if queued:
+        user.reset_token = reset_token
+        user.reset_token_expiry = reset_token_expiry
+        db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    email_worker.notify()
+    return {"message": f"Password reset email queued for {user.email}"}
 
 
 def reset_password(token: str, new_password: str, db: Session) -> bool:
@@ -115,6 +98,7 @@ def reset_password(token: str, new_password: str, db: Session) -> bool:
     user.reset_token_expiry = None
     db.add(user)
     db.commit()
+    invalidate_user(user.id)
     return True
 
 
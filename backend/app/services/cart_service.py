@@ -4,49 +4,132 @@ from app.models.order import Order
 from app.models.user import User
 from app.models.order_item import OrderItem
 from app.models.product import Product
+from app.services.rollup_service import record_status_change
+from app.services.product_service import invalidate_catalog_cache
+from app.db.session import async_service
+from app.schemas.order import OrderOut, CartOperation
+from app.services.reservation_service import held_quantity, hold_stock, release_holds
+from app.services.idempotency_service import find_idempotency_key, remember_idempotency_key, request_fingerprint
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
-from sqlalchemy.exc import SQLAlchemyError
-from typing import List
+from sqlalchemy import case, update
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from typing import Dict, List, Optional
 
 def create_or_get_cart(db: Session, user: User) -> Order:
-    """Finds or creates a pending order (cart) for a user."""
+    """
+    Finds or creates a pending order (cart) for a user.
+    A new cart is only flushed; it commits with the caller's transaction.
+    """
     cart = db.query(Order).filter(
         Order.user_id == user.id, Order.status == "pending"
     ).first()
     if not cart:
         cart = Order(user_id=user.id, status="pending", total_amount=0)
         db.add(cart)
-        db.commit()
-        db.refresh(cart)
+        db.flush()
     return cart
 
 def add_item_to_cart(db: Session, user: User, product_id: int, quantity: int) -> Order:
     """Adds a product to the user's cart or updates the quantity if it exists."""
-    cart = create_or_get_cart(db, user)
-    
-    product = db.query(Product).get(product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+    return apply_cart_batch(db, user, [CartOperation(op="add", product_id=product_id, quantity=quantity)])
+
+# -------------------- Lock contention --------------------
+
+# Postgres serialization failure, deadlock, lock_not_available
+BUSY_SQLSTATES = {"40001", "40P01", "55P03"}
 
-    existing_item = db.query(OrderItem).filter(
-        OrderItem.order_id == cart.id, OrderItem.product_id == product_id
-    ).first()
 
-    if existing_item:
-        existing_item.quantity += quantity
-    else:
-        new_item = OrderItem(
-            order_id=cart.id,
-            product_id=product_id,
-            quantity=quantity,
-            price=product.selling_price
+def is_lock_contention(e: OperationalError) -> bool:
+    """True when the database refused the write because another transaction holds the lock."""
+    sqlstate = getattr(e.orig, "pgcode", None) or getattr(e.orig, "sqlstate", None)
+    if sqlstate:
+        return sqlstate in BUSY_SQLSTATES
+    # SQLite: "database is locked" / "database table is locked" once busy_timeout runs out
+    message = str(e.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+@contextmanager
+def cart_write(db: Session):
+    """
+    Roll back and answer 503 with Retry-After when a cart write loses a lock race,
+    instead of letting the OperationalError surface as a 500. Nothing was committed.
+    """
+    try:
+        yield
+    except OperationalError as e:
+        db.rollback()
+        if not is_lock_contention(e):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The cart is busy, please retry.",
+            headers={"Retry-After": "1"},
         )
-        db.add(new_item)
-    
-    # Recalculate total amount and commit
-    cart.total_amount = sum(item.quantity * item.price for item in cart.items)
-    db.commit()
-    db.refresh(cart)
+
+# -------------------- Batch --------------------
+
+def apply_cart_batch(db: Session, user: User, operations: List[CartOperation]) -> Order:
+    """
+    Apply add / set / remove operations to the user's cart in one transaction.
+    Products and existing lines are each fetched with a single IN query, and
+    total_amount is adjusted by the delta of every changed line instead of re-summing the cart.
+    Operations run in order; any unknown product rejects the whole batch.
+    Each touched line gets a timed stock hold, so a sold-out product fails here with 409
+    instead of at checkout. Losing a lock race rolls the batch back and answers 503.
+    """
+    with cart_write(db):
+        cart = create_or_get_cart(db, user)
+        product_ids = {op.product_id for op in operations}
+
+        products = {
+            p.id: p for p in db.query(Product).filter(Product.id.in_(product_ids)).all()
+        }
+        missing = sorted(pid for pid in product_ids if pid not in products)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Products not found: {missing}")
+
+        lines = {
+            item.product_id: item
+            for item in db.query(OrderItem).filter(
+                OrderItem.order_id == cart.id, OrderItem.product_id.in_(product_ids)
+            ).all()
+        }
+
+        delta = 0.0
+        for op in operations:
+            item = lines.get(op.product_id)
+            if op.op == "remove" or (op.op == "set" and op.quantity == 0):
+                if item:
+                    delta -= item.quantity * item.price
+                    if item in db.new:
+                        db.expunge(item)  # added earlier in this batch, never inserted
+                    else:
+                        db.delete(item)
+                    del lines[op.product_id]
+                continue
+
+            if item is None:
+                item = OrderItem(
+                    order_id=cart.id,
+                    product_id=op.product_id,
+                    quantity=0,
+                    price=products[op.product_id].selling_price,
+                )
+                db.add(item)
+                lines[op.product_id] = item
+            new_quantity = item.quantity + op.quantity if op.op == "add" else op.quantity
+            delta += (new_quantity - item.quantity) * item.price
+            item.quantity = new_quantity
+
+        cart.total_amount = (cart.total_amount or 0) + delta
+        hold_stock(db, cart.id, user.id, {
+            pid: (lines[pid].quantity if pid in lines else 0) for pid in product_ids
+        })
+        db.commit()
+        db.refresh(cart)
     return cart
 
 def update_cart_item_quantity(db: Session, user: User, item_id: int, new_quantity: int) -> Order:
@@ -61,12 +144,13 @@ def update_cart_item_quantity(db: Session, user: User, item_id: int, new_quantit
         db.refresh(item.order) 
         return item.order
         
-    item.quantity = new_quantity
-    
     order = item.order
-    order.total_amount = sum(i.quantity * i.price for i in order.items)
-    db.commit()
-    db.refresh(order)
+    with cart_write(db):
+        order.total_amount += (new_quantity - item.quantity) * item.price
+        item.quantity = new_quantity
+        hold_stock(db, order.id, user.id, {item.product_id: new_quantity})
+        db.commit()
+        db.refresh(order)
     return order
 
 def delete_cart_item(db: Session, user: User, item_id: int) -> None:
@@ -77,27 +161,113 @@ def delete_cart_item(db: Session, user: User, item_id: int) -> None:
         raise HTTPException(status_code=404, detail="Cart item not found or not in your cart")
     
     order = item.order
-    db.delete(item)
-    
-    order.total_amount = sum(i.quantity * i.price for i in order.items)
-    db.commit()
-    db.refresh(order) 
+    with cart_write(db):
+        order.total_amount -= item.quantity * item.price
+        release_holds(db, order.id, [item.product_id])
+        db.delete(item)
+        db.commit()
+        db.refresh(order)
 
 # -------------------- Checkout --------------------
 
-def checkout_cart_items(db: Session, user: User, selected_item_ids: List[int], cart_id: int) -> Order:
+CHECKOUT_SCOPE = "checkout"
+
+
+def checkout_cart_items(
+    db: Session,
+    user: User,
+    selected_item_ids: List[int],
+    cart_id: int,
+    idempotency_key: Optional[str] = None,
+) -> Order:
     """
     Processes checkout by updating the existing cart order to 'paid'.
+    With an idempotency key, a retried request returns the order created by the first one.
+    """
+    request_hash = request_fingerprint({"cart_id": cart_id, "selected_item_ids": sorted(selected_item_ids)})
+    if idempotency_key:
+        record = find_idempotency_key(db, user.id, CHECKOUT_SCOPE, idempotency_key, request_hash)
+        if record:
+            return _replay_checkout(db, record)
+    try:
+        return _checkout(db, user, selected_item_ids, cart_id, idempotency_key, request_hash)
+    except HTTPException:
+        if not idempotency_key:
+            raise
+        # A concurrent request with the same key may have completed the checkout first
+        db.rollback()
+        record = find_idempotency_key(db, user.id, CHECKOUT_SCOPE, idempotency_key, request_hash)
+        if record is None:
+            raise
+        return _replay_checkout(db, record)
+
+
+def _replay_checkout(db: Session, record) -> Order:
+    order = db.query(Order).options(
+        joinedload(Order.items).joinedload(OrderItem.product)
+    ).filter(Order.id == record.order_id).first()
+    if not order:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return order
+
+
+def _load_cart_for_checkout(db: Session, user: User, cart_id: int) -> Order:
+    query = db.query(Order).filter(
+        Order.id == cart_id,
+        Order.user_id == user.id,
+        Order.status == "pending"
+    ).options(
+        joinedload(Order.items).joinedload(OrderItem.product)
+    )
+    if db.get_bind().dialect.name != "postgresql":
+        return query.first()
+    # Postgres: lock the cart row; a second checkout of the same cart skips it instead of queueing
+    order = query.with_for_update(skip_locked=True, of=Order).first()
+    if order is None and db.query(Order.id).filter(
+        Order.id == cart_id, Order.user_id == user.id, Order.status == "pending"
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Checkout for this cart is already in progress."
+        )
+    return order
+
+
+def reserve_stock(db: Session, quantities: Dict[int, int], order_id: Optional[int] = None) -> None:
     """
+    Atomically take `quantities` (product id -> units) out of stock with one conditional UPDATE:
+    stock = stock - q WHERE stock - (other carts' active holds) >= q. Holds of `order_id`
+    itself are not counted against it. Raises 400 naming the products that are short;
+    nothing is decremented unless every product has enough stock.
+    """
+    qty = case(quantities, value=Product.id)
+    available = Product.stock - held_quantity(Product.id, exclude_order_id=order_id)
+    result = db.execute(
+        update(Product)
+        .where(Product.id.in_(list(quantities)), available >= qty)
+        .values(stock=Product.stock - qty)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(quantities):
+        db.rollback()
+        short = db.query(Product.name).filter(
+            Product.id.in_(list(quantities)), available < qty
+        ).all()
+        names = ", ".join(name for (name,) in short) or "selected items"
+        raise HTTPException(status_code=400, detail=f"Not enough stock for {names}")
+
+
+def _checkout(
+    db: Session,
+    user: User,
+    selected_item_ids: List[int],
+    cart_id: int,
+    idempotency_key: Optional[str],
+    request_hash: str,
+) -> Order:
     try:
         # 1. Find the pending cart order
-        order = db.query(Order).filter(
-            Order.id == cart_id,
-            Order.user_id == user.id,
-            Order.status == "pending"
-        ).options(
-            joinedload(Order.items).joinedload(OrderItem.product)
-        ).first()
+        order = _load_cart_for_checkout(db, user, cart_id)
 
         if not order:
             raise HTTPException(
@@ -113,27 +283,59 @@ def checkout_cart_items(db: Session, user: User, selected_item_ids: List[int], c
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No valid items selected for checkout."
             )
-        
-        # 3. Validate stock and update product stock
+        total_amount = sum(item.quantity * item.price for item in items_to_checkout)
+
+        # 3. Claim the cart: only one request can move it out of 'pending'
+        claimed = db.execute(
+            update(Order)
+            .where(Order.id == order.id, Order.status == "pending")
+            .values(status="paid", total_amount=total_amount)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Pending cart not found or already processed."
+            )
+
+        # 4. Decrement stock for all lines at once, only where enough is left
+        quantities: Dict[int, int] = defaultdict(int)
         for item in items_to_checkout:
-            if item.product.stock < item.quantity:
-                raise HTTPException(status_code=400, detail=f"Not enough stock for {item.product.name}")
-            item.product.stock -= item.quantity
+            quantities[item.product_id] += item.quantity
+        reserve_stock(db, quantities, order_id=order.id)
+        # The sale consumes the cart's holds
+        release_holds(db, order.id)
         
-        # 4. Remove unselected items from the cart and the database
+        # 5. Remove unselected items from the cart and the database
         items_to_remove = [item for item in order.items if item.id not in selected_item_ids]
         for item in items_to_remove:
             db.delete(item)
 
-        # 5. Update the existing order's status and total amount
-        order.status = "paid"
-        order.total_amount = sum(item.quantity * item.price for item in items_to_checkout)
+        # 6. Roll the sale into the daily sales tables in the same transaction
+        record_status_change(db, order, "pending", "paid", items=items_to_checkout)
+        checked_out_product_ids = list(quantities)
+
+        # 7. Remember the idempotency key together with the order it produced
+        if idempotency_key:
+            remember_idempotency_key(db, user.id, CHECKOUT_SCOPE, idempotency_key, request_hash, order.id)
         
         db.commit()
         db.refresh(order)
+
+        # Stock changed for the checked-out products
+        invalidate_catalog_cache(checked_out_product_ids)
         
         return order
     
     except SQLAlchemyError as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error during checkout: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error during checkout: {str(e)}")
+
+
+# ---------------- Async API (AsyncSession) ----------------
+add_item_to_cart_async = async_service(add_item_to_cart, OrderOut)
+apply_cart_batch_async = async_service(apply_cart_batch, OrderOut)
+update_cart_item_quantity_async = async_service(update_cart_item_quantity, OrderOut)
+delete_cart_item_async = async_service(delete_cart_item)
+checkout_cart_items_async = async_service(checkout_cart_items, OrderOut)
@@ -0,0 +1,295 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox
+
+
+# ---------------- Outbox ----------------
+
+def enqueue_email(
+    db: Session,
+    recipient: str,
+    subject: str,
+    body: str,
+    subtype: str = "plain",
+    dedupe_key: Optional[str] = None,
+) -> bool:
+    """
+    Queue an email in the outbox. Runs inside the caller's transaction (nothing is committed
+    here), so the message is only sent if that transaction commits. A repeated dedupe_key is
+    ignored while the earlier message is pending or sent (a failed message releases its key,
+    see record_results); returns whether the message was queued.
+    """
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(EmailOutbox).values(
+        dedupe_key=dedupe_key,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        subtype=subtype,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        created_at=datetime.utcnow(),
+    )
+    return db.execute(stmt.on_conflict_do_nothing(index_elements=["dedupe_key"])).rowcount == 1
+
+
+def dedupe_window_key(kind: str, user_id: int) -> str:
+    """Dedupe key shared by every `kind` email to a user within one EMAIL_DEDUPE_WINDOW."""
+    window = int(datetime.utcnow().timestamp() // settings.EMAIL_DEDUPE_WINDOW)
+    return f"{kind}:{user_id}:{window}"
+
+
+def claim_batch(db: Session, worker_id: str, limit: int) -> List[EmailOutbox]:
+    """
+    Atomically claim up to `limit` due messages for this worker. Messages claimed by a worker
+    that died mid-send become claimable again after EMAIL_CLAIM_TIMEOUT.
+    """
+    now = datetime.utcnow()
+    claimable = or_(
+        (EmailOutbox.status == "pending") & (EmailOutbox.next_attempt_at <= now),
+        (EmailOutbox.status == "sending")
+        & (EmailOutbox.claimed_at < now - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)),
+    )
+    due_ids = select(EmailOutbox.id).where(claimable).order_by(EmailOutbox.id).limit(limit)
+    # The outer WHERE re-checks claimability, so two workers never claim the same row
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due_ids.scalar_subquery()), claimable)
+        .values(status="sending", claimed_by=worker_id, claimed_at=now, attempts=EmailOutbox.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return list(
+        db.scalars(
+            select(EmailOutbox)
+            .where(EmailOutbox.claimed_by == worker_id, EmailOutbox.status == "sending")
+            .order_by(EmailOutbox.id)
+        )
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, in seconds."""
+    delay = min(settings.EMAIL_RETRY_MAX_DELAY, settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def record_results(db: Session, results: List[Tuple[EmailOutbox, Optional[Exception], bool]]) -> None:
+    """
+    Store the outcome of a batch: (message, error or None, permanent failure).
+    A message that gives up drops its dedupe_key, so a re-request queues a fresh email.
+    """
+    now = datetime.utcnow()
+    sent_ids = [message.id for message, error, _ in results if error is None]
+    if sent_ids:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(sent_ids))
+            .values(status="sent", sent_at=now, claimed_by=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    for message, error, permanent in results:
+        if error is None:
+            continue
+        gave_up = permanent or message.attempts >= settings.EMAIL_MAX_ATTEMPTS
+        values = {
+            "status": "failed" if gave_up else "pending",
+            "next_attempt_at": now + timedelta(seconds=retry_delay(message.attempts)),
+            "claimed_by": None,
+            "last_error": str(error)[:2000],
+        }
+        if gave_up:
+            # Never delivered: it must not swallow the next request for the same key
+            values["dedupe_key"] = None
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+
+# ---------------- SMTP ----------------
+
+class SMTPConnection:
+    """One persistent SMTP connection, opened on demand and closed after EMAIL_SMTP_IDLE_TIMEOUT."""
+
+    def __init__(self):
+        self._smtp = None
+        self.last_used = 0.0
+
+    async def _connect(self):
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_SSL,
+            start_tls=settings.SMTP_STARTTLS,
+            timeout=settings.EMAIL_SMTP_TIMEOUT,
+        )
+        await smtp.connect()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        self._smtp = smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        import aiosmtplib
+
+        for attempt in range(2):
+            if self._smtp is None or not self._smtp.is_connected:
+                await self._connect()
+            try:
+                await self._smtp.send_message(message)
+                self.last_used = asyncio.get_running_loop().time()
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                # Server dropped the idle connection: reconnect once
+                self._smtp = None
+                if attempt:
+                    raise
+
+    async def close_if_idle(self) -> None:
+        idle = asyncio.get_running_loop().time() - self.last_used
+        if self._smtp is not None and idle >= settings.EMAIL_SMTP_IDLE_TIMEOUT:
+            await self.close()
+
+    async def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+
+def build_message(row: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.EMAILS_FROM_EMAIL
+    message["To"] = row.recipient
+    message["Subject"] = row.subject
+    message["Message-ID"] = f"<outbox-{row.id}-{uuid.uuid4().hex}@{settings.EMAILS_FROM_EMAIL.split('@')[-1]}>"
+    message.set_content(row.body, subtype=row.subtype)
+    return message
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx SMTP replies (bad recipient, rejected content...) will not succeed on retry."""
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+# ---------------- Worker ----------------
+
+class EmailWorker:
+    """
+    Background delivery loop. Claims due outbox rows in batches and sends them over a small
+    pool of persistent SMTP connections. Every API worker may run one: claims keep them apart.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.connections = [SMTPConnection() for _ in range(max(1, settings.EMAIL_SMTP_CONNECTIONS))]
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for connection in self.connections:
+            await connection.close()
+
+    def notify(self) -> None:
+        """Wake the worker now instead of at the next poll (new mail was committed)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Email worker error: {e}")
+                claimed = 0
+            if claimed < settings.EMAIL_BATCH_SIZE:
+                for connection in self.connections:
+                    await connection.close_if_idle()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EMAIL_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Claim and send one batch; returns the number of messages claimed."""
+        batch = await asyncio.to_thread(self._claim)
+        if not batch:
+            return 0
+        # Spread the batch over the connections; each sends its share sequentially
+        shares = [batch[i::len(self.connections)] for i in range(len(self.connections))]
+        outcomes = await asyncio.gather(
+            *(self._send_share(connection, share) for connection, share in zip(self.connections, shares))
+        )
+        results = [result for share in outcomes for result in share]
+        await asyncio.to_thread(self._record, results)
+        return len(batch)
+
+    async def _send_share(self, connection: SMTPConnection, rows: List[EmailOutbox]):
+        results = []
+        for row in rows:
+            try:
+                await connection.send(build_message(row))
+                results.append((row, None, False))
+                self.sent += 1
+            except Exception as e:
+                print(f"❌ Email to {row.recipient} failed (attempt {row.attempts}): {e}")
+                results.append((row, e, is_permanent(e)))
+                self.failed += 1
+        return results
+
+    def _claim(self) -> List[EmailOutbox]:
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            rows = claim_batch(db, self.worker_id, settings.EMAIL_BATCH_SIZE)
+            db.expunge_all()
+            return rows
+        finally:
+            db.close()
+
+    def _record(self, results) -> None:
+        db = SessionLocal()
+        try:
+            record_results(db, results)
+        finally:
+            db.close()
+
+
+email_worker = EmailWorker()
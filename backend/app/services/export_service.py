@@ -0,0 +1,163 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+
+from app.core.config import settings
+from app.core.roles import Role
+from app.db.session import SessionLocal
+from app.models.order import Order
+from app.models.product import Product
+from app.models.user import User
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+# ---------------- Queries ----------------
+# Plain column selects: rows are tuples, never ORM objects, so nothing accumulates in the session.
+
+def orders_query(
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Select:
+    query = select(
+        Order.id,
+        Order.user_id,
+        User.email.label("user_email"),
+        Order.status,
+        Order.total_amount,
+        Order.tracking_id,
+        Order.created_at,
+    ).join(User, User.id == Order.user_id)
+    if status:
+        query = query.where(Order.status == status)
+    if user_id is not None:
+        query = query.where(Order.user_id == user_id)
+    if date_from is not None:
+        query = query.where(Order.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Order.created_at < date_to)
+    return query.order_by(Order.created_at, Order.id)
+
+
+def products_query(category: Optional[str] = None) -> Select:
+    query = select(
+        Product.id,
+        Product.sku,
+        Product.name,
+        Product.category,
+        Product.price,
+        Product.selling_price,
+        Product.profit_margin_percentage,
+        Product.stock,
+        Product.image_url,
+        Product.created_at,
+        Product.updated_at,
+    )
+    if category:
+        query = query.where(Product.category == category)
+    return query.order_by(Product.id)
+
+
+def users_query(role: Optional[Role] = None) -> Select:
+    # Credentials and tokens are never exported
+    query = select(
+        User.id,
+        User.name,
+        User.email,
+        User.role,
+        User.is_verified,
+        User.phone,
+        User.address,
+        User.birthday,
+        User.sex,
+    )
+    if role:
+        query = query.where(User.role == role)
+    return query.order_by(User.id)
+
+
+# ---------------- Encoding ----------------
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def encode_csv(columns: Sequence[str], rows: Optional[List[tuple]]) -> str:
+    """CSV text for a chunk of rows; `rows=None` encodes the header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if rows is None:
+        writer.writerow(columns)
+    else:
+        writer.writerows([tuple("" if v is None else _plain(v) for v in row) for row in rows])
+    return buffer.getvalue()
+
+
+def encode_ndjson(columns: Sequence[str], rows: Optional[List[tuple]]) -> str:
+    """One JSON object per line for a chunk of rows; NDJSON has no header."""
+    if rows is None:
+        return ""
+    return "".join(
+        json.dumps({column: _plain(v) for column, v in zip(columns, row)}, default=str) + "\n"
+        for row in rows
+    )
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
+
+
+def stream_export(query: Select, fmt: str, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Yield the encoded result of `query` chunk by chunk. The query runs on a server-side cursor
+    (yield_per implies stream_results), so memory stays at one chunk of EXPORT_CHUNK_ROWS rows
+    whatever the table size. With gzip, each chunk is sync-flushed so bytes leave immediately.
+
+    Uses its own session: the response body is produced after the request's dependencies exit.
+    """
+    encode = ENCODERS[fmt]
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if gzip else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=settings.EXPORT_CHUNK_ROWS))
+        columns = list(result.keys())
+        header = encode(columns, None)
+        if header or compressor is not None:
+            yield emit(header)
+        for partition in result.partitions():
+            yield emit(encode(columns, partition))
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Allowed: {', '.join(EXPORT_FORMATS)}",
+        )
@@ -0,0 +1,47 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+
+def request_fingerprint(payload) -> str:
+    """Stable hash of a JSON-serializable request body."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def find_idempotency_key(db: Session, user_id: int, scope: str, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    """
+    Return the stored key for a retried request, or None if the key is new (or expired).
+    Raises 422 if the key was already used for a different request.
+    """
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key,
+    ).first()
+    if record is None:
+        return None
+    if record.created_at < datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS):
+        # Expired: the key may be reused
+        db.delete(record)
+        db.flush()
+        return None
+    if record.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request.",
+        )
+    return record
+
+
+def remember_idempotency_key(
+    db: Session, user_id: int, scope: str, key: str, request_hash: str, order_id: Optional[int] = None
+) -> None:
+    """Record the key in the caller's transaction; commits together with the result it refers to."""
+    db.add(IdempotencyKey(user_id=user_id, scope=scope, key=key, request_hash=request_hash, order_id=order_id))
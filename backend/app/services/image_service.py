@@ -0,0 +1,146 @@
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.storage import get_storage, immutable_cache_control
+
+
+# ---------------- Image Worker Pool ----------------
+# Decoding and resizing multi-megapixel uploads is CPU-bound and holds the GIL, so variants
+# are rendered in a small process pool, off the request path and away from the API threads.
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# format -> (file extension, Pillow format name)
+VARIANT_FORMATS = {
+    "webp": ("webp", "WEBP"),
+    "jpeg": ("jpg", "JPEG"),
+    "avif": ("avif", "AVIF"),
+}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_image_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def variant_formats() -> List[str]:
+    """Configured variant formats this Pillow build can encode, in preference order."""
+    from PIL import features
+
+    available = []
+    for fmt in settings.IMAGE_VARIANT_FORMATS:
+        fmt = fmt.strip().lower()
+        if fmt in VARIANT_FORMATS and (fmt == "jpeg" or features.check(fmt)):
+            available.append(fmt)
+    return available
+
+
+def variant_widths(original_width: int, widths: Iterable[int]) -> List[int]:
+    """Target widths for an image: never upscaled; a small image gets one variant at its own width."""
+    targets = sorted({w for w in widths if w < original_width})
+    if original_width <= max(widths, default=0):
+        targets.append(original_width)
+    return targets
+
+
+def render_variants(
+    source_path: str,
+    out_dir: str,
+    stem: str,
+    widths: List[int],
+    formats: List[str],
+) -> List[dict]:
+    """
+    Write resized copies of `source_path` into `out_dir` as `<stem>.<width>w.<ext>`
+    (`stem` may contain sub-directories).
+    Orientation from EXIF is applied to the pixels, then all metadata (EXIF, GPS, ICC
+    comments) is dropped. Returns [{"width", "height", <format>: file name, ...}] by width.
+    """
+    from PIL import Image, ImageOps
+
+    variants = []
+    with Image.open(source_path) as image:
+        # JPEG: let the decoder downscale by up to 8x when even the largest variant is much smaller
+        image.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for width in variant_widths(image.width, widths):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            variant = {"width": width, "height": height}
+            for fmt in formats:
+                extension, pil_format = VARIANT_FORMATS[fmt]
+                filename = f"{stem}.{width}w.{extension}"
+                final_path = os.path.join(out_dir, filename)
+                tmp_path = f"{final_path}.tmp"
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                frame = resized
+                if fmt == "jpeg" and has_alpha:
+                    frame = Image.new("RGB", resized.size, (255, 255, 255))
+                    frame.paste(resized, mask=resized.getchannel("A"))
+                if fmt == "jpeg":
+                    frame.save(tmp_path, pil_format, quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+                elif fmt == "webp":
+                    frame.save(tmp_path, pil_format, quality=settings.IMAGE_WEBP_QUALITY, method=4)
+                else:
+                    frame.save(tmp_path, pil_format, quality=settings.IMAGE_AVIF_QUALITY)
+                os.replace(tmp_path, final_path)
+                variant[fmt] = f"{settings.IMAGE_VARIANT_DIR}/{filename}"
+            variants.append(variant)
+    return variants
+
+
+# ---------------- Public API ----------------
+
+def _render_in_pool(*args) -> List[dict]:
+    return _get_executor().submit(render_variants, *args).result()
+
+
+def generate_variants_sync(filename: str, in_pool: bool = False) -> List[dict]:
+    """
+    Render the variants of an upload (a storage key), then put them into storage next to the
+    original. Storage is only used from the calling process, so a backend swapped in with
+    `set_storage` applies; with `in_pool`, just the resizing runs in an image worker process,
+    between local files in the staging directory.
+    """
+    storage = get_storage()
+    render = _render_in_pool if in_pool else render_variants
+    with storage.local_copy(filename) as source, tempfile.TemporaryDirectory(dir=storage.staging_dir) as out_dir:
+        variants = render(source, out_dir, filename, settings.IMAGE_VARIANT_WIDTHS, variant_formats())
+        for variant in variants:
+            for fmt in VARIANT_FORMATS:
+                if fmt in variant:
+                    key = variant[fmt]
+                    local_path = os.path.join(out_dir, os.path.relpath(key, settings.IMAGE_VARIANT_DIR))
+                    storage.put_file(key, local_path, f"image/{fmt}", immutable_cache_control())
+    return variants
+
+
+async def generate_variants(filename: str) -> List[dict]:
+    """Render the variants of an uploaded file: storage I/O in a thread, resizing in the image worker pool."""
+    return await asyncio.to_thread(generate_variants_sync, filename, settings.IMAGE_WORKERS > 0)
+
+
+def delete_variants(image_url: Optional[str]) -> None:
+    """Remove every rendered variant of an upload (they are named `<image_url>.<width>w.<ext>`)."""
+    if image_url:
+        get_storage().delete_prefix(f"{settings.IMAGE_VARIANT_DIR}/{image_url}.")
@@ -0,0 +1,291 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import case, func, null, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, async_service
+from app.models.import_job import ImportJob
+from app.models.product import Product
+from app.models.upload_blob import UploadBlob
+from app.schemas.import_job import ImportJobOut
+from app.schemas.product import ProductImportRow
+from app.services.product_service import invalidate_whole_catalog_cache
+from app.services.search_service import invalidate_search_index
+from app.services.upload_service import content_hash, release_upload, remove_upload_later, retain_upload
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Columns an import writes; everything else on the product is left alone
+IMPORT_COLUMNS = (
+    "name", "description", "price", "selling_price", "profit_margin_percentage",
+    "stock", "category", "image_url",
+)
+UPSERT_BATCH_ROWS = 500
+
+
+# ---------------- Jobs ----------------
+
+def import_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """The explicit format, or the one implied by the file extension; 400 if neither is usable."""
+    if not fmt and filename:
+        extension = os.path.splitext(filename)[1].lower().lstrip(".")
+        fmt = {"jsonl": "ndjson"}.get(extension, extension)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format. Allowed: {', '.join(IMPORT_FORMATS)}",
+        )
+    return fmt
+
+
+def _save_import_file(source: BinaryIO, max_bytes: int) -> str:
+    fd, path = tempfile.mkstemp(prefix="product-import-")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(1024 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Import file exceeds {max_bytes} bytes",
+                    )
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+async def save_import_upload(file: UploadFile) -> str:
+    """
+    Copy the upload to a temporary file chunk by chunk (never holding it in memory) and return
+    its path; the background job reads and deletes it. The copy runs in a worker thread, so
+    disk writes never block the event loop. 413 past IMPORT_MAX_BYTES.
+    """
+    return await asyncio.to_thread(_save_import_file, file.file, settings.IMPORT_MAX_BYTES)
+
+
+def create_import_job(db: Session, user_id: int, filename: Optional[str], fmt: str) -> ImportJob:
+    job = ImportJob(user_id=user_id, filename=filename, format=fmt, status="pending", errors=[])
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_import_job(db: Session, job_id: int) -> ImportJob:
+    job = db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    return job
+
+
+# ---------------- Parsing ----------------
+
+def read_rows(path: str, fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line number, raw row) from the file without loading it. Raw rows are dicts, or an
+    Exception for a line that could not be parsed at all.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Empty cells mean "not given", so field defaults apply
+                yield reader.line_num, {k.strip(): v for k, v in row.items() if k and v not in ("", None)}
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError("expected a JSON object")
+                    yield line_number, row
+                except ValueError as e:
+                    yield line_number, e
+
+
+def validate_chunk(chunk: List[Tuple[int, object]]) -> Tuple[Dict[str, dict], List[dict]]:
+    """Validate raw rows into sku -> column values (a repeated sku keeps its last row) and row errors."""
+    valid: Dict[str, dict] = {}
+    errors: List[dict] = []
+    for line_number, raw in chunk:
+        if isinstance(raw, Exception):
+            errors.append({"line": line_number, "sku": None, "error": f"Invalid JSON: {raw}"})
+            continue
+        try:
+            row = ProductImportRow.model_validate(raw)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+            errors.append({"line": line_number, "sku": raw.get("sku"), "error": detail})
+            continue
+        valid[row.sku] = row.model_dump(include=set(IMPORT_COLUMNS))
+    return valid, errors
+
+
+# ---------------- Images ----------------
+
+def reject_unknown_images(db: Session, chunk: List[Tuple[int, object]], rows: Dict[str, dict]) -> List[dict]:
+    """
+    Drop rows whose image_url is a content-addressed key that is not a recorded upload (never
+    stored here, or already deleted) and return their row errors. Legacy file names pass.
+    """
+    wanted = {
+        sku: columns["image_url"] for sku, columns in rows.items()
+        if columns.get("image_url") and content_hash(columns["image_url"])
+    }
+    if not wanted:
+        return []
+    known = set(db.scalars(select(UploadBlob.path).where(UploadBlob.path.in_(set(wanted.values())))))
+    lines = {raw.get("sku"): line_number for line_number, raw in chunk if isinstance(raw, dict)}
+    errors = []
+    for sku, image_url in wanted.items():
+        if image_url not in known:
+            del rows[sku]
+            errors.append({
+                "line": lines.get(sku, 0), "sku": sku,
+                "error": "image_url: not a recorded upload; upload the image through /uploads first",
+            })
+    return errors
+
+
+def _swap_images(db: Session, rows: Dict[str, dict], current: Dict[str, Tuple[int, Optional[str]]]) -> List[str]:
+    """
+    Move upload references to the rows' new images, in the caller's transaction. Returns the
+    replaced images nothing references any more, for `remove_upload` after the commit.
+    """
+    changes = [
+        (current.get(sku, (None, None)), columns["image_url"])
+        for sku, columns in rows.items()
+        if columns.get("image_url") and columns["image_url"] != current.get(sku, (None, None))[1]
+    ]
+    # Retain before releasing, so an image moving between products in one chunk is never orphaned
+    for _, image_url in changes:
+        if content_hash(image_url):
+            retain_upload(db, image_url)
+    orphaned = []
+    for (product_id, old_image), _ in changes:
+        orphaned_image = release_upload(db, old_image, exclude_product_id=product_id)
+        if orphaned_image:
+            orphaned.append(orphaned_image)
+    return orphaned
+
+
+# ---------------- Upsert ----------------
+
+def upsert_products(db: Session, rows: Dict[str, dict]) -> Tuple[int, int, List[str]]:
+    """
+    Insert or update products by sku with batched INSERT ... ON CONFLICT (sku) DO UPDATE.
+    Runs in the caller's transaction. Returns (created, updated, orphaned images); delete
+    the orphaned images with `remove_upload` once committed.
+    """
+    if not rows:
+        return 0, 0, []
+    current = {
+        sku: (product_id, image_url)
+        for sku, product_id, image_url in db.execute(
+            select(Product.sku, Product.id, Product.image_url).where(Product.sku.in_(list(rows)))
+        )
+    }
+    orphaned = _swap_images(db, rows, current)
+    now = datetime.utcnow()
+    values = [{"sku": sku, **columns, "created_at": now, "updated_at": now} for sku, columns in rows.items()]
+
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    # Multi-row VALUES, kept under the drivers' bind parameter limits
+    for start in range(0, len(values), UPSERT_BATCH_ROWS):
+        stmt = insert_fn(Product).values(values[start:start + UPSERT_BATCH_ROWS])
+        set_ = {column: stmt.excluded[column] for column in IMPORT_COLUMNS}
+        # A row without an image keeps the product's current one
+        set_["image_url"] = func.coalesce(stmt.excluded.image_url, Product.image_url)
+        # A new image invalidates the rendered variants (backfill_image_variants regenerates them)
+        set_["image_variants"] = case(
+            (stmt.excluded.image_url.is_(None) | (stmt.excluded.image_url == Product.image_url), Product.image_variants),
+            else_=null(),
+        )
+        set_["updated_at"] = stmt.excluded.updated_at
+        db.execute(stmt.on_conflict_do_update(index_elements=["sku"], set_=set_))
+    return len(rows) - len(current), len(current), orphaned
+
+
+# ---------------- Runner ----------------
+
+def run_import_job(job_id: int, path: str) -> None:
+    """
+    Process an uploaded import file (runs in the background, with its own session).
+    Each chunk of IMPORT_CHUNK_ROWS rows is validated, upserted and committed together with
+    the job's progress counters, so a failure keeps the chunks already imported.
+    Catalog caches and the search index are invalidated once, at the end.
+    """
+    db = SessionLocal()
+    written = False
+    try:
+        job = db.get(ImportJob, job_id)
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+        fmt = job.format
+
+        rows = read_rows(path, fmt)
+        while True:
+            chunk = list(islice(rows, settings.IMPORT_CHUNK_ROWS))
+            if not chunk:
+                break
+            valid, errors = validate_chunk(chunk)
+            errors += reject_unknown_images(db, chunk, valid)
+            errors.sort(key=lambda error: error["line"])
+            created, updated, orphaned = upsert_products(db, valid)
+            written = written or bool(valid)
+
+            job.processed_rows += len(chunk)
+            job.created_count += created
+            job.updated_count += updated
+            job.error_count += len(errors)
+            room = settings.IMPORT_MAX_ERRORS - len(job.errors)
+            if errors and room > 0:
+                job.errors = job.errors + errors[:room]
+            db.commit()
+            for image_url in orphaned:
+                remove_upload_later(image_url)
+
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Product import {job_id} failed: {e}")
+        db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(status="failed", message=str(e)[:2000], finished_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        try:
+            if written:
+                invalidate_whole_catalog_cache()
+                invalidate_search_index(db)
+        finally:
+            db.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ---------------- Async API (AsyncSession) ----------------
+create_import_job_async = async_service(create_import_job, ImportJobOut)
+get_import_job_async = async_service(get_import_job, ImportJobOut)
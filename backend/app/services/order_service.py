@@ -4,8 +4,15 @@ from app.models.order_item import OrderItem
 from app.models.review import Review
 from app.models.product import Product
 from fastapi import HTTPException, status
-from sqlalchemy.orm import joinedload
-from typing import List
+from app.services.rollup_service import record_status_change
+from app.db.session import async_service
+from app.schemas.order import OrderOut, OrderPage
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime
+from typing import List, Optional, Tuple
+import base64
+import json
 
 def get_user_orders(db: Session, user_id: int) -> List[Order]:
     """Fetches all orders for a user, with their items, products, and reviews."""
@@ -22,6 +29,75 @@ def get_user_orders(db: Session, user_id: int) -> List[Order]:
     return orders
 
 
+# ---------------- Admin listing ----------------
+
+DEFAULT_ORDERS_PAGE_SIZE = 50
+MAX_ORDERS_PAGE_SIZE = 200
+
+
+def encode_order_cursor(order: Order) -> str:
+    """Encode the (created_at, id) keyset position of `order` as an opaque URL-safe token."""
+    raw = json.dumps({"c": order.created_at.isoformat(), "id": order.id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by `encode_order_cursor`, or raise 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def get_orders_page(
+    db: Session,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_ORDERS_PAGE_SIZE,
+) -> OrderPage:
+    """
+    One keyset-paginated page of orders, newest first, with the cursor for the next page.
+    date_from is inclusive and date_to exclusive. Ordering by (created_at, id) keeps each page
+    a bounded range scan on the matching (status | user_id, created_at, id) index.
+    Items, products and users are loaded with one IN query each instead of a joined row product.
+    """
+    limit = max(1, min(limit, MAX_ORDERS_PAGE_SIZE))
+
+    query = db.query(Order)
+    if status:
+        query = query.filter(Order.status == status)
+    if user_id is not None:
+        query = query.filter(Order.user_id == user_id)
+    if date_from is not None:
+        query = query.filter(Order.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(Order.created_at < date_to)
+    if cursor:
+        last_created_at, last_id = decode_order_cursor(cursor)
+        query = query.filter(tuple_(Order.created_at, Order.id) < (last_created_at, last_id))
+
+    # Fetch one extra row to know whether another page exists
+    orders = (
+        query.options(
+            selectinload(Order.items).selectinload(OrderItem.product),
+            selectinload(Order.user),
+        )
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = encode_order_cursor(orders[limit - 1]) if len(orders) > limit else None
+    return OrderPage(items=orders[:limit], next_cursor=next_cursor)
+
+
 def update_order_status(db: Session, order_id: int, status: str) -> Order:
     order = db.query(Order).options(
         joinedload(Order.items).joinedload(OrderItem.product)
@@ -29,6 +105,7 @@ def update_order_status(db: Session, order_id: int, status: str) -> Order:
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    record_status_change(db, order, order.status, status)
     order.status = status
     db.commit()
     db.refresh(order)
@@ -40,6 +117,7 @@ def delete_order(db: Session, order_id: int) -> Order:
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    record_status_change(db, order, order.status, None)
     db.delete(order)
     db.commit()
     return order
@@ -55,6 +133,7 @@ def ship_order(db: Session, order_id: int, tracking_id: str) -> Order:
     if order.status != "paid":
         raise HTTPException(status_code=400, detail="Order has not been paid yet")
 
+    record_status_change(db, order, order.status, "shipped")
     order.status = "shipped"
     order.tracking_id = tracking_id
     db.commit()
@@ -77,7 +156,17 @@ def acknowledge_delivery(db: Session, order_id: int) -> Order:
             detail="Order cannot be marked as delivered. It must be 'shipped' first."
         )
 
+    record_status_change(db, order, order.status, "delivered")
     order.status = "delivered"
     db.commit()
     db.refresh(order)
-    return order
\ No newline at end of file
+    return order
+
+
+# ---------------- Async API (AsyncSession) ----------------
+get_user_orders_async = async_service(get_user_orders, OrderOut)
+get_orders_page_async = async_service(get_orders_page)
+update_order_status_async = async_service(update_order_status, OrderOut)
+delete_order_async = async_service(delete_order)
+ship_order_async = async_service(ship_order, OrderOut)
+acknowledge_delivery_async = async_service(acknowledge_delivery, OrderOut)
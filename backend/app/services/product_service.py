@@ -1,24 +1,43 @@
 import os
-import shutil
-from typing import Optional, List
-from fastapi import UploadFile, HTTPException, status
+import json
+import asyncio
+import base64
+from datetime import datetime
+from typing import Iterable, Optional, List, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy import Float, Integer, bindparam, case, cast, column, func, select, tuple_, update, values
 from sqlalchemy.orm import Session
 from app.models.product import Product
 from app.core.config import settings
+from app.core.cache import VersionedCache
+from app.core.storage import get_storage
+from app.db.session import SessionLocal, async_service
+from app.schemas.product import (
+    ProductAdjustment,
+    ProductAdjustmentResult,
+    ProductBulkAdjustResult,
+    ProductOut,
+    ProductPage,
+)
+from app.services.search_service import index_product, unindex_product
+from app.services.image_service import delete_variants, generate_variants
+from app.services.upload_service import (
+    StoredUpload, release_upload, remove_upload_later, retain_upload, store_upload,
+)
 
 # Ensure upload directory exists
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
-def save_image(file: UploadFile) -> Optional[str]:
-    """Save uploaded image to disk and return the filename."""
-    if not file:
+def save_image(db: Session, image: Union[StoredUpload, str, None]) -> Optional[str]:
+    """
+    Take a reference to a product image and return its upload path: an upload just ingested,
+    or the key of one uploaded directly to storage beforehand.
+    """
+    if not image:
         return None
-    filename = file.filename
-    filepath = os.path.join(settings.UPLOAD_DIR, filename)
-    # Overwrite if exists
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return filename
+    if isinstance(image, str):
+        return retain_upload(db, image)
+    return store_upload(db, image)
 
 # ---------------- CRUD ----------------
 
@@ -31,10 +50,10 @@ def create_product(
     profit_margin_percentage: float, # 🟢 ADDED
     stock: int,
     category: Optional[str],
-    image: Optional[UploadFile],
+    image: Union[StoredUpload, str, None],
 ) -> Product:
     """Create and persist a new product with optional image."""
-    image_filename = save_image(image) if image else None
+    image_filename = save_image(db, image) if image else None
     product = Product(
         name=name,
         description=description,
@@ -48,14 +67,145 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    index_product(db, product)
+    invalidate_catalog_cache()
     return product
 
-def get_products(db: Session, category: Optional[str] = None) -> List[Product]:
-    """Return all products, optionally filtered by category."""
+# ---------------- Listing ----------------
+
+# sort name -> (keyset column, descending)
+PRODUCT_SORTS = {
+    "newest": (Product.created_at, True),
+    "oldest": (Product.created_at, False),
+    "price_asc": (Product.selling_price, False),
+    "price_desc": (Product.selling_price, True),
+}
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(sort: str, product: Product) -> str:
+    """Encode the keyset position of `product` as an opaque URL-safe token."""
+    column, _ = PRODUCT_SORTS[sort]
+    value = getattr(product, column.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": product.id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[object, int]:
+    """Decode a cursor produced by `encode_cursor` for the same sort, or raise 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort:
+            raise ValueError("cursor belongs to a different sort order")
+        value = data["v"]
+        if PRODUCT_SORTS[sort][0] is Product.created_at:
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+        return value, int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+def get_products(
+    db: Session,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Product], Optional[str]]:
+    """
+    Return one keyset-paginated page of products and the cursor for the next page.
+    Pages are ordered by (sort column, id) so each request is a bounded index range scan.
+    """
+    if sort not in PRODUCT_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort. Allowed: {', '.join(PRODUCT_SORTS)}",
+        )
+    column, descending = PRODUCT_SORTS[sort]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
     query = db.query(Product)
     if category:
         query = query.filter(Product.category == category)
-    return query.all()
+    if min_price is not None:
+        query = query.filter(Product.selling_price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.selling_price <= max_price)
+    if in_stock is True:
+        query = query.filter(Product.stock > 0)
+    elif in_stock is False:
+        query = query.filter(Product.stock <= 0)
+
+    if cursor:
+        value, last_id = decode_cursor(sort, cursor)
+        key = tuple_(column, Product.id)
+        query = query.filter(key < (value, last_id) if descending else key > (value, last_id))
+
+    if descending:
+        query = query.order_by(column.desc(), Product.id.desc())
+    else:
+        query = query.order_by(column.asc(), Product.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+# ---------------- Catalog cache ----------------
+
+# Serialized ProductOut / ProductPage payloads; invalidated by the write paths below.
+# Versions live in the shared cache backend, so a write in one worker invalidates all workers.
+product_cache = VersionedCache("product", maxsize=settings.CATALOG_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL)
+listing_cache = VersionedCache("product_listing", maxsize=settings.CATALOG_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL)
+
+
+def get_product_payload(db: Session, product_id: int) -> dict:
+    """Read-through cached ProductOut payload for one product (404s are not cached)."""
+    return product_cache.get_or_set(
+        product_id,
+        lambda: ProductOut.model_validate(get_product_by_id(db, product_id)).model_dump(mode="json"),
+    )
+
+
+def get_products_page(db: Session, **filters) -> ProductPage:
+    """Uncached listing page (admin view); same filters as get_products."""
+    items, next_cursor = get_products(db, **filters)
+    return ProductPage(items=items, next_cursor=next_cursor)
+
+
+def get_products_page_payload(db: Session, **filters) -> dict:
+    """Read-through cached ProductPage payload keyed by the listing query parameters."""
+    def load() -> dict:
+        return get_products_page(db, **filters).model_dump(mode="json")
+
+    return listing_cache.get_or_set(tuple(sorted(filters.items())), load)
+
+
+def invalidate_catalog_cache(product_ids: Iterable[int] = ()) -> None:
+    """Drop cached payloads for the given products and every cached listing page."""
+    for product_id in product_ids:
+        product_cache.invalidate(product_id)
+    listing_cache.invalidate_all()
+
+
+def invalidate_whole_catalog_cache() -> None:
+    """Drop every cached product and listing payload (after bulk writes)."""
+    product_cache.invalidate_all()
+    listing_cache.invalidate_all()
+
 
 def get_product_by_id(db: Session, product_id: int) -> Product:
     """Return a single product by ID or raise 404."""
@@ -67,6 +217,14 @@ def get_product_by_id(db: Session, product_id: int) -> Product:
         )
     return product
 
+def ensure_product_exists(db: Session, product_id: int) -> None:
+    """Raise 404 unless the product exists (checked before accepting an image for it)."""
+    if db.scalar(select(Product.id).where(Product.id == product_id)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product with id {product_id} not found"
+        )
+
 def update_product(
     db: Session,
     product_id: int,
@@ -77,7 +235,7 @@ def update_product(
     profit_margin_percentage: Optional[float] = None, # 🟢 ADDED
     stock: Optional[int] = None,
     category: Optional[str] = None,
-    image: Optional[UploadFile] = None,
+    image: Union[StoredUpload, str, None] = None,
 ) -> Product:
     """Update product fields; only provided fields are updated. Optionally replace image."""
     product = get_product_by_id(db, product_id)
@@ -96,25 +254,206 @@ def update_product(
         product.stock = stock
     if category is not None:
         product.category = category
+    orphaned_image = None
     if image:
-        # Remove old image if exists
-        if product.image_url:
-            old_path = os.path.join(settings.UPLOAD_DIR, product.image_url)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        product.image_url = save_image(image)
+        # The old file is only deleted once nothing else references it
+        orphaned_image = release_upload(db, product.image_url, exclude_product_id=product.id)
+        product.image_url = save_image(db, image)
+        if orphaned_image == product.image_url:
+            orphaned_image = None  # same picture uploaded again
+        product.image_variants = None  # regenerated by process_product_image
 
     db.commit()
+    remove_upload_later(orphaned_image)
     db.refresh(product)
+    index_product(db, product)
+    invalidate_catalog_cache([product_id])
     return product
 
 def delete_product(db: Session, product_id: int) -> dict:
-    """Delete a product by ID and remove image from disk."""
+    """Delete a product by ID and remove its image once unreferenced."""
     product = get_product_by_id(db, product_id)
-    if product.image_url:
-        filepath = os.path.join(settings.UPLOAD_DIR, product.image_url)
-        if os.path.exists(filepath):
-            os.remove(filepath)
+    orphaned_image = release_upload(db, product.image_url, exclude_product_id=product.id)
     db.delete(product)
     db.commit()
-    return {"detail": "Product deleted successfully"}
\ No newline at end of file
+    remove_upload_later(orphaned_image)
+    unindex_product(db, product_id)
+    invalidate_catalog_cache([product_id])
+    return {"detail": "Product deleted successfully"}
+
+
+# ---------------- Image variants ----------------
+
+def set_product_image_variants(db: Session, product_id: int, image_url: str, variants: List[dict]) -> bool:
+    """
+    Store generated variants, unless the product's image changed while they were rendered.
+    Returns whether they were stored.
+    """
+    result = db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.image_url == image_url)
+        .values(image_variants=variants)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount:
+        invalidate_catalog_cache([product_id])
+    return bool(result.rowcount)
+
+
+def find_image_variants(db: Session, image_url: str) -> Optional[List[dict]]:
+    """Variants already rendered for this upload by another product sharing it, if any."""
+    return db.scalar(
+        select(Product.image_variants)
+        .where(Product.image_url == image_url, Product.image_variants.isnot(None))
+        .limit(1)
+    )
+
+
+async def process_product_image(product_id: int, image_url: str) -> None:
+    """
+    Background task: give a product its image variants. Uploads are deduplicated by content,
+    so variants another product already has for the same file are reused; otherwise they are
+    rendered in the image pool.
+    """
+    try:
+        variants = await asyncio.to_thread(_with_session, find_image_variants, image_url)
+        if variants is None:
+            variants = await generate_variants(image_url)
+        stored = await asyncio.to_thread(_with_session, set_product_image_variants, product_id, image_url, variants)
+        if not stored and not await asyncio.to_thread(get_storage().exists, image_url):
+            await asyncio.to_thread(delete_variants, image_url)  # the image was released while we were rendering
+    except Exception as e:
+        print(f"❌ Image variants for product {product_id} failed: {e}")
+
+
+def _with_session(fn, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+# ---------------- Bulk adjustments ----------------
+
+def _adjusted_columns(stock, stock_delta, selling_price, price) -> dict:
+    """New column values for an adjustment row; None inputs keep the current value."""
+    new_price = func.coalesce(price, Product.price)
+    new_selling_price = func.coalesce(selling_price, Product.selling_price)
+    return {
+        "stock": case((stock.is_not(None), stock), else_=Product.stock + func.coalesce(stock_delta, 0)),
+        "price": new_price,
+        "selling_price": new_selling_price,
+        # Keep the markup consistent with whichever price changed
+        "profit_margin_percentage": case(
+            (price.is_(None) & selling_price.is_(None), Product.profit_margin_percentage),
+            (new_price > 0, (new_selling_price / new_price - 1) * 100),
+            else_=0.0,
+        ),
+    }
+
+
+def _apply_adjustments_postgres(db: Session, items: List[ProductAdjustment]) -> set:
+    """One UPDATE products ... FROM (VALUES ...) for every row; returns the updated ids."""
+    v = values(
+        column("id", Integer), column("stock", Integer), column("stock_delta", Integer),
+        column("selling_price", Float), column("price", Float),
+        name="v",
+    ).data([(i.id, i.stock, i.stock_delta, i.selling_price, i.price) for i in items])
+    # Casts: a VALUES column holding only NULLs would otherwise be typed as text
+    columns = _adjusted_columns(
+        cast(v.c.stock, Integer), cast(v.c.stock_delta, Integer),
+        cast(v.c.selling_price, Float), cast(v.c.price, Float),
+    )
+    result = db.execute(
+        update(Product)
+        .where(Product.id == v.c.id, columns["stock"] >= 0)
+        .values(**columns)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars())
+
+
+def _apply_adjustments_executemany(db: Session, items: List[ProductAdjustment], current: dict) -> set:
+    """
+    Fallback for SQLite (no VALUES column aliases): one parameterized UPDATE run with
+    executemany. Rows that are missing or would take stock below zero are filtered out first.
+    """
+    applicable = [
+        item for item in items
+        if item.id in current and (item.stock_delta is None or current[item.id].stock + item.stock_delta >= 0)
+    ]
+    if not applicable:
+        return set()
+    params = {name: bindparam(f"b_{name}") for name in ("stock", "stock_delta", "selling_price", "price")}
+    columns = _adjusted_columns(**params)
+    result = db.connection().execute(
+        update(Product.__table__)
+        .where(Product.id == bindparam("b_id"), columns["stock"] >= 0)
+        .values(**columns, updated_at=datetime.utcnow()),
+        [
+            {"b_id": i.id, "b_stock": i.stock, "b_stock_delta": i.stock_delta,
+             "b_selling_price": i.selling_price, "b_price": i.price}
+            for i in applicable
+        ],
+    )
+    if result.rowcount != len(applicable):
+        # Stock moved between the read and the write (a concurrent checkout)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Stock changed during the bulk update; please retry.",
+        )
+    return {item.id for item in applicable}
+
+
+def bulk_adjust_products(db: Session, items: List[ProductAdjustment]) -> ProductBulkAdjustResult:
+    """
+    Apply stock / price adjustments to many products in one transaction and report each row:
+    updated, not_found, or insufficient_stock (a stock_delta that would go below zero).
+    Other rows still apply. Catalog caches are invalidated once.
+    """
+    ids = [item.id for item in items]
+    if db.get_bind().dialect.name == "postgresql":
+        updated_ids = _apply_adjustments_postgres(db, items)
+    else:
+        current = {row.id: row for row in db.execute(select(Product.id, Product.stock).where(Product.id.in_(ids)))}
+        updated_ids = _apply_adjustments_executemany(db, items, current)
+
+    rows = {
+        row.id: row
+        for row in db.execute(
+            select(Product.id, Product.stock, Product.selling_price, Product.price).where(Product.id.in_(ids))
+        )
+    }
+    db.commit()
+    if updated_ids:
+        invalidate_whole_catalog_cache()
+
+    results = []
+    for item in items:
+        row = rows.get(item.id)
+        if row is None:
+            results.append(ProductAdjustmentResult(id=item.id, status="not_found"))
+            continue
+        results.append(ProductAdjustmentResult(
+            id=item.id,
+            status="updated" if item.id in updated_ids else "insufficient_stock",
+            stock=row.stock,
+            selling_price=row.selling_price,
+            price=row.price,
+        ))
+    return ProductBulkAdjustResult(updated=len(updated_ids), results=results)
+
+
+# ---------------- Async API (AsyncSession) ----------------
+get_products_page_async = async_service(get_products_page)
+get_products_page_payload_async = async_service(get_products_page_payload)
+get_product_payload_async = async_service(get_product_payload)
+create_product_async = async_service(create_product, ProductOut)
+update_product_async = async_service(update_product, ProductOut)
+ensure_product_exists_async = async_service(ensure_product_exists)
+delete_product_async = async_service(delete_product)
+bulk_adjust_products_async = async_service(bulk_adjust_products)
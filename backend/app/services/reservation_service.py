@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, async_service
+from app.models.product import Product
+from app.models.stock_reservation import StockReservation
+
+
+# ---------------- Available stock ----------------
+
+def held_quantity(product_id_column, exclude_order_id: Optional[int] = None):
+    """
+    Correlated scalar subquery: units of `product_id_column` held by active (unexpired) holds,
+    optionally ignoring one cart's own holds. Served by the (product_id, expires_at) index.
+    """
+    query = select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(
+        StockReservation.product_id == product_id_column,
+        StockReservation.expires_at > datetime.utcnow(),
+    )
+    if exclude_order_id is not None:
+        query = query.where(StockReservation.order_id != exclude_order_id)
+    return query.scalar_subquery()
+
+
+def get_available_stock(db: Session, product_ids: Iterable[int], exclude_order_id: Optional[int] = None) -> Dict[int, dict]:
+    """product id -> {"stock", "held", "available"} for the given products."""
+    held = held_quantity(Product.id, exclude_order_id)
+    rows = db.execute(
+        select(Product.id, Product.stock, held.label("held")).where(Product.id.in_(list(product_ids)))
+    ).all()
+    return {
+        row.id: {"stock": row.stock, "held": int(row.held), "available": row.stock - int(row.held)}
+        for row in rows
+    }
+
+
+def get_product_availability(db: Session, product_id: int) -> dict:
+    """Stock, units held in carts and units still available for one product, or 404."""
+    availability = get_available_stock(db, [product_id]).get(product_id)
+    if availability is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with id {product_id} not found")
+    return {"product_id": product_id, **availability, "available": max(availability["available"], 0)}
+
+
+# ---------------- Holds ----------------
+
+def hold_stock(db: Session, order_id: int, user_id: int, quantities: Dict[int, int]) -> None:
+    """
+    Set a cart's holds to `quantities` (product id -> units; 0 releases) and restart their TTL.
+    Runs in the caller's transaction. Raises 409 if a product cannot cover the hold; the
+    caller's changes are rolled back.
+
+    The hold is written first and checked afterwards: once written, SQLite's write lock
+    (or, on Postgres, the product row locks taken below) keeps other holds out until commit.
+    """
+    if not quantities:
+        return
+    product_ids = sorted(quantities)
+    if db.get_bind().dialect.name == "postgresql":
+        # Serialize holds on the same products; fixed order avoids deadlocks
+        db.execute(select(Product.id).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update())
+
+    released = [pid for pid in product_ids if quantities[pid] <= 0]
+    if released:
+        release_holds(db, order_id, released)
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.STOCK_HOLD_TTL)
+    rows = [
+        {"order_id": order_id, "product_id": pid, "user_id": user_id, "quantity": quantities[pid],
+         "expires_at": expires_at, "created_at": datetime.utcnow()}
+        for pid in product_ids if quantities[pid] > 0
+    ]
+    if not rows:
+        return
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(StockReservation).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["order_id", "product_id"],
+        set_={"quantity": stmt.excluded.quantity, "expires_at": stmt.excluded.expires_at},
+    ))
+
+    availability = get_available_stock(db, [row["product_id"] for row in rows])
+    short = [pid for pid, info in availability.items() if info["available"] < 0]
+    if short:
+        db.rollback()
+        names = ", ".join(
+            name for (name,) in db.query(Product.name).filter(Product.id.in_(short)).order_by(Product.id)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not enough stock available for {names}",
+        )
+
+
+def release_holds(db: Session, order_id: int, product_ids: Optional[Iterable[int]] = None) -> None:
+    """Drop a cart's holds (all of them, or only for `product_ids`). Runs in the caller's transaction."""
+    stmt = delete(StockReservation).where(StockReservation.order_id == order_id)
+    if product_ids is not None:
+        stmt = stmt.where(StockReservation.product_id.in_(list(product_ids)))
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def release_expired_holds(db: Session) -> int:
+    """Delete every expired hold in one statement; returns the number released."""
+    result = db.execute(
+        delete(StockReservation)
+        .where(StockReservation.expires_at <= datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+# ---------------- Sweeper ----------------
+
+class ReservationSweeper:
+    """
+    Background task releasing expired holds every STOCK_HOLD_SWEEP_INTERVAL seconds.
+    Expired holds already stop counting against available stock; sweeping keeps the table small.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.released = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.released += await asyncio.to_thread(self.sweep)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Stock hold sweep failed: {e}")
+            await asyncio.sleep(settings.STOCK_HOLD_SWEEP_INTERVAL)
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            return release_expired_holds(db)
+        finally:
+            db.close()
+
+
+reservation_sweeper = ReservationSweeper()
+
+
+# ---------------- Async API (AsyncSession) ----------------
+get_product_availability_async = async_service(get_product_availability)
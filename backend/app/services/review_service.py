@@ -5,6 +5,8 @@ from app.models.product import Product
 from app.models.order import Order
 from app.models.order_item import OrderItem  # <-- Import the OrderItem model
 from fastapi import HTTPException, status
+from app.db.session import async_service
+from app.schemas.review import ReviewOut
 from typing import List
 
 
@@ -59,4 +61,9 @@ def get_all_reviews(db: Session) -> List[Review]:
     reviews = db.query(Review).options(
         joinedload(Review.user), joinedload(Review.product)
     ).order_by(Review.created_at.desc()).all()
-    return reviews
\ No newline at end of file
+    return reviews
+
+
+# ---------------- Async API (AsyncSession) ----------------
+create_review_for_delivered_item_async = async_service(create_review_for_delivered_item, ReviewOut)
+get_all_reviews_async = async_service(get_all_reviews, ReviewOut)
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.sales_rollup import SalesDaily, SalesDailyProduct, SalesDailyCategory
+from app.services.analytics_service import REVENUE_STATUSES
+
+METRICS = ("units", "revenue", "cost", "order_count")
+
+
+def _upsert_increments(db: Session, model, key_columns: tuple, rows: list) -> None:
+    """INSERT ... ON CONFLICT DO UPDATE adding `rows` metrics onto existing rollup rows."""
+    if not rows:
+        return
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={m: getattr(model, m) + getattr(stmt.excluded, m) for m in METRICS},
+    )
+    db.execute(stmt)
+
+
+def apply_order(db: Session, order: Order, sign: int = 1, items: Optional[Iterable[OrderItem]] = None) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) an order's lines from the daily rollups.
+    Runs inside the caller's transaction; nothing is committed here.
+    Cost uses the product's current cost price, so `rebuild_sales_rollups` reconciles any drift.
+    """
+    items = list(order.items if items is None else items)
+    if not items:
+        return
+    day = order.created_at.date()
+
+    by_product = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    by_category = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    total = dict.fromkeys(METRICS, 0)
+    for item in items:
+        product = item.product
+        revenue = item.quantity * item.price
+        cost = item.quantity * (product.price if product else 0.0)
+        category = product.category if product else "Uncategorized"
+        for bucket in (by_product[item.product_id], by_category[category], total):
+            bucket["units"] += sign * item.quantity
+            bucket["revenue"] += sign * revenue
+            bucket["cost"] += sign * cost
+    # An order counts once per product, once per category and once per day
+    for bucket in (*by_product.values(), *by_category.values(), total):
+        bucket["order_count"] = sign
+
+    _upsert_increments(db, SalesDaily, ("day",), [{"day": day, **total}])
+    _upsert_increments(
+        db, SalesDailyProduct, ("day", "product_id"),
+        [{"day": day, "product_id": pid, **m} for pid, m in by_product.items()],
+    )
+    _upsert_increments(
+        db, SalesDailyCategory, ("day", "category"),
+        [{"day": day, "category": cat, **m} for cat, m in by_category.items()],
+    )
+
+
+def record_status_change(
+    db: Session, order: Order, old_status: Optional[str], new_status: Optional[str],
+    items: Optional[Iterable[OrderItem]] = None,
+) -> None:
+    """Keep rollups in sync when an order enters or leaves a revenue status (None = created/deleted)."""
+    was_counted = old_status in REVENUE_STATUSES
+    is_counted = new_status in REVENUE_STATUSES
+    if is_counted and not was_counted:
+        apply_order(db, order, 1, items)
+    elif was_counted and not is_counted:
+        apply_order(db, order, -1, items)
+
+
+def rebuild_sales_rollups(db: Session) -> dict:
+    """Recompute every rollup table from order history. The caller commits."""
+    day = func.date(Order.created_at)
+    units = func.sum(OrderItem.quantity)
+    revenue = func.sum(OrderItem.quantity * OrderItem.price)
+    cost = func.sum(OrderItem.quantity * Product.price)
+    orders = func.count(distinct(Order.id))
+
+    def sales(*group_by):
+        return (
+            select(day, *group_by, units, revenue, cost, orders)
+            .select_from(OrderItem)
+            .join(Order, Order.id == OrderItem.order_id)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(Order.status.in_(REVENUE_STATUSES))
+            .group_by(day, *group_by)
+        )
+
+    for model in (SalesDaily, SalesDailyProduct, SalesDailyCategory):
+        db.execute(delete(model))
+
+    db.execute(insert(SalesDaily).from_select(["day", *METRICS], sales()))
+    db.execute(insert(SalesDailyProduct).from_select(["day", "product_id", *METRICS], sales(OrderItem.product_id)))
+    db.execute(insert(SalesDailyCategory).from_select(["day", "category", *METRICS], sales(Product.category)))
+
+    return {
+        model.__tablename__: db.query(func.count()).select_from(model).scalar()
+        for model in (SalesDaily, SalesDailyProduct, SalesDailyCategory)
+    }
@@ -0,0 +1,372 @@
+import re
+import math
+import bisect
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache_backend
+from app.db.session import SessionLocal, async_service
+from app.models.product import Product
+from app.schemas.product import ProductOut
+
+# ---------------- Tokenizing ----------------
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Per-field term frequency weights: a hit in the name counts more than one in the description
+FIELD_WEIGHTS = (("name", 3), ("category", 2), ("description", 1))
+
+# Score multipliers for non-exact matches
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.5
+MAX_EXPANSIONS = 20
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(value.lower()) if value else []
+
+
+def max_typos(token: str) -> int:
+    """Edit distance tolerated for a query token; short tokens must match exactly."""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    """All strings reachable from `term` by removing up to `distance` characters."""
+    results = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+# ---------------- In-memory BM25 index ----------------
+
+class InMemorySearchIndex:
+    """
+    Inverted index over product name, category and description, ranked with BM25.
+    Supports prefix expansion (autocomplete) and typo tolerance via a delete-neighbourhood
+    (SymSpell-style) lookup. Kept up to date incrementally by the product service.
+
+    Rebuilds never touch a live index: `build` fills a fresh one, which is then swapped in
+    whole (see `current_memory_index`).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.version = 0  # shared index version this copy reflects
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+
+    # -------- maintenance --------
+
+    @classmethod
+    def build(cls, db: Session, version: int = 0) -> "InMemorySearchIndex":
+        """A new index over the products table, reflecting shared index `version`."""
+        index = cls()
+        rows = db.query(Product.id, Product.name, Product.category, Product.description).yield_per(1000)
+        for row in rows:
+            index._add(row.id, {"name": row.name, "category": row.category, "description": row.description})
+        index.version = version
+        index.loaded = True
+        return index
+
+    def upsert(self, product: Product) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(product.id)
+            self._add(product.id, {f: getattr(product, f) for f, _ in FIELD_WEIGHTS})
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self.loaded:
+                self._remove(product_id)
+
+    def _add(self, doc_id: int, fields: dict) -> None:
+        terms: Dict[str, int] = defaultdict(int)
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(fields.get(field)):
+                terms[token] += weight
+        self._doc_terms[doc_id] = dict(terms)
+        self._doc_len[doc_id] = sum(terms.values())
+        self._total_len += self._doc_len[doc_id]
+        for term, tf in terms.items():
+            if term not in self._postings:
+                bisect.insort(self._vocabulary, term)
+                for variant in _deletes(term, max_typos(term)):
+                    self._deletes[variant].add(term)
+            self._postings[term][doc_id] = tf
+
+    def _remove(self, doc_id: int) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+                for variant in _deletes(term, max_typos(term)):
+                    self._deletes[variant].discard(term)
+                    if not self._deletes[variant]:
+                        del self._deletes[variant]
+
+    # -------- querying --------
+
+    def _expand(self, token: str, prefix: bool) -> Dict[str, float]:
+        """Map a query token to index terms with a match-quality weight."""
+        expansions: Dict[str, float] = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        if prefix:
+            start = bisect.bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start:start + MAX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                expansions.setdefault(term, PREFIX_WEIGHT)
+        if not expansions:
+            limit = max_typos(token)
+            candidates = set()
+            for variant in _deletes(token, limit):
+                candidates |= self._deletes.get(variant, set())
+            for term in candidates:
+                if edit_distance(token, term, limit) <= limit:
+                    expansions[term] = TYPO_WEIGHT
+        # Keep the most selective expansions when a short prefix matches many terms
+        if len(expansions) > MAX_EXPANSIONS:
+            ranked = sorted(expansions, key=lambda t: (-expansions[t], len(self._postings[t])))
+            expansions = {t: expansions[t] for t in ranked[:MAX_EXPANSIONS]}
+        return expansions
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """Return (product_id, score) pairs, best first. Every query token must match."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            avgdl = self._total_len / n_docs
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                # Prefix-match every token for autocomplete-style queries
+                expansions = self._expand(token, prefix=True)
+                token_scores: Dict[int, float] = defaultdict(float)
+                for term, weight in expansions.items():
+                    postings = self._postings[term]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc_id, tf in postings.items():
+                        norm = K1 * (1 - B + B * self._doc_len[doc_id] / avgdl)
+                        token_scores[doc_id] = max(
+                            token_scores[doc_id], weight * idf * tf * (K1 + 1) / (tf + norm)
+                        )
+                if scores is None:
+                    scores = dict(token_scores)
+                else:
+                    scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+                if not scores:
+                    return []
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+# ---------------- Postgres full-text backend ----------------
+
+# Must match the expression index created by the search migration
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+class PostgresSearchIndex:
+    """
+    Postgres `tsvector` search over the GIN expression index; ranks with ts_rank_cd and
+    falls back to pg_trgm similarity on the name for typos. The index is maintained by
+    Postgres itself, so incremental hooks are no-ops.
+    """
+
+    loaded = True
+
+    def upsert(self, product: Product) -> None:
+        pass
+
+    def remove(self, product_id: int) -> None:
+        pass
+
+    def search_db(self, db: Session, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        tsquery = " & ".join(f"{t}:*" for t in tokens)
+        rows = db.execute(
+            text(
+                f"SELECT id, ts_rank_cd({PG_DOCUMENT}, q) AS rank "
+                f"FROM products, to_tsquery('simple', :q) AS q "
+                f"WHERE {PG_DOCUMENT} @@ q ORDER BY rank DESC, id LIMIT :limit"
+            ),
+            {"q": tsquery, "limit": limit},
+        ).all()
+        if not rows:
+            rows = db.execute(
+                text(
+                    "SELECT id, similarity(name, :q) AS rank FROM products "
+                    "WHERE name % :q ORDER BY rank DESC, id LIMIT :limit"
+                ),
+                {"q": " ".join(tokens), "limit": limit},
+            ).all()
+        return [(row[0], float(row[1])) for row in rows]
+
+
+# ---------------- Backend selection ----------------
+
+_memory_index = InMemorySearchIndex()
+_rebuild_lock = threading.Lock()
+_postgres_index = PostgresSearchIndex()
+
+# Bumped in the shared cache backend on every product write. A worker whose in-memory
+# index is behind (another worker wrote) rebuilds it on its next search.
+INDEX_VERSION_KEY = "search_index:version"
+
+
+def get_search_index(db: Session):
+    """Pick the search backend for the session's database dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        return _postgres_index
+    return _memory_index
+
+
+def current_memory_index() -> InMemorySearchIndex:
+    """
+    The in-memory index, rebuilt first if it is stale. Blocking: call it from a worker thread.
+    One rebuild runs at a time, on its own session; concurrent callers wait for it and then
+    share the result. The finished index replaces the old one in a single assignment, so
+    searches never see a half-built index.
+    """
+    global _memory_index
+    version = get_cache_backend().get(INDEX_VERSION_KEY) or 0
+    if _memory_index.loaded and _memory_index.version == version:
+        return _memory_index
+    with _rebuild_lock:
+        version = get_cache_backend().get(INDEX_VERSION_KEY) or 0
+        if not (_memory_index.loaded and _memory_index.version == version):
+            db = SessionLocal()
+            try:
+                # Writes during the build bump the shared version, so the next search rebuilds again
+                _memory_index = InMemorySearchIndex.build(db, version)
+            finally:
+                db.close()
+        return _memory_index
+
+
+def _fetch_products(db: Session, hits: List[Tuple[int, float]]) -> List[Product]:
+    if not hits:
+        return []
+    ids = [product_id for product_id, _ in hits]
+    products = {p.id: p for p in db.query(Product).filter(Product.id.in_(ids)).all()}
+    return [products[i] for i in ids if i in products]
+
+
+def _search_postgres(db: Session, query: str, limit: int) -> List[Product]:
+    return _fetch_products(db, _postgres_index.search_db(db, query, limit))
+
+
+def search_products(db: Session, query: str, limit: int = 20) -> List[Product]:
+    """Full-text product search, best match first."""
+    if isinstance(get_search_index(db), PostgresSearchIndex):
+        return _search_postgres(db, query, limit)
+    return _fetch_products(db, current_memory_index().search(query, limit))
+
+
+def _bump_version(index) -> None:
+    new_version = get_cache_backend().incr(INDEX_VERSION_KEY)
+    # Our copy already has this change applied if it was current before the write
+    if index.version == new_version - 1:
+        index.version = new_version
+
+
+def index_product(db: Session, product: Product) -> None:
+    """Add or refresh a product in the search index after it was written."""
+    index = get_search_index(db)
+    index.upsert(product)
+    if isinstance(index, InMemorySearchIndex):
+        _bump_version(index)
+
+
+def unindex_product(db: Session, product_id: int) -> None:
+    """Drop a deleted product from the search index."""
+    index = get_search_index(db)
+    index.remove(product_id)
+    if isinstance(index, InMemorySearchIndex):
+        _bump_version(index)
+
+
+def invalidate_search_index(db: Session) -> None:
+    """
+    After a bulk write: every in-memory index copy (ours included) rebuilds on its next search,
+    instead of being updated product by product. Postgres indexes are maintained by the database.
+    """
+    index = get_search_index(db)
+    if isinstance(index, InMemorySearchIndex):
+        get_cache_backend().incr(INDEX_VERSION_KEY)
+
+
+# ---------------- Async API (AsyncSession) ----------------
+_search_postgres_async = async_service(_search_postgres, ProductOut)
+_fetch_products_async = async_service(_fetch_products, ProductOut)
+
+
+def _search_memory(query: str, limit: int) -> List[Tuple[int, float]]:
+    return current_memory_index().search(query, limit)
+
+
+async def search_products_async(db: AsyncSession, query: str, limit: int = 20) -> List[ProductOut]:
+    """
+    Full-text product search for async routes. In-memory ranking (and any index rebuild) runs
+    in a worker thread, never on the event loop; only the product fetch uses the AsyncSession.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_postgres_async(db, query, limit)
+    hits = await asyncio.to_thread(_search_memory, query, limit)
+    return await _fetch_products_async(db, hits)
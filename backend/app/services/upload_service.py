@@ -0,0 +1,394 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import BinaryIO, List, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.storage import get_storage, immutable_cache_control
+from app.db.session import SessionLocal, async_service
+from app.models.product import Product
+from app.models.upload_blob import UploadBlob
+from app.services.image_service import delete_variants
+
+
+# A SHA-256 anywhere in an upload path marks content-addressed (immutable) files:
+# originals "ab/cd/<sha256>.jpg" and their variants "variants/ab/cd/<sha256>.jpg.320w.webp"
+CONTENT_HASH = re.compile(r"(?:^|/)([0-9a-f]{64})(?:\.|$)")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Accepted image types: content type -> stored extension
+IMAGE_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+UNSUPPORTED_IMAGE = "Unsupported image type. Allowed: JPEG, PNG, GIF, WebP, AVIF"
+
+# Storage deletes after a commit; remote storage calls must not run on the event loop
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-cleanup")
+
+
+def content_hash(path: str) -> Optional[str]:
+    """The content hash embedded in an upload path, or None for legacy (named) uploads."""
+    match = CONTENT_HASH.search(path)
+    return match.group(1) if match else None
+
+
+def content_path(digest: str, extension: str) -> str:
+    """Sharded storage path for a hash: "ab/cd/<hash><ext>"."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Content type from an image's magic bytes; the client's filename and Content-Type are not trusted."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    return None
+
+
+# ---------------- Ingestion ----------------
+
+@dataclass
+class StoredUpload:
+    """An image in storage under its content hash, waiting for `store_upload` to record it."""
+    key: str
+    sha256: str
+    size: int
+    content_type: str
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Image exceeds {max_bytes} bytes",
+    )
+
+
+def _ingest(source: BinaryIO, max_bytes: int) -> StoredUpload:
+    storage = get_storage()
+    fd, tmp_path = tempfile.mkstemp(dir=storage.staging_dir)
+    digest, size, content_type = hashlib.sha256(), 0, None
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(COPY_CHUNK_SIZE):
+                if content_type is None:
+                    content_type = sniff_image_type(chunk)
+                    if content_type is None:
+                        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMAGE)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+        if content_type is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty image file")
+
+        sha256 = digest.hexdigest()
+        key = content_path(sha256, IMAGE_TYPES[content_type])
+        # Always put, even if the key exists: a pending cleanup of an orphan with the same
+        # content may be about to delete it. Identical bytes, so overwriting is harmless.
+        storage.put_file(key, tmp_path, content_type, immutable_cache_control())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return StoredUpload(key, sha256, size, content_type)
+
+
+async def ingest_upload(file: UploadFile, max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Stream an uploaded image into storage under its content hash. The copy runs in a worker
+    thread chunk by chunk, hashing on the way, so a large upload never blocks the event loop or
+    sits in memory. 415 unless the magic bytes are a supported image; 413 past UPLOAD_MAX_BYTES.
+    Pass the result to `store_upload` (or `register_upload`) to record it, inside
+    `discard_on_error` so a failed request does not leave the file behind.
+    """
+    return await asyncio.to_thread(_ingest, file.file, max_bytes or settings.UPLOAD_MAX_BYTES)
+
+
+def discard_upload(db: Session, upload: StoredUpload) -> None:
+    """Delete an ingested upload whose request failed, unless its content is recorded (by this or another request)."""
+    db.rollback()
+    if db.scalar(select(UploadBlob.sha256).where(UploadBlob.sha256 == upload.sha256)) is None:
+        remove_upload_later(upload.key)
+
+
+@asynccontextmanager
+async def discard_on_error(db: AsyncSession, upload):
+    """
+    Wrap the service call that records an ingested upload: if it fails (unknown product,
+    validation error, database error...), the file just put into storage is deleted again.
+    Keys of direct uploads (str) are left alone.
+    """
+    try:
+        yield
+    except BaseException:
+        if isinstance(upload, StoredUpload):
+            await discard_upload_async(db, upload)
+        raise
+
+
+# ---------------- Direct uploads ----------------
+# With S3 storage, browsers PUT images straight into the bucket: `presign_upload` hands out a
+# URL for the content-addressed key, then `verify_direct_upload` checks what arrived.
+
+def presign_upload(content_type: str, size: int, sha256: str) -> dict:
+    """
+    Key and presigned request for uploading an image with the given SHA-256. `upload` is None
+    when identical content is already stored. 501 if the storage backend has no direct uploads.
+    """
+    if content_type not in IMAGE_TYPES:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMAGE)
+    if size > settings.UPLOAD_MAX_BYTES:
+        raise _too_large(settings.UPLOAD_MAX_BYTES)
+    storage = get_storage()
+    key = content_path(sha256, IMAGE_TYPES[content_type])
+    upload = storage.presigned_upload(key, content_type, size, sha256)
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads need STORAGE_BACKEND=s3; post the file to /uploads/upload-image",
+        )
+    return {"key": key, "upload": None if storage.exists(key) else upload}
+
+
+def verify_direct_upload(key: str) -> StoredUpload:
+    """
+    Check an object uploaded with `presign_upload`: it must exist (404), be a supported image
+    matching its key's extension (415), fit UPLOAD_MAX_BYTES (413) and hash to the key (422).
+    Invalid objects are deleted. Blocking storage calls: run it in a thread.
+    """
+    sha256 = content_hash(key)
+    extension = os.path.splitext(key)[1]
+    if not sha256 or key != content_path(sha256, extension):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload key")
+    storage = get_storage()
+    size = storage.size(key)
+    if size is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+
+    try:
+        if size > settings.UPLOAD_MAX_BYTES:
+            raise _too_large(settings.UPLOAD_MAX_BYTES)
+        content_type = sniff_image_type(storage.read_head(key, 16))
+        if content_type is None or IMAGE_TYPES[content_type] != extension:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMAGE)
+        checksum = storage.checksum_sha256(key)
+        if checksum is None:
+            # The backend did not verify a checksum on upload: hash the object here
+            digest = hashlib.sha256()
+            with storage.local_copy(key) as path, open(path, "rb") as f:
+                while chunk := f.read(COPY_CHUNK_SIZE):
+                    digest.update(chunk)
+            checksum = digest.hexdigest()
+        if checksum != sha256:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Uploaded content does not match its hash",
+            )
+    except HTTPException:
+        storage.delete(key)
+        raise
+    return StoredUpload(key, sha256, size, content_type)
+
+
+# ---------------- Store / release ----------------
+
+def _insert_blob(db: Session, upload: StoredUpload, ref_count: int):
+    insert_fn = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    return insert_fn(UploadBlob).values(
+        sha256=upload.sha256, path=upload.key, size=upload.size, content_type=upload.content_type,
+        ref_count=ref_count, created_at=datetime.utcnow(),
+    )
+
+
+def store_upload(db: Session, upload: StoredUpload) -> str:
+    """
+    Record a stored upload and take a reference to it, in the caller's transaction. Returns the
+    path that identical content is recorded under.
+    """
+    db.execute(_insert_blob(db, upload, 1).on_conflict_do_update(
+        index_elements=["sha256"], set_={"ref_count": UploadBlob.ref_count + 1},
+    ))
+    return db.scalar(select(UploadBlob.path).where(UploadBlob.sha256 == upload.sha256))
+
+
+def register_upload(db: Session, upload: StoredUpload) -> str:
+    """Record an upload nothing owns yet (no reference taken) and commit; `retain_upload` attaches it later."""
+    db.execute(_insert_blob(db, upload, 0).on_conflict_do_nothing(index_elements=["sha256"]))
+    db.commit()
+    return db.scalar(select(UploadBlob.path).where(UploadBlob.sha256 == upload.sha256))
+
+
+def retain_upload(db: Session, path: str) -> str:
+    """Take a reference to a recorded upload (from `register_upload`) in the caller's transaction; 404 if unknown."""
+    result = db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.path == path)
+        .values(ref_count=UploadBlob.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return path
+
+
+def release_upload(db: Session, path: Optional[str], exclude_product_id: Optional[int] = None) -> Optional[str]:
+    """
+    Drop one reference to an upload in the caller's transaction. Returns the path if nothing
+    references it any more; the caller deletes it with `remove_upload` after committing.
+
+    Legacy uploads stored by name are untracked: they count as orphaned only when no product
+    (other than `exclude_product_id`) still uses the file.
+    """
+    if not path:
+        return None
+    blob = db.scalar(select(UploadBlob).where(UploadBlob.path == path))
+    if blob is None:
+        query = select(Product.id).where(Product.image_url == path)
+        if exclude_product_id is not None:
+            query = query.where(Product.id != exclude_product_id)
+        return None if db.scalar(query.limit(1)) else path
+
+    db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.sha256 == blob.sha256)
+        .values(ref_count=UploadBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(blob)
+    if blob.ref_count > 0:
+        return None
+    db.delete(blob)
+    return path
+
+
+def remove_upload(path: Optional[str]) -> None:
+    """Delete an orphaned upload and its image variants from storage."""
+    if not path:
+        return
+    get_storage().delete(path)
+    delete_variants(path)
+
+
+def _recorded(path: str) -> bool:
+    """Whether identical content was recorded again since the upload was released."""
+    digest = content_hash(path)
+    if digest is None:
+        return False
+    with SessionLocal() as db:
+        return db.scalar(select(UploadBlob.sha256).where(UploadBlob.sha256 == digest)) is not None
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        if _recorded(path):
+            return
+        remove_upload(path)
+    except Exception as e:
+        print(f"❌ Failed to remove upload {path}: {e}")
+
+
+def remove_upload_later(path: Optional[str]) -> None:
+    """`remove_upload` in a background thread, for services running on the event loop."""
+    if path:
+        _cleanup_executor.submit(_remove_quietly, path)
+
+
+# ---------------- Unclaimed uploads ----------------
+
+def delete_unclaimed_uploads(db: Session, batch_size: int = 500) -> List[str]:
+    """
+    Drop blob rows `register_upload` recorded that nothing took a reference to within
+    UPLOAD_UNCLAIMED_TTL seconds, and commit. Returns their paths for `remove_upload`.
+    A row is only deleted while its ref_count is still 0, so a concurrent `retain_upload` wins.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.UPLOAD_UNCLAIMED_TTL)
+    candidates = db.execute(
+        select(UploadBlob.sha256, UploadBlob.path)
+        .where(UploadBlob.ref_count <= 0, UploadBlob.created_at < cutoff)
+        .limit(batch_size)
+    ).all()
+    orphaned = []
+    for sha256, path in candidates:
+        result = db.execute(
+            delete(UploadBlob)
+            .where(UploadBlob.sha256 == sha256, UploadBlob.ref_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            orphaned.append(path)
+    db.commit()
+    return orphaned
+
+
+class UploadSweeper:
+    """Background task deleting unclaimed uploads every UPLOAD_SWEEP_INTERVAL seconds."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.deleted = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.deleted += await asyncio.to_thread(self.sweep)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Unclaimed upload sweep failed: {e}")
+            await asyncio.sleep(settings.UPLOAD_SWEEP_INTERVAL)
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            paths = delete_unclaimed_uploads(db)
+        finally:
+            db.close()
+        for path in paths:
+            _remove_quietly(path)
+        return len(paths)
+
+
+upload_sweeper = UploadSweeper()
+
+
+# ---------------- Async API (AsyncSession) ----------------
+register_upload_async = async_service(register_upload)
+discard_upload_async = async_service(discard_upload)
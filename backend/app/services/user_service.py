@@ -0,0 +1,40 @@
+from typing import Union
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db.session import async_service
+from app.models.user import User
+from app.schemas.user import UserOut
+from app.services.upload_service import (
+    StoredUpload, content_hash, release_upload, remove_upload_later, retain_upload, store_upload,
+)
+
+
+def set_user_photo(db: Session, user_id: int, photo: Union[StoredUpload, str, None]) -> User:
+    """
+    Replace a user's profile photo: an upload just ingested, the key of one uploaded directly to
+    storage, or None to remove it. The previous photo is deleted once nothing references it.
+    """
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    # Only content-addressed photos are tracked; anything older is left alone
+    orphaned_photo = release_upload(db, user.photo_url) if user.photo_url and content_hash(user.photo_url) else None
+    if isinstance(photo, str):
+        user.photo_url = retain_upload(db, photo)
+    elif photo is not None:
+        user.photo_url = store_upload(db, photo)
+    else:
+        user.photo_url = None
+    if orphaned_photo == user.photo_url:
+        orphaned_photo = None  # same picture uploaded again
+    db.commit()
+    remove_upload_later(orphaned_photo)
+    db.refresh(user)
+    return user
+
+
+# ---------------- Async API (AsyncSession) ----------------
+set_user_photo_async = async_service(set_user_photo, UserOut)
@@ -0,0 +1,53 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time: point the app at a scratch database before anything imports it
+_scratch_dir = tempfile.mkdtemp(prefix="shop-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch_dir, 'app.db')}"
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.pool import engine_options, install_connect_hooks  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "postgres: runs against TEST_POSTGRES_URL (a scratch database); skipped when it is unset",
+    )
+
+
+def _sqlite_url(tmp_path) -> str:
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+
+@pytest.fixture(params=["sqlite", pytest.param("postgres", marks=pytest.mark.postgres)])
+def db_engine(request, tmp_path):
+    """
+    A file-backed SQLite database, and the Postgres database in TEST_POSTGRES_URL when set.
+    Tables are created from the models and dropped afterwards.
+    """
+    if request.param == "postgres":
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+    else:
+        url = _sqlite_url(tmp_path)
+    engine = create_engine(url, future=True, **engine_options(url))
+    install_connect_hooks(engine)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return sessionmaker(bind=db_engine, autoflush=False, autocommit=False)
@@ -0,0 +1,55 @@
+# tests/test_auth_cache.py
+import pytest
+from sqlalchemy import update
+
+from app.core import cache as cache_module
+from app.core.auth_cache import get_user_snapshot, invalidate_user, user_cache
+from app.core.cache import MemoryCacheBackend
+from app.core.roles import Role
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(cache_module, "_backend", MemoryCacheBackend())
+    user_cache.local.clear()
+    yield
+    user_cache.local.clear()
+
+
+def _add_user(db, **fields) -> User:
+    user = User(name="Grace", email="grace@example.com", password_hash="x", role=Role.USER, **fields)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_unknown_users_are_not_cached(session_factory):
+    with session_factory() as db:
+        assert get_user_snapshot(db, 1) is None
+        user = _add_user(db, id=1)
+        assert get_user_snapshot(db, user.id).email == "grace@example.com"
+
+
+def test_core_updates_take_effect_once_invalidated(session_factory):
+    with session_factory() as db:
+        user = _add_user(db)
+        assert get_user_snapshot(db, user.id).role == Role.USER
+
+        # A Core UPDATE bypasses the ORM commit hooks: the snapshot stays until invalidated
+        db.execute(update(User).where(User.id == user.id).values(role=Role.ADMIN, is_verified=True))
+        db.commit()
+        assert get_user_snapshot(db, user.id).role == Role.USER
+
+        invalidate_user(user.id)
+        snapshot = get_user_snapshot(db, user.id)
+        assert (snapshot.role, snapshot.is_verified) == (Role.ADMIN, True)
+
+
+def test_orm_commits_invalidate_the_snapshot(session_factory):
+    with session_factory() as db:
+        user = _add_user(db)
+        assert get_user_snapshot(db, user.id).role == Role.USER
+        user.role = Role.READ_ADMIN
+        db.commit()
+        assert get_user_snapshot(db, user.id).role == Role.READ_ADMIN
@@ -0,0 +1,79 @@
+# tests/test_cache_redis.py
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("redis")
+
+from app.core import cache as cache_module  # noqa: E402
+from app.core.cache import RedisCacheBackend, VersionedCache, set_cache_backend  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def redis_url(monkeypatch):
+    """A fakeredis server on a local TCP port, installed as this process's cache backend."""
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    url = f"redis://{host}:{port}/0"
+    monkeypatch.setattr(cache_module, "_backend", None)
+    set_cache_backend(RedisCacheBackend(url, prefix="test:"))
+    try:
+        yield url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _in_other_process(redis_url: str, code: str) -> None:
+    """Run `code` in a separate interpreter using the same Redis as its cache backend."""
+    env = {**os.environ, "CACHE_BACKEND": "redis", "CACHE_URL": redis_url, "CACHE_KEY_PREFIX": "test:"}
+    setup = "from app.core.cache import VersionedCache\ncache = VersionedCache('products')\n"
+    subprocess.run([sys.executable, "-c", setup + code], cwd=BACKEND_DIR, env=env, check=True, timeout=60)
+
+
+def test_other_process_invalidates_one_key(redis_url):
+    cache = VersionedCache("products")
+    loads = []
+
+    def loader(value):
+        def load():
+            loads.append(value)
+            return value
+        return load
+
+    assert cache.get_or_set(1, loader("v1")) == "v1"
+    assert cache.get_or_set(2, loader("other")) == "other"
+    assert cache.get_or_set(1, loader("unused")) == "v1"  # served by the local LRU
+    assert loads == ["v1", "other"]
+
+    _in_other_process(redis_url, "cache.invalidate(1)")
+
+    assert cache.get_or_set(1, loader("v2")) == "v2"
+    assert cache.get_or_set(2, loader("unused")) == "other"
+    assert loads == ["v1", "other", "v2"]
+
+
+def test_other_process_invalidates_the_namespace(redis_url):
+    cache = VersionedCache("products")
+    cache.get_or_set("page:1", lambda: ["a"])
+    version = cache.version()
+
+    _in_other_process(redis_url, "cache.invalidate_all()")
+
+    assert cache.version() == version + 1
+    assert cache.get_or_set("page:1", lambda: ["b"]) == ["b"]
+
+
+def test_other_process_reads_entries_this_one_stored(redis_url):
+    VersionedCache("products").get_or_set(7, lambda: {"id": 7})
+
+    # The other process finds the entry in Redis instead of calling its loader
+    _in_other_process(redis_url, "assert cache.get_or_set(7, lambda: None) == {'id': 7}")
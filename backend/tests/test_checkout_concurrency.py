@@ -0,0 +1,132 @@
+# tests/test_checkout_concurrency.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core.roles import Role
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import CartOperation
+from app.services.cart_service import apply_cart_batch, checkout_cart_items
+
+BUYERS = 40
+QUANTITY = 2
+STOCK = 25  # enough for 12 of the 40 carts
+
+
+def _seed(session_factory, buyers: int, stock: int):
+    """One hot product and `buyers` users, each with a pending cart holding QUANTITY units of it."""
+    with session_factory() as db:
+        product = Product(name="Hot item", sku="HOT-1", price=5.0, selling_price=10.0, stock=stock)
+        db.add(product)
+        db.flush()
+        carts = []
+        for i in range(buyers):
+            user = User(name=f"Buyer {i}", email=f"buyer{i}@example.com", password_hash="x", role=Role.USER)
+            cart = Order(user=user, status="pending", total_amount=QUANTITY * product.selling_price)
+            item = OrderItem(order=cart, product_id=product.id, quantity=QUANTITY, price=product.selling_price)
+            db.add_all([user, cart, item])
+            db.flush()
+            carts.append((user.id, cart.id, item.id))
+        db.commit()
+        return product.id, carts
+
+
+def _stock(session_factory, product_id: int) -> int:
+    with session_factory() as db:
+        return db.get(Product, product_id).stock
+
+
+def _run_together(calls):
+    """Run every call in its own thread, released at the same moment. Returns results or HTTPExceptions."""
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        barrier.wait()
+        try:
+            return call()
+        except HTTPException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        return list(pool.map(run, calls))
+
+
+def _checkout(session_factory, user_id: int, cart_id: int, item_id: int, key=None):
+    def call():
+        with session_factory() as db:
+            user = db.get(User, user_id)
+            return checkout_cart_items(db, user, [item_id], cart_id, key).id
+    return call
+
+
+def test_hot_sku_is_never_oversold(session_factory):
+    product_id, carts = _seed(session_factory, BUYERS, STOCK)
+
+    results = _run_together([
+        _checkout(session_factory, user_id, cart_id, item_id, key=f"checkout-{cart_id}")
+        for user_id, cart_id, item_id in carts
+    ])
+
+    orders = [r for r in results if not isinstance(r, HTTPException)]
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert all(e.status_code == 400 for e in errors), [e.detail for e in errors]
+
+    final_stock = _stock(session_factory, product_id)
+    assert final_stock >= 0
+    assert len(orders) * QUANTITY == STOCK - final_stock
+    assert len(orders) == STOCK // QUANTITY
+    with session_factory() as db:
+        paid = db.query(Order).filter(Order.status == "paid").count()
+    assert paid == len(orders)
+
+
+def test_retries_with_the_same_idempotency_key_replay_the_order(session_factory):
+    product_id, [(user_id, cart_id, item_id)] = _seed(session_factory, 1, STOCK)
+    retry = _checkout(session_factory, user_id, cart_id, item_id, key="same-key")
+
+    # Racing retries: whichever commits first produces the order, the rest replay it
+    # (Postgres may instead answer 409 while the first one is still in flight)
+    results = _run_together([retry] * 8)
+    order_ids = {r for r in results if not isinstance(r, HTTPException)}
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(order_ids) == 1
+    assert all(e.status_code == 409 for e in errors), [e.detail for e in errors]
+
+    # A later retry replays the same order without touching stock again
+    assert retry() == order_ids.pop()
+    assert _stock(session_factory, product_id) == STOCK - QUANTITY
+
+
+def test_cart_batch_answers_503_when_the_database_is_locked(db_engine, session_factory):
+    if db_engine.dialect.name != "sqlite":
+        pytest.skip("exercises SQLite's busy_timeout")
+    product_id, [(user_id, cart_id, item_id)] = _seed(session_factory, 1, STOCK)
+
+    # Another writer holds the database lock for the whole batch
+    locker = db_engine.raw_connection()
+    try:
+        locker.execute("BEGIN IMMEDIATE")
+        with session_factory() as db:
+            db.execute(text("PRAGMA busy_timeout=0"))
+            user = db.get(User, user_id)
+            with pytest.raises(HTTPException) as raised:
+                apply_cart_batch(db, user, [CartOperation(op="add", product_id=product_id, quantity=1)])
+            assert raised.value.status_code == 503
+            assert raised.value.headers["Retry-After"] == "1"
+            # The session was rolled back and is usable again
+            assert db.get(Order, cart_id).total_amount == QUANTITY * 10.0
+        locker.rollback()
+    finally:
+        locker.close()
+
+    # Once the lock is gone the same batch goes through
+    with session_factory() as db:
+        user = db.get(User, user_id)
+        cart = apply_cart_batch(db, user, [CartOperation(op="add", product_id=product_id, quantity=1)])
+        assert cart.total_amount == (QUANTITY + 1) * 10.0
@@ -0,0 +1,167 @@
+# tests/test_compression.py
+import asyncio
+import os
+import zlib
+
+import pytest
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression as compression_module
+from app.core.compression import CompressionMiddleware, compression, compression_metrics
+
+MIN_SIZE = 100
+TEXT = "hello compression " * 200
+CHUNKS = [f"line {i} ".encode() * 50 for i in range(3)]
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse(TEXT, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("hi")
+
+    @app.get("/random")
+    def random_bytes():
+        return Response(os.urandom(4096), media_type="text/plain")
+
+    @app.get("/partial")
+    def partial():
+        return PlainTextResponse(TEXT[:500], status_code=206, headers={"Content-Range": "bytes 0-499/3600"})
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(CHUNKS), media_type="text/plain")
+
+    @app.get("/off", dependencies=[Depends(compression(enabled=False))])
+    def off():
+        return PlainTextResponse(TEXT)
+
+    @app.get("/fast", dependencies=[Depends(compression(gzip=1))])
+    def fast():
+        return PlainTextResponse(TEXT)
+
+    return app
+
+
+@pytest.fixture
+def app():
+    return CompressionMiddleware(_app(), minimum_size=MIN_SIZE, encodings=["gzip"])
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app, headers={"Accept-Encoding": "gzip"})
+
+
+def _skips(reason: str) -> int:
+    return compression_metrics.stats()["skipped"].get(reason, 0)
+
+
+def _exchange(app, path: str):
+    """Run one GET through the ASGI app and return every message it sent, unmerged."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_single_body_is_compressed_with_a_weak_etag(client):
+    response = client.get("/text")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(TEXT)
+    assert response.text == TEXT
+
+
+def test_client_without_accept_encoding_gets_identity(client):
+    response = client.get("/text", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+    assert response.text == TEXT
+
+
+def test_streamed_chunks_are_flushed_as_they_come(app):
+    messages = _exchange(app, "/stream")
+
+    start, *bodies = messages
+    headers = {k.decode().lower(): v.decode() for k, v in start["headers"]}
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # One message per chunk, then the empty closing message carrying the gzip trailer
+    assert [m.get("more_body", False) for m in bodies] == [True] * len(CHUNKS) + [False]
+
+    # Each chunk decodes on its own: nothing is held back in the compressor
+    decoder = zlib.decompressobj(31)
+    for chunk, message in zip(CHUNKS, bodies):
+        assert decoder.decompress(message["body"]) == chunk
+    assert decoder.decompress(bodies[-1]["body"]) == b""
+    assert decoder.eof
+
+
+@pytest.mark.parametrize("path, reason", [
+    ("/small", "too_small"),
+    ("/random", "incompressible"),
+    ("/partial", "status"),
+    ("/not-modified", "status"),
+    ("/off", "disabled"),
+])
+def test_passthrough(client, path, reason):
+    before = _skips(reason)
+
+    response = client.get(path)
+
+    assert "content-encoding" not in response.headers
+    assert _skips(reason) == before + 1
+    if path == "/not-modified":
+        assert response.status_code == 304
+        assert response.headers["etag"] == '"v1"'
+    if path == "/partial":
+        assert response.status_code == 206
+        assert response.text == TEXT[:500]
+
+
+def test_route_levels_override_the_defaults(client, monkeypatch):
+    levels = []
+    gzip_codec = compression_module.CODECS["gzip"]
+
+    def spy(level):
+        levels.append(level)
+        return gzip_codec(level)
+
+    monkeypatch.setitem(compression_module.CODECS, "gzip", spy)
+    monkeypatch.setattr(compression_module.settings, "COMPRESSION_GZIP_LEVEL", 6)
+
+    assert client.get("/fast").text == TEXT
+    assert client.get("/text").text == TEXT
+    assert levels == [1, 6]
@@ -0,0 +1,142 @@
+# tests/test_email_worker.py
+import asyncio
+import socket
+from email import message_from_bytes, policy
+
+import pytest
+
+pytest.importorskip("aiosmtplib")
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.roles import Role  # noqa: E402
+from app.db.session import async_database_url  # noqa: E402
+from app.models.email_outbox import EmailOutbox  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import email_service  # noqa: E402
+from app.services.auth_service import send_password_reset_email, send_verification_email  # noqa: E402
+from app.services.email_service import EmailWorker, enqueue_email  # noqa: E402
+
+
+class Inbox:
+    """aiosmtpd handler keeping every message it receives; set `reject` to refuse them for good."""
+
+    def __init__(self):
+        self.messages = []
+        self.reject = False
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject:
+            return "554 Transaction failed"
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def inbox(monkeypatch, session_factory):
+    """A local SMTP server the email worker delivers to, reading the outbox of the test database."""
+    handler = Inbox()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(settings, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(settings, "SMTP_SSL", False)
+    monkeypatch.setattr(settings, "SMTP_USER", None)
+    monkeypatch.setattr(email_service, "SessionLocal", session_factory)
+    try:
+        yield handler
+    finally:
+        controller.stop()
+
+
+async def _drain() -> EmailWorker:
+    worker = EmailWorker()
+    try:
+        while await worker.drain_once():
+            pass
+    finally:
+        await worker.stop()
+    return worker
+
+
+def test_worker_delivers_each_queued_email_once(inbox, session_factory):
+    with session_factory() as db:
+        assert enqueue_email(db, "a@example.com", "Hello", "First", dedupe_key="welcome:1")
+        assert not enqueue_email(db, "a@example.com", "Hello", "Again", dedupe_key="welcome:1")
+        assert enqueue_email(db, "b@example.com", "Hello", "Second")
+        db.commit()
+
+    worker = asyncio.run(_drain())
+
+    assert worker.sent == 2 and worker.failed == 0
+    assert sorted(m.rcpt_tos[0] for m in inbox.messages) == ["a@example.com", "b@example.com"]
+    with session_factory() as db:
+        assert {row.status for row in db.scalars(select(EmailOutbox))} == {"sent"}
+
+
+def _add_user(session_factory) -> int:
+    with session_factory() as db:
+        user = User(name="Ada", email="ada@example.com", password_hash="x", role=Role.USER)
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+async def _request_emails(db_engine, user_id: int, times: int = 1):
+    """Ask for verification and reset emails `times` times; returns the user's tokens afterwards."""
+    engine = create_async_engine(async_database_url(db_engine.url.render_as_string(hide_password=False)))
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            user = await db.get(User, user_id)
+            for _ in range(times):
+                await send_verification_email(user, db)
+                await send_password_reset_email(user, db)
+            return user.verification_token, user.reset_token
+    finally:
+        await engine.dispose()
+
+
+def test_repeated_requests_mail_one_link_per_window(inbox, session_factory, db_engine):
+    user_id = _add_user(session_factory)
+
+    verification_token, reset_token = asyncio.run(_request_emails(db_engine, user_id, times=3))
+    asyncio.run(_drain())
+
+    bodies = sorted(message_from_bytes(m.content, policy=policy.default).get_content() for m in inbox.messages)
+    assert len(bodies) == 2
+    # The mailed links carry the tokens that are still valid
+    assert f"reset-password?token={reset_token}" in bodies[0]
+    assert f"verify-email?token={verification_token}" in bodies[1]
+
+
+def test_failed_delivery_does_not_block_a_new_request(inbox, session_factory, db_engine):
+    user_id = _add_user(session_factory)
+
+    inbox.reject = True
+    old_tokens = asyncio.run(_request_emails(db_engine, user_id))
+    worker = asyncio.run(_drain())
+    assert worker.failed == 2 and not inbox.messages
+
+    # Same dedupe window: the failed messages no longer count, so fresh links are queued and mailed
+    inbox.reject = False
+    verification_token, reset_token = asyncio.run(_request_emails(db_engine, user_id))
+    assert (verification_token, reset_token) != old_tokens
+    asyncio.run(_drain())
+
+    bodies = sorted(message_from_bytes(m.content, policy=policy.default).get_content() for m in inbox.messages)
+    assert len(bodies) == 2
+    assert f"reset-password?token={reset_token}" in bodies[0]
+    assert f"verify-email?token={verification_token}" in bodies[1]
+    with session_factory() as db:
+        statuses = sorted(row.status for row in db.scalars(select(EmailOutbox)))
+    assert statuses == ["failed", "failed", "sent", "sent"]
@@ -0,0 +1,98 @@
+# tests/test_password_pool.py
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import security
+from app.core.config import settings
+from app.core.roles import Role
+from app.db.session import async_database_url, get_async_db
+from app.main import app
+from app.models.user import User
+
+PASSWORD = "correct horse"
+
+
+def _context(rounds: int) -> CryptContext:
+    """The module's password context as it is built with BCRYPT_ROUNDS=rounds."""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+@pytest.fixture
+def client(monkeypatch, db_engine):
+    """The app on the test database, hashing inline (no worker processes) at cheap bcrypt rounds."""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(security, "pwd_context", _context(4))
+    monkeypatch.setattr(security, "_slots", threading.BoundedSemaphore(2))
+    engine = create_async_engine(
+        async_database_url(db_engine.url.render_as_string(hide_password=False)), poolclass=NullPool,
+    )
+
+    async def test_db():
+        async with AsyncSession(engine, autoflush=False) as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = test_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+
+
+def _add_user(session_factory, password_hash: str) -> int:
+    with session_factory() as db:
+        user = User(
+            name="Alan", email="alan@example.com", password_hash=password_hash, role=Role.USER, is_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+def _login(client):
+    return client.post("/auth/token", data={"username": "alan@example.com", "password": PASSWORD})
+
+
+def test_login_answers_503_while_the_pool_queue_is_full(client, session_factory):
+    _add_user(session_factory, _context(4).hash(PASSWORD))
+
+    # Every slot is held by a call still queued or running
+    slots = security._slots
+    assert slots.acquire(blocking=False) and slots.acquire(blocking=False)
+    try:
+        response = _login(client)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+    finally:
+        slots.release()
+        slots.release()
+
+    # Slots come back once calls finish, including the ones made by a login
+    assert _login(client).status_code == 200
+    assert _login(client).status_code == 200
+
+
+def test_login_rehashes_when_bcrypt_rounds_change(client, session_factory, monkeypatch):
+    user_id = _add_user(session_factory, _context(4).hash(PASSWORD))
+
+    assert _login(client).status_code == 200
+    with session_factory() as db:
+        assert db.get(User, user_id).password_hash.startswith("$2b$04$")
+
+    # BCRYPT_ROUNDS raised: the next successful login stores a hash at the new cost
+    monkeypatch.setattr(security, "pwd_context", _context(5))
+    assert _login(client).status_code == 200
+    with session_factory() as db:
+        upgraded = db.get(User, user_id).password_hash
+    assert upgraded.startswith("$2b$05$")
+    assert _context(5).verify(PASSWORD, upgraded)
+
+    # A wrong password never rewrites the hash
+    response = client.post("/auth/token", data={"username": "alan@example.com", "password": "wrong"})
+    assert response.status_code == 401
+    with session_factory() as db:
+        assert db.get(User, user_id).password_hash == upgraded
@@ -0,0 +1,125 @@
+# tests/test_product_import.py
+import hashlib
+import json
+import os
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.import_job import ImportJob
+from app.models.product import Product
+from app.models.upload_blob import UploadBlob
+from app.services import import_service
+from app.services.import_service import create_import_job, run_import_job
+from app.services.upload_service import StoredUpload, content_path, register_upload
+
+
+@pytest.fixture
+def removed(monkeypatch, session_factory):
+    """Run imports against the test database; collects the images handed to remove_upload_later."""
+    paths = []
+    monkeypatch.setattr(import_service, "SessionLocal", session_factory)
+    monkeypatch.setattr(import_service, "remove_upload_later", paths.append)
+    return paths
+
+
+def _import(session_factory, tmp_path, fmt: str, text: str) -> ImportJob:
+    path = tmp_path / f"import.{fmt}"
+    path.write_text(text, encoding="utf-8")
+    with session_factory() as db:
+        job_id = create_import_job(db, None, path.name, fmt).id
+    run_import_job(job_id, str(path))
+    assert not os.path.exists(path)
+    with session_factory() as db:
+        return db.get(ImportJob, job_id)
+
+
+def _ndjson(*rows) -> str:
+    return "".join((row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows)
+
+
+def _products(session_factory) -> dict:
+    with session_factory() as db:
+        return {p.sku: p for p in db.scalars(select(Product))}
+
+
+def _upload(session_factory, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()
+    with session_factory() as db:
+        return register_upload(db, StoredUpload(content_path(digest, ".jpg"), digest, len(content), "image/jpeg"))
+
+
+def _ref_counts(session_factory) -> dict:
+    with session_factory() as db:
+        return {blob.path: blob.ref_count for blob in db.scalars(select(UploadBlob))}
+
+
+def test_import_creates_and_updates_by_sku(session_factory, tmp_path, removed, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 2)
+    with session_factory() as db:
+        db.add(Product(name="Old name", sku="A-1", price=1.0, selling_price=2.0, stock=1, category="Misc"))
+        db.commit()
+
+    job = _import(session_factory, tmp_path, "csv", (
+        "sku,name,price,selling_price,profit_margin_percentage,stock,category\n"
+        "A-1,Lamp,10,15,,4,Home\n"
+        "B-1,Chair,20,,50,2,Home\n"
+        "C-1,Desk,100,150,,,\n"
+    ))
+
+    assert job.status == "completed"
+    assert (job.processed_rows, job.created_count, job.updated_count, job.error_count) == (3, 2, 1, 0)
+    products = _products(session_factory)
+    assert (products["A-1"].name, products["A-1"].selling_price, products["A-1"].stock) == ("Lamp", 15.0, 4)
+    assert products["B-1"].selling_price == 30.0
+    # Empty cells take the row defaults
+    assert (products["C-1"].stock, products["C-1"].category) == (0, "Uncategorized")
+    assert removed == []
+
+
+def test_row_errors_are_kept_up_to_the_cap(session_factory, tmp_path, removed, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 3)
+    monkeypatch.setattr(settings, "IMPORT_MAX_ERRORS", 3)
+    unknown_image = content_path("f" * 64, ".jpg")
+
+    job = _import(session_factory, tmp_path, "ndjson", _ndjson(
+        "{not json",
+        {"sku": "OK-1", "name": "Good", "price": 5, "selling_price": 8},
+        {"sku": "BAD-1", "price": 5, "selling_price": 8},
+        {"sku": "BAD-2", "name": "Negative", "price": -1, "selling_price": 8},
+        {"sku": "BAD-3", "name": "No price"},
+        {"sku": "BAD-4", "name": "Unknown image", "price": 5, "selling_price": 8, "image_url": unknown_image},
+        {"sku": "OK-2", "name": "Also good", "price": 5, "profit_margin_percentage": 10},
+    ))
+
+    assert job.status == "completed"
+    assert (job.processed_rows, job.created_count, job.updated_count) == (7, 2, 0)
+    # Every bad row is counted, only the first IMPORT_MAX_ERRORS are kept
+    assert job.error_count == 5
+    assert [(error["line"], error["sku"]) for error in job.errors] == [(1, None), (3, "BAD-1"), (4, "BAD-2")]
+    assert "Invalid JSON" in job.errors[0]["error"]
+    assert set(_products(session_factory)) == {"OK-1", "OK-2"}
+
+
+def test_image_references_move_to_the_new_image(session_factory, tmp_path, removed):
+    old_image = _upload(session_factory, b"old image bytes")
+    new_image = _upload(session_factory, b"new image bytes")
+    row = {"sku": "IMG-1", "name": "Framed", "price": 5, "selling_price": 8}
+
+    job = _import(session_factory, tmp_path, "ndjson", _ndjson({**row, "image_url": old_image}))
+    assert job.created_count == 1
+    assert _ref_counts(session_factory) == {old_image: 1, new_image: 0}
+
+    # A row without an image keeps the current one and its reference
+    job = _import(session_factory, tmp_path, "ndjson", _ndjson(row))
+    assert job.updated_count == 1
+    assert _products(session_factory)["IMG-1"].image_url == old_image
+    assert _ref_counts(session_factory) == {old_image: 1, new_image: 0}
+
+    # Swapping the image retains the new upload, releases the old one and deletes it once committed
+    job = _import(session_factory, tmp_path, "ndjson", _ndjson({**row, "image_url": new_image}))
+    assert job.updated_count == 1
+    assert _products(session_factory)["IMG-1"].image_url == new_image
+    assert _ref_counts(session_factory) == {new_image: 1}
+    assert removed == [old_image]
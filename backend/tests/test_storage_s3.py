@@ -0,0 +1,134 @@
+# tests/test_storage_s3.py
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+requests = pytest.importorskip("requests")
+Image = pytest.importorskip("PIL.Image")
+
+from botocore.config import Config  # noqa: E402
+
+from app.core import storage as storage_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.storage import S3Storage, set_storage  # noqa: E402
+from app.models.upload_blob import UploadBlob  # noqa: E402
+from app.services.image_service import generate_variants, shutdown_image_pool  # noqa: E402
+from app.services.upload_service import (  # noqa: E402
+    content_path,
+    delete_unclaimed_uploads,
+    ingest_upload,
+    presign_upload,
+    register_upload,
+    remove_upload,
+    verify_direct_upload,
+)
+
+BUCKET = "shop-bucket"
+
+
+def _image(fmt: str = "PNG", size=(800, 600), color=(10, 20, 30)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, fmt)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """An S3Storage on a moto bucket, swapped in as the process-wide storage."""
+    for name, value in {
+        "AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_DEFAULT_REGION": "us-east-1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1", config=Config(signature_version="s3v4"))
+        client.create_bucket(Bucket=BUCKET)
+        monkeypatch.setattr(storage_module, "_storage", None)
+        storage = S3Storage(BUCKET, prefix="media", client=client)
+        set_storage(storage)
+        yield storage
+
+
+def _keys(storage: S3Storage) -> list:
+    listing = storage.client.list_objects_v2(Bucket=BUCKET)
+    return sorted(item["Key"] for item in listing.get("Contents", []))
+
+
+def test_ingest_puts_a_content_addressed_object(s3):
+    data = _image()
+    upload = asyncio.run(ingest_upload(UploadFile(io.BytesIO(data), filename="photo.jpg")))
+
+    assert upload.key == content_path(hashlib.sha256(data).hexdigest(), ".png")
+    assert upload.content_type == "image/png" and upload.size == len(data)
+    head = s3.client.head_object(Bucket=BUCKET, Key=f"media/{upload.key}")
+    assert head["ContentType"] == "image/png"
+    assert "immutable" in head["CacheControl"]
+
+
+def test_presigned_upload_is_verified_and_recorded(s3, session_factory):
+    data = _image("JPEG")
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    presigned = presign_upload("image/jpeg", len(data), sha256)
+    assert presigned["key"] == content_path(sha256, ".jpg")
+    upload = presigned["upload"]
+    assert upload["method"] == "PUT" and "x-amz-checksum-sha256" in upload["headers"]
+    assert requests.put(upload["url"], data=data, headers=upload["headers"]).status_code == 200
+
+    stored = verify_direct_upload(presigned["key"])
+    assert (stored.sha256, stored.size, stored.content_type) == (sha256, len(data), "image/jpeg")
+    with session_factory() as db:
+        assert register_upload(db, stored) == presigned["key"]
+        assert db.get(UploadBlob, sha256).ref_count == 0
+
+    # Already stored: nothing to upload again
+    assert presign_upload("image/jpeg", len(data), sha256)["upload"] is None
+
+
+def test_direct_upload_not_matching_its_hash_is_rejected_and_deleted(s3):
+    data = _image("JPEG")
+    presigned = presign_upload("image/jpeg", len(data), hashlib.sha256(b"something else").hexdigest())
+    upload = presigned["upload"]
+    requests.put(upload["url"], data=data, headers=upload["headers"])
+
+    with pytest.raises(HTTPException) as error:
+        verify_direct_upload(presigned["key"])
+    assert error.value.status_code == 422
+    assert not s3.exists(presigned["key"])
+
+
+def test_image_workers_put_variants_into_the_injected_storage(s3, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_WORKERS", 1)
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_WIDTHS", [160, 320])
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_FORMATS", ["webp", "jpeg"])
+    upload = asyncio.run(ingest_upload(UploadFile(io.BytesIO(_image()), filename="photo.png")))
+    try:
+        variants = asyncio.run(generate_variants(upload.key))
+    finally:
+        shutdown_image_pool()
+
+    assert [v["width"] for v in variants] == [160, 320]
+    expected = sorted(f"media/{v[fmt]}" for v in variants for fmt in ("webp", "jpeg"))
+    assert [key for key in _keys(s3) if "/variants/" in key] == expected
+    head = s3.client.head_object(Bucket=BUCKET, Key=expected[0])
+    assert head["ContentType"].startswith("image/") and "immutable" in head["CacheControl"]
+
+    remove_upload(upload.key)
+    assert _keys(s3) == []
+
+
+def test_unclaimed_uploads_are_swept(s3, session_factory, monkeypatch):
+    upload = asyncio.run(ingest_upload(UploadFile(io.BytesIO(_image()), filename="photo.png")))
+    with session_factory() as db:
+        register_upload(db, upload)
+        assert delete_unclaimed_uploads(db) == []  # still within UPLOAD_UNCLAIMED_TTL
+
+        monkeypatch.setattr(settings, "UPLOAD_UNCLAIMED_TTL", -60)
+        assert delete_unclaimed_uploads(db) == [upload.key]
+        assert db.get(UploadBlob, upload.sha256) is None
+    remove_upload(upload.key)
+    assert _keys(s3) == []
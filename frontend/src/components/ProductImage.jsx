@@ -0,0 +1,45 @@
+import React from "react";
+import { UPLOADS_BASE_URL } from "@/utils/api";
+
+const uploadUrl = (path) => `${UPLOADS_BASE_URL}/${path}`;
+
+const buildSrcSet = (variants, format) =>
+  variants
+    .filter((variant) => variant[format])
+    .map((variant) => `${uploadUrl(variant[format])} ${variant.width}w`)
+    .join(", ");
+
+// Product image served from its resized variants: the browser picks the smallest width that
+// fills `sizes`, preferring AVIF/WebP with a JPEG fallback. Falls back to the original upload
+// until the variants have been generated.
+export default function ProductImage({ product, sizes = "100vw", alt, ...imgProps }) {
+  const variants = product.image_variants || [];
+
+  if (variants.length === 0) {
+    return (
+      <img src={uploadUrl(product.image_url)} alt={alt ?? product.name} loading="lazy" {...imgProps} />
+    );
+  }
+
+  const largest = variants[variants.length - 1];
+  return (
+    // display: contents keeps the <img> styling identical to a bare <img>
+    <picture className="contents">
+      {["avif", "webp"].map((format) => {
+        const srcSet = buildSrcSet(variants, format);
+        return srcSet ? <source key={format} type={`image/${format}`} srcSet={srcSet} sizes={sizes} /> : null;
+      })}
+      <img
+        src={uploadUrl(largest.jpeg || product.image_url)}
+        srcSet={buildSrcSet(variants, "jpeg") || undefined}
+        sizes={sizes}
+        width={largest.width}
+        height={largest.height}
+        alt={alt ?? product.name}
+        loading="lazy"
+        decoding="async"
+        {...imgProps}
+      />
+    </picture>
+  );
+}
@@ -27,6 +27,8 @@ export default function CheckoutPage() {
   const [pendingOrder, setPendingOrder] = useState(null);
   const [loading, setLoading] = useState(true);
   const [processing, setProcessing] = useState(false);
+  // One key per checkout attempt: retries after a network error replay the same order
+  const [idempotencyKey] = useState(() => crypto.randomUUID());
   
   // Shipping form state
   const [shippingAddress, setShippingAddress] = useState({
@@ -111,7 +113,7 @@ export default function CheckoutPage() {
     
     setProcessing(true);
     try {
-      await checkoutSelectedItems(selectedItemIds, cartId);
+      await checkoutSelectedItems(selectedItemIds, cartId, idempotencyKey);
       toast.success("Payment successful! Your order is confirmed.");
       navigate("/orders");
     } catch (err) {
@@ -9,7 +9,8 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Badge } from "@/components/ui/badge";
 import { Search, Star, ArrowRight, Sparkles, ChevronDown } from "lucide-react"; // Added ChevronDown for dropdown
-import { fetchProducts, UPLOADS_BASE_URL } from "@/utils/api";
+import { fetchProducts } from "@/utils/api";
+import ProductImage from "@/components/ProductImage";
 import { useNavigate } from "react-router-dom";
 import { toast } from "sonner";
 import { Link } from "react-router-dom"; 
@@ -40,9 +41,9 @@ const ProductCard = ({ product, handleCardClick }) => {
     >
       {/* Reduced image height from h-48 to h-36 */}
       <div className="relative h-36 w-full overflow-hidden">
-        <img
-          src={`${UPLOADS_BASE_URL}/${product.image_url}`}
-          alt={product.name}
+        <ProductImage
+          product={product}
+          sizes="160px"
           className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-110"
         />
         <div className="absolute inset-0 bg-gradient-to-t from-black/20 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300" />
@@ -9,7 +9,8 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Badge } from "@/components/ui/badge";
 import { ShoppingCart, Search, Star, Heart, ArrowLeft, Package, Truck, ArrowRight } from "lucide-react"; 
-import { fetchProducts, addItemToCart, UPLOADS_BASE_URL } from "@/utils/api";
+import { fetchProductsPage, searchProducts, addItemToCart } from "@/utils/api";
+import ProductImage from "@/components/ProductImage";
 import { useNavigate, useLocation, useSearchParams } from "react-router-dom";
 import { toast } from "sonner";
 import { Link } from "react-router-dom"; 
@@ -33,9 +34,9 @@ const ProductCard = ({ product, handleCardClick, handleAddToCart, isLoggedIn })
         className="relative h-36 w-full overflow-hidden"
         onClick={() => handleCardClick(product)} // Click image/top half to view details
       >
-        <img
-          src={`${UPLOADS_BASE_URL}/${product.image_url}`}
-          alt={product.name}
+        <ProductImage
+          product={product}
+          sizes="160px"
           className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-110"
         />
         <div className="absolute inset-0 bg-gradient-to-t from-black/20 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300" />
@@ -105,9 +106,9 @@ const FeaturedProductCard = ({ product, handleAddToCart, isLoggedIn }) => {
     <Card className="bg-gradient-to-br from-card via-card/80 to-muted/20 border-border/50 shadow-glow overflow-hidden">
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-0">
         <div className="relative h-96 lg:h-full bg-gradient-to-br from-muted/10 to-muted/30 flex items-center justify-center p-8">
-          <img
-            src={`${UPLOADS_BASE_URL}/${product.image_url}`}
-            alt={product.name}
+          <ProductImage
+            product={product}
+            sizes="(min-width: 1024px) 50vw, 100vw"
             className="max-w-full max-h-full object-contain drop-shadow-2xl"
           />
           <div className="absolute top-6 left-6">
@@ -206,9 +207,9 @@ const RelatedProductCard = ({ product, onSelect }) => {
       onClick={() => onSelect(product)}
     >
       <div className="relative h-44 overflow-hidden">
-        <img
-          src={`${UPLOADS_BASE_URL}/${product.image_url}`}
-          alt={product.name}
+        <ProductImage
+          product={product}
+          sizes="224px"
           className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-110"
         />
         <div className="absolute inset-0 bg-gradient-to-t from-black/20 to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300" />
@@ -233,36 +234,128 @@ const RelatedProductCard = ({ product, onSelect }) => {
   );
 };
 
+const PAGE_SIZE = 24;
+
+const SORT_OPTIONS = [
+  { value: "newest", label: "Newest" },
+  { value: "oldest", label: "Oldest" },
+  { value: "price_asc", label: "Price: Low to High" },
+  { value: "price_desc", label: "Price: High to Low" },
+];
+
 export default function ProductsPage() {
   const [products, setProducts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [relatedProducts, setRelatedProducts] = useState([]);
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
   const location = useLocation();
   const navigate = useNavigate();
-  const [searchParams] = useSearchParams();
+  const [searchParams, setSearchParams] = useSearchParams();
   const selectedProduct = location.state?.selectedProduct;
 
-  // Read the category from the URL query parameter
+  // Filters live in the URL so they survive reloads and can be shared; the server applies them
   const categoryParam = searchParams.get("category");
+  const sort = searchParams.get("sort") || "newest";
+  const minPrice = searchParams.get("min_price") || "";
+  const maxPrice = searchParams.get("max_price") || "";
+  const inStockOnly = searchParams.get("in_stock") === "true";
+
+  const listParams = useMemo(() => {
+    const params = { sort, limit: PAGE_SIZE };
+    if (categoryParam) params.category = categoryParam;
+    if (minPrice !== "") params.min_price = minPrice;
+    if (maxPrice !== "") params.max_price = maxPrice;
+    if (inStockOnly) params.in_stock = true;
+    return params;
+  }, [categoryParam, sort, minPrice, maxPrice, inStockOnly]);
+
+  const updateFilter = (key, value) => {
+    const next = new URLSearchParams(searchParams);
+    if (value === "" || value === null || value === false) next.delete(key);
+    else next.set(key, String(value));
+    setSearchParams(next, { replace: true });
+  };
 
   useEffect(() => {
     const token = localStorage.getItem("token");
     setIsLoggedIn(!!token);
+  }, []);
 
-    const loadProducts = async () => {
+  // Wait for the user to stop typing before hitting the search endpoint
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // First page for the current filters (or search results); the previous results stay up until it
+  // arrives, and responses for filters that have since changed are dropped
+  useEffect(() => {
+    if (selectedProduct) return;
+    let cancelled = false;
+
+    const loadFirstPage = async () => {
       try {
-        const data = await fetchProducts();
-        setProducts(data);
+        if (debouncedSearch) {
+          const results = await searchProducts(debouncedSearch, PAGE_SIZE);
+          if (cancelled) return;
+          setProducts(results);
+          setNextCursor(null);
+        } else {
+          const page = await fetchProductsPage(listParams);
+          if (cancelled) return;
+          setProducts(page.items);
+          setNextCursor(page.next_cursor);
+        }
       } catch (error) {
+        if (cancelled) return;
         console.error("Failed to load products", error);
         toast.error("Failed to load products.");
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
-    loadProducts();
-  }, []);
+    loadFirstPage();
+    return () => {
+      cancelled = true;
+    };
+  }, [listParams, debouncedSearch, selectedProduct]);
+
+  // Related items: one small page from the same category
+  useEffect(() => {
+    if (!selectedProduct?.category) {
+      setRelatedProducts([]);
+      return;
+    }
+    let cancelled = false;
+    fetchProductsPage({ category: selectedProduct.category, limit: 7 })
+      .then((page) => {
+        if (cancelled) return;
+        setRelatedProducts(page.items.filter((p) => p.id !== selectedProduct.id).slice(0, 6));
+      })
+      .catch((error) => console.error("Failed to load related products", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedProduct]);
+
+  const handleLoadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchProductsPage({ ...listParams, cursor: nextCursor });
+      setProducts((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Failed to load more products", error);
+      toast.error("Failed to load more products.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const handleAddToCart = async (product) => {
     try {
@@ -293,40 +386,16 @@ export default function ProductsPage() {
     }
   };
 
-  const filteredProducts = useMemo(() => {
-    let filtered = products.filter(product => {
-      const matchesSearch = product.name.toLowerCase().includes(searchTerm.toLowerCase()) || 
-                             product.description.toLowerCase().includes(searchTerm.toLowerCase());
-      return matchesSearch;
-    });
+  const hasFilters = Boolean(searchTerm || minPrice || maxPrice || inStockOnly || sort !== "newest");
 
-    // If a category is selected from the URL, filter by it
-    if (categoryParam) {
-      filtered = filtered.filter(product => product.category.toLowerCase() === categoryParam.toLowerCase());
-    }
-
-    return filtered.sort((a, b) => a.name.localeCompare(b.name));
-  }, [products, searchTerm, categoryParam]);
-
-  const categorizedProducts = useMemo(() => {
-    const categories = [...new Set(filteredProducts.map(p => p.category).filter(Boolean))];
-    const categoryMap = {};
-
-    categories.forEach(category => {
-      categoryMap[category] = filteredProducts.filter(product => product.category === category);
-    });
-
-    return categoryMap;
-  }, [filteredProducts]);
-
-  const relatedProducts = useMemo(() => {
-    if (!selectedProduct) return [];
-    return products.filter(
-      (p) => p.category === selectedProduct.category && p.id !== selectedProduct.id
-    ).slice(0, 6);
-  }, [products, selectedProduct]);
+  const clearFilters = () => {
+    setSearchTerm("");
+    const next = new URLSearchParams();
+    if (categoryParam) next.set("category", categoryParam);
+    setSearchParams(next, { replace: true });
+  };
 
-  if (loading) {
+  if (loading && !selectedProduct) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-background via-background to-muted/20">
         <div className="container mx-auto px-6 py-24">
@@ -408,9 +477,9 @@ export default function ProductsPage() {
               </p>
             </div>
 
-            <div className="max-w-xl mx-auto px-4 md:px-0">
+            <div className="max-w-3xl mx-auto px-4 md:px-0">
               <Card className="bg-gradient-to-r from-card to-muted/10 border-border/50 shadow-medium">
-                <CardContent className="p-6">
+                <CardContent className="p-6 space-y-4">
                   <div className="relative">
                     <Search className="absolute left-4 top-1/2 transform -translate-y-1/2 text-muted-foreground w-5 h-5" />
                     <Input
@@ -420,6 +489,46 @@ export default function ProductsPage() {
                       className="pl-12 text-lg border-border/50 bg-background/50"
                     />
                   </div>
+                  {/* Sorting and filters are applied by the server; they are ignored while searching */}
+                  <div className="flex flex-wrap items-center gap-3">
+                    <select
+                      value={sort}
+                      onChange={(e) => updateFilter("sort", e.target.value === "newest" ? "" : e.target.value)}
+                      disabled={!!debouncedSearch}
+                      className="h-10 rounded-md border border-border/50 bg-background/50 px-3 text-sm"
+                    >
+                      {SORT_OPTIONS.map(option => (
+                        <option key={option.value} value={option.value}>{option.label}</option>
+                      ))}
+                    </select>
+                    <Input
+                      type="number"
+                      min="0"
+                      placeholder="Min $"
+                      value={minPrice}
+                      onChange={(e) => updateFilter("min_price", e.target.value)}
+                      disabled={!!debouncedSearch}
+                      className="w-28 border-border/50 bg-background/50"
+                    />
+                    <Input
+                      type="number"
+                      min="0"
+                      placeholder="Max $"
+                      value={maxPrice}
+                      onChange={(e) => updateFilter("max_price", e.target.value)}
+                      disabled={!!debouncedSearch}
+                      className="w-28 border-border/50 bg-background/50"
+                    />
+                    <label className="flex items-center gap-2 text-sm text-muted-foreground">
+                      <input
+                        type="checkbox"
+                        checked={inStockOnly}
+                        onChange={(e) => updateFilter("in_stock", e.target.checked)}
+                        disabled={!!debouncedSearch}
+                      />
+                      In stock only
+                    </label>
+                  </div>
                 </CardContent>
               </Card>
             </div>
@@ -434,11 +543,11 @@ export default function ProductsPage() {
                   <ArrowLeft className="w-4 h-4" />
                   All Products
                 </Button>
-                <h2 className="text-3xl font-bold capitalize">{decodeURIComponent(categoryParam)}</h2>
+                <h2 className="text-3xl font-bold capitalize">{categoryParam}</h2>
               </div>
             )}
 
-            {Object.keys(categorizedProducts).length === 0 ? (
+            {products.length === 0 ? (
               <div className="text-center py-24 px-4 md:px-0">
                 <div className="space-y-6">
                   <div className="w-24 h-24 mx-auto rounded-full bg-muted/20 flex items-center justify-center">
@@ -446,40 +555,42 @@ export default function ProductsPage() {
                   </div>
                   <div className="space-y-2">
                     <h3 className="text-2xl font-bold">No products found</h3>
-                    <p className="text-muted-foreground">Try adjusting your search terms</p>
+                    <p className="text-muted-foreground">Try adjusting your search terms or filters</p>
                   </div>
-                  <Button onClick={() => setSearchTerm("")}>
-                    Clear Search
-                  </Button>
+                  {hasFilters && (
+                    <Button onClick={clearFilters}>
+                      Clear Filters
+                    </Button>
+                  )}
                 </div>
               </div>
             ) : (
-              <div className="space-y-16">
-                {Object.entries(categorizedProducts).map(([category, categoryProducts]) => (
-                  <div key={category} className="space-y-8">
-                    { !categoryParam && (
-                      <div className="space-y-2 px-4 md:px-0">
-                        <h2 className="text-3xl font-bold capitalize">{category}</h2>
-                        <p className="text-muted-foreground">
-                          {categoryProducts.length} products available
-                        </p>
-                      </div>
-                    )}
-                    
-                    {/* CORRECTION 2: Implemented desktop row limit logic */}
-                    <div className="flex overflow-x-auto gap-4 pb-4 pl-4 md:pl-0 md:flex-wrap md:overflow-hidden md:gap-6">
-                      {categoryProducts.map(product => (
-                        <ProductCard // Using the corrected ProductCard
-                          key={product.id}
-                          product={product}
-                          handleCardClick={handleProductCardClick} 
-                          handleAddToCart={handleAddToCart}
-                          isLoggedIn={isLoggedIn}
-                        />
-                      ))}
-                    </div>
+              <div className="space-y-8">
+                <div className="flex overflow-x-auto gap-4 pb-4 pl-4 md:pl-0 md:flex-wrap md:overflow-hidden md:gap-6">
+                  {products.map(product => (
+                    <ProductCard // Using the corrected ProductCard
+                      key={product.id}
+                      product={product}
+                      handleCardClick={handleProductCardClick} 
+                      handleAddToCart={handleAddToCart}
+                      isLoggedIn={isLoggedIn}
+                    />
+                  ))}
+                </div>
+
+                {/* Next page is fetched only when asked for */}
+                {nextCursor && !debouncedSearch && (
+                  <div className="flex justify-center px-4 md:px-0">
+                    <Button
+                      variant="outline"
+                      onClick={handleLoadMore}
+                      disabled={loadingMore}
+                      className="gap-2 border-border/50 hover:bg-muted"
+                    >
+                      {loadingMore ? "Loading..." : "Load more"}
+                    </Button>
                   </div>
-                ))}
+                )}
               </div>
             )}
           </div>
@@ -487,4 +598,4 @@ export default function ProductsPage() {
       </div>
     </div>
   );
-}
\ No newline at end of file
+}
@@ -1,25 +1,37 @@
 import { useEffect, useState } from "react";
-import { fetchUsers, fetchAllOrders, fetchProducts } from "@/utils/api";
+import {
+  fetchUsers,
+  fetchOrdersPage,
+  fetchFinancialSummary,
+  fetchOrderStatusCounts,
+  fetchInventorySummary,
+} from "@/utils/api";
 import { Link } from "react-router-dom";
 
 export default function AdminDashboardPage() {
   const [users, setUsers] = useState([]);
   const [orders, setOrders] = useState([]);
-  const [products, setProducts] = useState([]);
+  const [summary, setSummary] = useState(null);
+  const [statusCounts, setStatusCounts] = useState([]);
+  const [inventory, setInventory] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const loadData = async () => {
       setLoading(true);
       try {
-        const [usersRes, ordersRes, productsRes] = await Promise.all([
+        const [usersRes, ordersRes, summaryRes, statusRes, inventoryRes] = await Promise.all([
           fetchUsers(),
-          fetchAllOrders(),
-          fetchProducts(),
+          fetchOrdersPage({ limit: 5 }),
+          fetchFinancialSummary(),
+          fetchOrderStatusCounts(),
+          fetchInventorySummary(10),
         ]);
         setUsers(usersRes);
-        setOrders(ordersRes);
-        setProducts(productsRes);
+        setOrders(ordersRes.items);
+        setSummary(summaryRes);
+        setStatusCounts(statusRes);
+        setInventory(inventoryRes);
       } catch (err) {
         console.error("Failed to fetch dashboard data:", err);
       } finally {
@@ -40,9 +52,11 @@ export default function AdminDashboardPage() {
     );
   }
 
-  const totalRevenue = orders.reduce((sum, order) => sum + (order.total_amount || 0), 0);
-  const pendingOrders = orders.filter(order => order.status === 'pending').length;
-  const lowStockProducts = products.filter(product => (product.stock || 0) < 10).length;
+  const totalRevenue = summary?.total_revenue || 0;
+  const totalOrders = statusCounts.reduce((sum, s) => sum + s.count, 0);
+  const pendingOrders = statusCounts.find(s => s.status === 'pending')?.count || 0;
+  const productCount = inventory?.product_count || 0;
+  const lowStockProducts = inventory?.low_stock_count || 0;
 
   return (
     <div className="container mx-auto px-6 py-24 animate-fade-in">
@@ -79,7 +93,7 @@ export default function AdminDashboardPage() {
           <div className="flex items-center justify-between">
             <div>
               <h2 className="text-sm font-medium text-muted-foreground">Total Orders</h2>
-              <p className="text-3xl font-bold text-primary mt-1">{orders.length}</p>
+              <p className="text-3xl font-bold text-primary mt-1">{totalOrders}</p>
               <p className="text-xs text-muted-foreground">{pendingOrders} pending</p>
             </div>
             <div className="w-12 h-12 bg-accent/10 rounded-lg flex items-center justify-center">
@@ -98,7 +112,7 @@ export default function AdminDashboardPage() {
           <div className="flex items-center justify-between">
             <div>
               <h2 className="text-sm font-medium text-muted-foreground">Products</h2>
-              <p className="text-3xl font-bold text-primary mt-1">{products.length}</p>
+              <p className="text-3xl font-bold text-primary mt-1">{productCount}</p>
               <p className="text-xs text-muted-foreground">{lowStockProducts} low stock</p>
             </div>
             <div className="w-12 h-12 bg-warning/10 rounded-lg flex items-center justify-center">
@@ -27,7 +27,12 @@ import {
   Award
 } from "lucide-react";
 import { toast } from "sonner";
-import { fetchAllOrders, fetchProducts } from "@/utils/api";
+import {
+  fetchOrdersPage,
+  fetchFinancialSummary,
+  fetchInventorySummary,
+  fetchTopProducts,
+} from "@/utils/api";
 
 const formatCurrency = (amount) => {
   return `$${(amount || 0).toFixed(2)}`;
@@ -66,21 +71,39 @@ export default function AdminFinancialsPage() {
     isLoading: isLoadingOrders,
     isError: isErrorOrders,
   } = useQuery({
-    queryKey: ["orders"],
-    queryFn: fetchAllOrders,
+    queryKey: ["orders", "recent"],
+    queryFn: () => fetchOrdersPage({ limit: 8 }).then((page) => page.items),
   });
 
   const {
-    data: products,
-    isLoading: isLoadingProducts,
-    isError: isErrorProducts,
+    data: summary,
+    isLoading: isLoadingSummary,
+    isError: isErrorSummary,
   } = useQuery({
-    queryKey: ["products"],
-    queryFn: fetchProducts,
+    queryKey: ["analytics", "summary"],
+    queryFn: () => fetchFinancialSummary(),
   });
 
-  const isLoading = isLoadingOrders || isLoadingProducts;
-  const isError = isErrorOrders || isErrorProducts;
+  const {
+    data: inventory,
+    isLoading: isLoadingInventory,
+    isError: isErrorInventory,
+  } = useQuery({
+    queryKey: ["analytics", "inventory"],
+    queryFn: () => fetchInventorySummary(),
+  });
+
+  const {
+    data: topProducts,
+    isLoading: isLoadingTopProducts,
+    isError: isErrorTopProducts,
+  } = useQuery({
+    queryKey: ["analytics", "top-products"],
+    queryFn: () => fetchTopProducts("units", 5),
+  });
+
+  const isLoading = isLoadingOrders || isLoadingSummary || isLoadingInventory || isLoadingTopProducts;
+  const isError = isErrorOrders || isErrorSummary || isErrorInventory || isErrorTopProducts;
 
   if (isError) {
     toast.error("Failed to load financial data. Please try again.");
@@ -112,75 +135,24 @@ export default function AdminFinancialsPage() {
     );
   }
 
-  // Enhanced Financial Calculations
-  const totalStockValue = products?.reduce(
-    (acc, product) => acc + (product.price || 0) * (product.stock || 0),
-    0
-  ) || 0;
-
-  // This part is already correct, as you've already fixed it.
-  const totalRevenue = orders?.reduce((acc, order) => {
-    if (order.status === "paid" || order.status === "shipped" || order.status === "delivered") {
-      return acc + (order.total_amount || 0);
-    }
-    return acc;
-  }, 0) || 0;
-
-  // FIX: Add 'delivered' to the COGS calculation
-  const totalCOGS = orders?.reduce((acc, order) => {
-    if (order.status === "paid" || order.status === "shipped" || order.status === "delivered") {
-      const orderCost = order.items?.reduce((itemAcc, item) => {
-        if (item.product) { 
-          const product = products?.find((p) => p.id === item.product.id);
-          if (product) {
-            return itemAcc + product.price * item.quantity;
-          }
-        }
-        return itemAcc;
-      }, 0) || 0;
-      return acc + orderCost;
-    }
-    return acc;
-  }, 0) || 0;
+  // Financial figures are aggregated server-side by /admin/analytics
+  const totalStockValue = inventory?.stock_value || 0;
+  const totalRevenue = summary?.total_revenue || 0;
+  const totalCOGS = summary?.total_cogs || 0;
 
   const totalProfit = totalRevenue - totalCOGS;
   const profitMargin = totalRevenue > 0 ? ((totalProfit / totalRevenue) * 100) : 0;
 
-  const totalOrders = orders?.length || 0;
-  // FIX: Add 'delivered' to the paidOrders filter
-  const paidOrders = orders?.filter(
-    (order) => order.status === "paid" || order.status === "shipped" || order.status === "delivered"
-  ).length || 0;
-  const pendingOrders = orders?.filter(
-    (order) => order.status === "pending"
-  ).length || 0;
-
-  // Product Sales Analytics
-  const productSalesMap = new Map();
-  // FIX: Add 'delivered' to the order status check
-  orders?.forEach((order) => {
-    if (order.status === "paid" || order.status === "shipped" || order.status === "delivered") {
-      order.items?.forEach((item) => {
-        if (item.product) {
-          const productId = item.product.id;
-          const currentSales = productSalesMap.get(productId) || 0;
-          productSalesMap.set(productId, currentSales + item.quantity);
-        }
-      });
-    }
-  });
+  const paidOrders = summary?.paid_orders || 0;
+  const pendingOrders = summary?.pending_orders || 0;
+  const totalOrders = paidOrders + pendingOrders;
+  const unitsSold = summary?.units_sold || 0;
 
-  const topSellingProducts = Array.from(productSalesMap.entries())
-    .sort(([, a], [, b]) => b - a)
-    .slice(0, 5)
-    .map(([productId, quantity]) => {
-      const product = products?.find((p) => p.id === productId);
-      return {
-        name: product?.name || `Product ID: ${productId}`,
-        quantity,
-        revenue: (product?.price || 0) * quantity,
-      };
-    });
+  const topSellingProducts = (topProducts || []).map((product) => ({
+    name: product.name || `Product ID: ${product.product_id}`,
+    quantity: product.units,
+    revenue: product.revenue,
+  }));
 
   const averageOrderValue = paidOrders > 0 ? totalRevenue / paidOrders : 0;
 
@@ -247,7 +219,7 @@ export default function AdminFinancialsPage() {
         
         <MetricCard
           title="Products Sold"
-          value={Array.from(productSalesMap.values()).reduce((a, b) => a + b, 0)}
+          value={unitsSold}
           subtitle="Total units moved"
           icon={Award}
           colorClass="bg-gradient-to-br from-muted/30 to-muted/50"
@@ -255,7 +227,7 @@ export default function AdminFinancialsPage() {
         
         <MetricCard
           title="Active Products"
-          value={products?.length || 0}
+          value={inventory?.product_count || 0}
           subtitle="In catalog"
           icon={Package}
           colorClass="bg-gradient-to-br from-muted/30 to-muted/50"
@@ -95,16 +95,52 @@ export async function resetPassword(token, newPassword) {
 
 // ---------------------- PRODUCTS ----------------------
 
-// 🟢 Fetch all products (public)
-export async function fetchProducts() {
+// 🟢 Fetch one page of products (public, keyset-paginated)
+// params: { category, min_price, max_price, in_stock, sort, cursor, limit }
+export async function fetchProductsPage(params = {}) {
+  try {
+    const res = await apiClient.get("/products/", { params });
+    return {
+      items: res.data.items.map((product) => ({
+        ...product,
+        // don't prepend here, just return the filename
+        image_url: product.image_url || null,
+        category: product.category || "",
+      })),
+      next_cursor: res.data.next_cursor,
+    };
+  } catch (err) {
+    console.error("Fetch products error:", err);
+    throw err.response?.data || { detail: "Failed to load products" };
+  }
+}
+
+// 🟢 Ranked full-text product search (public)
+export async function searchProducts(q, limit = 24) {
   try {
-    const res = await apiClient.get("/products/");
+    const res = await apiClient.get("/products/search", { params: { q, limit } });
     return res.data.map((product) => ({
       ...product,
-      // don't prepend here, just return the filename
       image_url: product.image_url || null,
       category: product.category || "",
     }));
+  } catch (err) {
+    console.error("Search products error:", err);
+    throw err.response?.data || { detail: "Failed to search products" };
+  }
+}
+
+// 🟢 Fetch all products (public) by following the page cursors
+export async function fetchProducts() {
+  try {
+    const products = [];
+    let cursor = undefined;
+    do {
+      const page = await fetchProductsPage({ limit: 100, cursor });
+      products.push(...page.items);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return products;
   } catch (err) {
     console.error("Fetch products error:", err);
     throw err.response?.data || { detail: "Failed to load products" };
@@ -191,6 +227,18 @@ export async function addItemToCart(payload) {
   }
 }
 
+// 🟢 Add / set / remove many cart lines in one request
+// operations: [{ op: "add" | "set" | "remove", product_id, quantity }]
+export async function batchUpdateCart(operations) {
+  try {
+    const res = await apiClient.post("/cart/items:batch", { operations });
+    return res.data;
+  } catch (err) {
+    console.error("Batch cart update error:", err);
+    throw err.response?.data || { detail: "Failed to update cart" };
+  }
+}
+
 // 🟢 Update cart item quantity
 export async function updateCartItemQuantity(itemId, newQuantity) {
   try {
@@ -214,11 +262,14 @@ export async function deleteCartItem(itemId) {
 }
 
 // 🟢 Checkout selected items
-export async function checkoutSelectedItems(selectedItemIds, cartId) { // ✅ Add cartId to the function signature
+// Reuse the same idempotencyKey when retrying so the order is never placed twice
+export async function checkoutSelectedItems(selectedItemIds, cartId, idempotencyKey) { // ✅ Add cartId to the function signature
     try {
         const res = await apiClient.post("/cart/checkout", { 
             selected_item_ids: selectedItemIds,
             cart_id: cartId // ✅ Add cart_id to the payload
+        }, {
+            headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
         });
         return res.data;
     } catch (err) {
@@ -233,14 +284,95 @@ export async function checkoutSelectedItems(selectedItemIds, cartId) { // ✅ Ad
 // 🟢 Fetch all orders (admin only)
 export async function fetchAllOrders() {
   try {
-    const res = await apiClient.get("/orders/");
-    return res.data;
+    const orders = [];
+    let cursor = undefined;
+    do {
+      const page = await fetchOrdersPage({ limit: 200, cursor });
+      orders.push(...page.items);
+      cursor = page.next_cursor;
+    } while (cursor);
+    return orders;
   } catch (err) {
     console.error("Fetch orders error:", err);
     throw err.response?.data || { detail: "Failed to fetch orders" };
   }
 }
 
+// 🟢 Fetch one page of orders, newest first (admin only, keyset-paginated)
+// params: { status, user_id, date_from, date_to, cursor, limit }
+export async function fetchOrdersPage(params = {}) {
+  try {
+    const res = await apiClient.get("/orders/", { params });
+    return res.data;
+  } catch (err) {
+    console.error("Fetch orders page error:", err);
+    throw err.response?.data || { detail: "Failed to fetch orders" };
+  }
+}
+
+// ---------------------- ADMIN ANALYTICS ----------------------
+
+// 🟢 Revenue / COGS / order totals (admin only)
+export async function fetchFinancialSummary(params = {}) {
+  try {
+    const res = await apiClient.get("/admin/analytics/summary", { params });
+    return res.data;
+  } catch (err) {
+    console.error("Fetch financial summary error:", err);
+    throw err.response?.data || { detail: "Failed to fetch financial summary" };
+  }
+}
+
+// 🟢 Revenue series bucketed by day | week | month (admin only)
+export async function fetchRevenueSeries(granularity = "day", params = {}) {
+  try {
+    const res = await apiClient.get("/admin/analytics/revenue", {
+      params: { granularity, ...params },
+    });
+    return res.data;
+  } catch (err) {
+    console.error("Fetch revenue series error:", err);
+    throw err.response?.data || { detail: "Failed to fetch revenue series" };
+  }
+}
+
+// 🟢 Order counts per status (admin only)
+export async function fetchOrderStatusCounts() {
+  try {
+    const res = await apiClient.get("/admin/analytics/status-counts");
+    return res.data;
+  } catch (err) {
+    console.error("Fetch status counts error:", err);
+    throw err.response?.data || { detail: "Failed to fetch status counts" };
+  }
+}
+
+// 🟢 Best sellers ranked by "units" or "revenue" (admin only)
+export async function fetchTopProducts(by = "units", limit = 5) {
+  try {
+    const res = await apiClient.get("/admin/analytics/top-products", {
+      params: { by, limit },
+    });
+    return res.data;
+  } catch (err) {
+    console.error("Fetch top products error:", err);
+    throw err.response?.data || { detail: "Failed to fetch top products" };
+  }
+}
+
+// 🟢 Stock valuation and low-stock counts (admin only)
+export async function fetchInventorySummary(lowStockThreshold = 10) {
+  try {
+    const res = await apiClient.get("/admin/analytics/inventory", {
+      params: { low_stock_threshold: lowStockThreshold },
+    });
+    return res.data;
+  } catch (err) {
+    console.error("Fetch inventory summary error:", err);
+    throw err.response?.data || { detail: "Failed to fetch inventory summary" };
+  }
+}
+
 // 🟢 Update order status
 export async function updateOrderStatus(orderId, status) {
   try {